@@ -0,0 +1,2 @@
+"""benchmarks - Performance benchmarks for jinja2 linter.
+"""
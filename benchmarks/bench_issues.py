@@ -0,0 +1,100 @@
+"""bench_issues.py - Memory of the lint errors kept by the text reporter,
+                    compared to the former lint errors with an instance
+                    dictionary.
+
+Run with `python -m benchmarks.bench_issues`
+"""
+import tracemalloc
+
+from benchmarks.bench_reporter import ISSUE_COUNT, ISSUES_PER_FILE
+from j2lint.linter.error import LinterError
+from j2lint.linter.rule import Rule
+
+
+class FormerLinterError:
+    """Former lint error, with an instance dictionary and the message always
+    stored"""
+
+    def __init__(self, linenumber, line, filename, rule, message=None):
+        self.linenumber = linenumber
+        self.line = line
+        self.filename = filename
+        self.rule = rule
+        self.message = rule.description if not message else message
+
+
+def make_rules():
+    """Creates the rules of the issues
+
+    Returns:
+        list: list of Rule objects
+    """
+    rules = []
+    for index in range(4):
+        rule = Rule()
+        rule.id = f"B{index}"
+        rule.description = f"benchmark rule {index}"
+        rule.short_description = f"benchmark-rule-{index}"
+        rule.severity = "LOW"
+        rules.append(rule)
+    return rules
+
+
+def make_issues(error_class, rules, issue_count=ISSUE_COUNT):
+    """Generates the issues found on the lines of the linted files
+
+    Each line has two issues sharing the line string, as the issues of the
+    rules sharing the lines of the file context.
+
+    Args:
+        error_class (class): class of the issues
+        rules (list): list of Rule objects
+        issue_count (int, optional): total number of issues. Defaults to ISSUE_COUNT.
+
+    Returns:
+        list: list of the issues of each file
+    """
+    results = []
+    for file_index in range(issue_count // ISSUES_PER_FILE):
+        file_name = f"roles/role_{file_index}/templates/eos.j2"
+        lines = [f"   mtu {{{{ethernet_interface_{index}.mtu}}}}"
+                 for index in range(ISSUES_PER_FILE // 2)]
+        results.append([error_class(index // 2 + 1, lines[index // 2], file_name,
+                                    rules[index % len(rules)])
+                        for index in range(ISSUES_PER_FILE)])
+    return results
+
+
+def measure_issues(error_class, issue_count=ISSUE_COUNT):
+    """Measures the memory allocated by the issues
+
+    The memory of the line strings and the file names is included.
+
+    Args:
+        error_class (class): class of the issues
+        issue_count (int, optional): total number of issues. Defaults to ISSUE_COUNT.
+
+    Returns:
+        int: allocated bytes
+    """
+    rules = make_rules()
+    tracemalloc.start()
+    results = make_issues(error_class, rules, issue_count)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return allocated
+
+
+def main():
+    """Prints the memory of the lint errors against the former lint errors"""
+    allocated = measure_issues(LinterError)
+    former_allocated = measure_issues(FormerLinterError)
+    print(f"memory of {ISSUE_COUNT} issues")
+    print(f"lint errors:        {allocated / 1024 / 1024:.1f} MB")
+    print(f"former lint errors: {former_allocated / 1024 / 1024:.1f} MB")
+    print(f"saved:              {1 - allocated / former_allocated:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""bench_large_file.py - Peak memory and time of the linting of a large
+                        generated template, read in memory or memory mapped.
+
+Run with `python -m benchmarks.bench_large_file [SIZE_IN_MB]`
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.corpus import generate_template
+
+DEFAULT_SIZE_MB = 64
+
+LINT_SCRIPT = """
+import json, logging, resource, sys, time
+logging.disable(logging.CRITICAL)
+from j2lint.api import RULES_DIR
+from j2lint.linter.collection import RulesCollection
+collection = RulesCollection.create_from_directory(RULES_DIR, [], [])
+collection.large_file_size = None if sys.argv[2] == "read" else 0
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+errors, warnings = collection.run({"path": sys.argv[1], "type": "jinja"})
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "rss_before_kb": before,
+                  "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "issues": len(errors) + len(warnings)}))
+"""
+
+
+def write_template(path, size):
+    """Writes a template of at least size bytes by repeating a generated one
+
+    Args:
+        path (string): template path
+        size (int): minimum size in bytes
+    """
+    block = generate_template(2000)
+    with open(path, "w", encoding="utf-8") as f:
+        written = 0
+        while written < size:
+            written += f.write(block)
+
+
+def lint(path, mode):
+    """Lints the template in a new process
+
+    Args:
+        path (string): template path
+        mode (string): read to read the file in memory, mmap to memory map it
+
+    Returns:
+        dict: lint time, peak resident memory and number of issues
+    """
+    output = subprocess.run([sys.executable, "-c", LINT_SCRIPT, path, mode],
+                            stdout=subprocess.PIPE, check=True).stdout
+    return json.loads(output)
+
+
+def main():
+    """Prints the peak memory of both modes relative to the file size"""
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE_MB
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.j2")
+        write_template(path, size_mb * 1024 * 1024)
+        file_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"template: {file_mb:.1f} MB")
+        for mode in ("read", "mmap"):
+            result = lint(path, mode)
+            peak_mb = (result["peak_rss_kb"] - result["rss_before_kb"]) / 1024
+            print(f"{mode:>5}: {result['seconds']:.2f}s, peak RSS +{peak_mb:.0f} MB "
+                  f"({peak_mb / file_mb:.1f}x the file), {result['issues']} issues")
+
+
+if __name__ == "__main__":
+    main()
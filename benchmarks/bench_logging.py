@@ -0,0 +1,75 @@
+"""bench_logging.py - Benchmark of the logging overhead per linted file when
+                      the logs are disabled, as done by the command line.
+
+Run with `python -m benchmarks.bench_logging`
+"""
+import logging
+import sys
+import timeit
+from unittest.mock import patch
+
+from benchmarks.bench_scanner import make_template
+from j2lint.api import RULES_DIR
+from j2lint.linter.collection import RulesCollection
+from j2lint.logger import logger
+from j2lint.utils import get_jinja_statements
+
+LINE_COUNT = 200
+
+
+def bench_logging(line_count=LINE_COUNT, number=50, repeat=5):
+    """Times the linting of a file with the logs disabled against the same
+    linting without any logging call
+
+    Args:
+        line_count (int, optional): template size in lines. Defaults to LINE_COUNT.
+        number (int, optional): number of runs per timing. Defaults to 50.
+        repeat (int, optional): number of timings, the fastest is kept.
+                                Defaults to 5.
+
+    Returns:
+        tuple: time per file with the logs disabled, time per file without
+               logging calls and time of the eager formatting of the jinja
+               statements avoided per file, in seconds
+    """
+    collection = RulesCollection.create_from_directory(RULES_DIR, [], [])
+    file_dict = {'path': 'bench.j2'}
+    text = make_template(line_count)
+
+    def run():
+        collection.run_text(file_dict, text)
+
+    def noop(*args, **kwargs):
+        pass
+
+    previous_disable = logging.root.manager.disable
+    logging.disable(sys.maxsize)
+    try:
+        run()
+        disabled_time = min(timeit.repeat(run, number=number, repeat=repeat)) / number
+        with patch.multiple(logger, debug=noop, info=noop, warning=noop, error=noop,
+                            isEnabledFor=noop):
+            no_logging_time = min(timeit.repeat(run, number=number, repeat=repeat)) / number
+    finally:
+        logging.disable(previous_disable)
+
+    statements = get_jinja_statements(text)
+    eager_time = timeit.timeit(
+        lambda: "Found jinja statements {}".format(statements), number=number) / number
+    return disabled_time, no_logging_time, eager_time
+
+
+def main():
+    """Prints the logging overhead per file"""
+    disabled_time, no_logging_time, eager_time = bench_logging()
+    overhead = disabled_time - no_logging_time
+    print(f"logging overhead per file of {LINE_COUNT} lines with the logs disabled")
+    print(f"logs disabled:      {disabled_time * 1e6:>9.1f}us")
+    print(f"no logging calls:   {no_logging_time * 1e6:>9.1f}us")
+    print(f"overhead:           {overhead * 1e6:>9.1f}us "
+          f"({100 * overhead / disabled_time:.1f}%)")
+    print(f"eager statements formatting avoided: {eager_time * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
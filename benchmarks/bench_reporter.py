@@ -0,0 +1,113 @@
+"""bench_reporter.py - Benchmark of the streaming JSON reporter against the
+                       former JSON output going through the issues text.
+
+Run with `python -m benchmarks.bench_reporter`
+"""
+import contextlib
+import io
+import json
+import time
+from argparse import Namespace
+
+from j2lint.linter.error import LinterError
+from j2lint.linter.rule import Rule
+from j2lint.reporter import JsonReporter, sort_issues
+from j2lint.settings import settings
+
+ISSUE_COUNT = 100000
+ISSUES_PER_FILE = 100
+
+
+def make_issues(issue_count=ISSUE_COUNT, issues_per_file=ISSUES_PER_FILE):
+    """Generates the errors and warnings of the linted files
+
+    Args:
+        issue_count (int, optional): total number of issues. Defaults to ISSUE_COUNT.
+        issues_per_file (int, optional): number of issues per file.
+                                         Defaults to ISSUES_PER_FILE.
+
+    Returns:
+        list: tuples of file path, list of errors and list of warnings
+    """
+    rules = []
+    for index in range(4):
+        rule = Rule()
+        rule.id = f"B{index}"
+        rule.description = f"benchmark rule {index}"
+        rule.short_description = f"benchmark-rule-{index}"
+        rule.severity = "LOW"
+        rules.append(rule)
+    results = []
+    for file_index in range(issue_count // issues_per_file):
+        file_name = f"roles/role_{file_index}/templates/eos.j2"
+        issues = [LinterError(index + 1, "   mtu {{ethernet_interface.mtu}}",
+                              file_name, rules[index % len(rules)])
+                  for index in range(issues_per_file)]
+        results.append((file_name, issues[::2], issues[1::2]))
+    return results
+
+
+def print_json_reference(results):
+    """Former JSON output: the issues of all the files are kept, rendered to
+    JSON text by LinterError.__repr__ and parsed back
+
+    Args:
+        results (list): tuples of file path, list of errors and list of warnings
+    """
+    json_output = {}
+    for issue_type, index in (("ERRORS", 1), ("WARNINGS", 2)):
+        for result in results:
+            json_output.setdefault(issue_type, []).extend(
+                json.loads(str(issue)) for issue in sort_issues(result[index]))
+    print(json.dumps(json_output))
+
+
+def print_json_streaming(results):
+    """JSON output of the streaming reporter
+
+    Args:
+        results (list): tuples of file path, list of errors and list of warnings
+    """
+    reporter = JsonReporter(Namespace(json=True))
+    reporter.start([])
+    for file_name, errors, warnings in results:
+        reporter.report_file(file_name, errors, warnings)
+    reporter.finish()
+
+
+def bench_reporter(issue_count=ISSUE_COUNT):
+    """Times the streaming JSON reporter against the former JSON output
+
+    Args:
+        issue_count (int, optional): total number of issues. Defaults to ISSUE_COUNT.
+
+    Returns:
+        tuple: streaming time and reference time in seconds
+    """
+    results = make_issues(issue_count)
+    settings.output = "json"
+    times = []
+    outputs = []
+    for print_json in (print_json_streaming, print_json_reference):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            start = time.perf_counter()
+            print_json(results)
+            times.append(time.perf_counter() - start)
+        outputs.append(json.loads(output.getvalue()))
+    settings.output = "text"
+    assert outputs[0] == outputs[1]
+    return tuple(times)
+
+
+def main():
+    """Prints the streaming JSON reporter speedup"""
+    streaming_time, reference_time = bench_reporter()
+    print(f"JSON output of {ISSUE_COUNT} issues")
+    print(f"streaming reporter: {streaming_time:.3f}s")
+    print(f"former output:      {reference_time:.3f}s")
+    print(f"speedup:            {reference_time / streaming_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
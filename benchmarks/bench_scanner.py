@@ -0,0 +1,112 @@
+"""bench_scanner.py - Benchmark of the single pass line scanner against one
+                      pass over the lines per rule.
+
+Run with `python -m benchmarks.bench_scanner`
+"""
+import timeit
+
+from j2lint.api import RULES_DIR
+from j2lint.linter.collection import RulesCollection
+from j2lint.linter.context import FileContext
+from j2lint.linter.error import LinterError
+from j2lint.linter.scanner import LineScanner
+
+SIZES = [5000, 20000, 80000]
+
+
+def make_template(line_count):
+    """Generates an EOS configuration like template
+
+    Args:
+        line_count (int): approximate number of lines of the template
+
+    Returns:
+        string: template text
+    """
+    lines = []
+    index = 0
+    while len(lines) < line_count:
+        lines.extend([
+            "{# interface " + str(index) + " #}",
+            "{% for ethernet_interface in ethernet_interfaces | arista.avd.natural_sort('name') %}",
+            "!",
+            "interface {{ ethernet_interface.name }}",
+            "{%     if ethernet_interface.description is arista.avd.defined %}",
+            "   description {{ ethernet_interface.description }}",
+            "{%     endif %}",
+            "   mtu {{ethernet_interface.mtu}}",
+            "   speed {{ ethernet_interface.speed|default('auto') }}",
+            "   no shutdown",
+            "{% endfor %}",
+        ])
+        index += 1
+    return "\n".join(lines)
+
+
+def checklines_per_rule(rules, file_dict, context):
+    """Reference implementation running one pass over the lines per rule
+
+    Args:
+        rules (list): line rules
+        file_dict (dict): file path and file type
+        context (FileContext): context of the file
+
+    Returns:
+        dict: list of issues found by each rule, indexed by rule
+    """
+    issues = {}
+    for rule in rules:
+        errors = issues[rule] = []
+        for (index, line) in enumerate(context.lines):
+            if line.lstrip().startswith('#'):
+                continue
+            if rule.check_line(context, index):
+                errors.append(LinterError(index+1, line, file_dict['path'], rule))
+    return issues
+
+
+def bench_scanner(sizes=None, number=3):
+    """Times the line scanner against one pass per rule
+
+    Args:
+        sizes (list, optional): template sizes in lines. Defaults to SIZES.
+        number (int, optional): number of runs per size. Defaults to 3.
+
+    Returns:
+        list: tuples of size, scanner time and per rule time in seconds
+    """
+    collection = RulesCollection.create_from_directory(RULES_DIR, [], [])
+    file_dict = {'path': 'bench.j2'}
+    rules = [rule for rule in collection if rule.can_scan_lines(file_dict)]
+    results = []
+    for size in sizes or SIZES:
+        text = make_template(size)
+
+        def run_scanner():
+            return LineScanner(rules).scan(file_dict, FileContext(file_dict, text))
+
+        def run_per_rule():
+            return checklines_per_rule(rules, file_dict, FileContext(file_dict, text))
+
+        fused = run_scanner()
+        reference = run_per_rule()
+        assert all([issue.to_dict() for issue in fused[rule]]
+                   == [issue.to_dict() for issue in reference[rule]]
+                   for rule in rules)
+        scanner_time = timeit.timeit(run_scanner, number=number) / number
+        per_rule_time = timeit.timeit(run_per_rule, number=number) / number
+        results.append((size, scanner_time, per_rule_time))
+    return results
+
+
+def main():
+    """Prints the line scanner speedup"""
+    print("line rules: single pass scanner vs one pass per rule")
+    print(f"{'lines':>8} {'scanner (s)':>12} {'per rule (s)':>13} {'speedup':>8}")
+    for size, scanner_time, per_rule_time in bench_scanner():
+        print(f"{size:>8} {scanner_time:>12.4f} {per_rule_time:>13.4f} "
+              f"{per_rule_time / scanner_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""bench_utils.py - Benchmarks for the jinja2 linter utility functions.
+
+Run with `python -m benchmarks.bench_utils`
+"""
+import re
+import timeit
+
+from j2lint.utils import get_jinja_statements
+
+SIZES = [1000, 2000, 4000, 8000, 16000]
+
+
+def make_template(line_count):
+    """Generates a template with one jinja statement every other line
+
+    Args:
+        line_count (int): number of lines of the template
+
+    Returns:
+        string: template text
+    """
+    lines = []
+    for index in range(line_count // 2):
+        lines.append("{% if interface_" + str(index) + " is defined %}")
+        lines.append("interface Ethernet{{ interface_" + str(index) + " }}")
+    return "\n".join(lines)
+
+
+def get_jinja_statements_rescan(text):
+    """Reference implementation computing the line numbers by rescanning the
+    text from its start for each statement
+
+    Args:
+        text (string): multiline text to search the jinja statements in
+
+    Returns:
+        list: list of jinja statements
+    """
+    statements = []
+    regex_pattern = re.compile(
+        "(\\{%[-|+]?)((.|\n)*?)([-]?\\%})", re.MULTILINE)
+    newline_pattern = re.compile(r'\n')
+    for m in regex_pattern.finditer(text):
+        start_line = len(newline_pattern.findall(text, 0, m.start(2))) + 1
+        end_line = len(newline_pattern.findall(text, 0, m.end(2))) + 1
+        statements.append(
+            (m.group(2), start_line, end_line, m.group(1), m.group(4)))
+    return statements
+
+
+def bench_get_jinja_statements(sizes=None, number=3):
+    """Times get_jinja_statements against the rescanning implementation
+
+    Args:
+        sizes (list, optional): template sizes in lines. Defaults to SIZES.
+        number (int, optional): number of runs per size. Defaults to 3.
+
+    Returns:
+        list: tuples of size, offset index time and rescan time in seconds
+    """
+    results = []
+    for size in sizes or SIZES:
+        text = make_template(size)
+        assert get_jinja_statements(text) == get_jinja_statements_rescan(text)
+        indexed = timeit.timeit(
+            lambda: get_jinja_statements(text), number=number) / number
+        rescan = timeit.timeit(
+            lambda: get_jinja_statements_rescan(text), number=number) / number
+        results.append((size, indexed, rescan))
+    return results
+
+
+def main():
+    """Prints the get_jinja_statements scaling"""
+    print("get_jinja_statements scaling")
+    print(f"{'lines':>8} {'indexed (s)':>12} {'rescan (s)':>12} {'speedup':>8}")
+    for size, indexed, rescan in bench_get_jinja_statements():
+        print(f"{size:>8} {indexed:>12.4f} {rescan:>12.4f} {rescan / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
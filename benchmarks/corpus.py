@@ -0,0 +1,184 @@
+"""corpus.py - Deterministic generator of AVD-style EOS configuration
+               templates used by the benchmarks.
+
+Write a corpus to a directory with
+`python -m benchmarks.corpus <directory> [--files N] [--lines N] [--seed N]`
+"""
+import argparse
+import os
+import random
+
+DEFAULT_SEED = 42
+INDENT = "    "
+
+
+def statement(depth, body):
+    """Returns a jinja statement indented inside its delimiter"""
+    return "{%" + " " + INDENT * depth + body + " %}"
+
+
+def interface_block(rng, depth, index):
+    """Generates nested for/if blocks over interfaces"""
+    name = rng.choice(["ethernet_interfaces", "port_channel_interfaces",
+                       "vlan_interfaces", "loopback_interfaces"])
+    item = name[:-1]
+    lines = [
+        statement(depth, f"for {item} in {name} | arista.avd.natural_sort('name')"),
+        "!",
+        f"interface {{{{ {item}.name }}}}",
+        statement(depth + 1, f"if {item}.description is arista.avd.defined"),
+        f"   description {{{{ {item}.description }}}}",
+        statement(depth + 1, "endif"),
+        statement(depth + 1, f"if {item}.shutdown is arista.avd.defined(true)"),
+        "   shutdown",
+        statement(depth + 1, f"elif {item}.shutdown is arista.avd.defined(false)"),
+        "   no shutdown",
+        statement(depth + 1, "endif"),
+        statement(depth + 1, f"for vrrp in {item}.vrrp_ids | arista.avd.default([])"),
+        statement(depth + 2, "if vrrp.priority is arista.avd.defined"),
+        f"   vrrp {{{{ vrrp.id }}}} priority-level {{{{ vrrp.priority + {index} }}}}",
+        statement(depth + 2, "endif"),
+        statement(depth + 1, "endfor"),
+        statement(depth, "endfor"),
+    ]
+    return lines
+
+
+def macro_block(rng, depth, index):
+    """Generates a macro definition and its calls"""
+    lines = [
+        statement(depth, f"macro render_acl_{index}(acl, sequence=10)"),
+        "ip access-list {{ acl.name }}",
+        statement(depth + 1, "for entry in acl.entries"),
+        "   {{ sequence + loop.index0 * 10 }} {{ entry.action }} {{ entry.protocol | lower }}",
+        statement(depth + 1, "endfor"),
+        statement(depth, "endmacro"),
+    ]
+    for call in range(rng.randint(1, 3)):
+        lines.append(f"{{{{ render_acl_{index}(access_lists[{call}]) }}}}")
+    return lines
+
+
+def variables_block(rng, depth, index):
+    """Generates set statements and lines with many variables"""
+    lines = []
+    for count in range(rng.randint(3, 8)):
+        lines.append(statement(depth, f"set var_{index}_{count} = "
+                                      f"router_bgp.neighbors[{count}].peer_group | default('none')"))
+    lines.append(" ".join(f"{{{{ var_{index}_{count} }}}}" for count in range(rng.randint(5, 20))))
+    return lines
+
+
+def violations_block(rng, depth, index):
+    """Generates lines breaking some of the lint rules"""
+    return rng.sample([
+        "{{ocVariable}}",
+        "{{ ocVariable }}",
+        "{{ my-var }}",
+        statement(depth, f"set counter_{index}=counter_{index}+1"),
+        "{%set missing_spaces = 1%}",
+        "{%- if trimmed %}{% endif -%}",
+        "\t{% if tabbed %}{% endif %}",
+        "{% set first = 1 %}{% set second = 2 %}",
+    ], 2)
+
+
+def pathological_block(rng, depth, index):
+    """Generates very long lines and deeply nested statements"""
+    long_line = " | ".join(f"{{{{ value_{count} | default(0) + {count} }}}}"
+                           for count in range(200))
+    nesting = rng.randint(20, 40)
+    lines = [long_line, "x" * 5000 + " {{ trailing }}"]
+    lines.extend(statement(depth + level, f"if level_{level} is defined")
+                 for level in range(nesting))
+    lines.append("{{ innermost }}")
+    lines.extend(statement(depth + level, "endif")
+                 for level in reversed(range(nesting)))
+    return lines
+
+
+def comment_block(rng, depth, index):
+    """Generates comments and plain configuration lines"""
+    lines = ["{# " + f"section {index} generated by the benchmark corpus" + " #}"]
+    lines.extend(f"   ip route 10.{index % 256}.{count}.0/24 192.0.2.{count}"
+                 for count in range(rng.randint(2, 10)))
+    return lines
+
+
+BLOCKS = [
+    (interface_block, 4),
+    (macro_block, 2),
+    (variables_block, 2),
+    (violations_block, 1),
+    (comment_block, 3),
+]
+
+
+def generate_template(line_count, seed=DEFAULT_SEED, pathological=False):
+    """Generates a template of about line_count lines
+
+    The same arguments always generate the same template.
+
+    Args:
+        line_count (int): approximate number of lines
+        seed (int, optional): random seed. Defaults to DEFAULT_SEED.
+        pathological (bool, optional): add very long lines and deep nesting.
+                                       Defaults to False.
+
+    Returns:
+        string: template text
+    """
+    rng = random.Random(seed)
+    blocks = [block for block, weight in BLOCKS for _ in range(weight)]
+    lines = []
+    index = 0
+    while len(lines) < line_count:
+        if pathological and index % 5 == 4:
+            block = pathological_block
+        else:
+            block = rng.choice(blocks)
+        lines.extend(block(rng, 0, index))
+        index += 1
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(directory, file_count, line_count, seed=DEFAULT_SEED):
+    """Writes a corpus of templates in role directories
+
+    Args:
+        directory (string): directory the templates are written to
+        file_count (int): number of templates
+        line_count (int): approximate number of lines of the median template
+        seed (int, optional): random seed. Defaults to DEFAULT_SEED.
+
+    Returns:
+        list: list of the template paths
+    """
+    rng = random.Random(seed)
+    paths = []
+    for index in range(file_count):
+        # Mostly small templates with a few large generated ones
+        lines = line_count * rng.choice([1, 1, 1, 2, 4]) if index % 50 else line_count * 20
+        role_dir = os.path.join(directory, f"role_{index % 10}", "templates")
+        os.makedirs(role_dir, exist_ok=True)
+        path = os.path.join(role_dir, f"template_{index}.j2")
+        with open(path, "w") as f:
+            f.write(generate_template(lines, seed + index, pathological=index % 25 == 24))
+        paths.append(path)
+    return paths
+
+
+def main():
+    """Writes a corpus to the directory given on the command line"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+    paths = generate_corpus(args.directory, args.files, args.lines, args.seed)
+    print(f"{len(paths)} templates written to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
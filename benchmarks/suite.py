@@ -0,0 +1,166 @@
+"""suite.py - Benchmark suite of the utility functions, the indenter, the
+              rules collection on a generated template corpus and the startup
+              of the command line.
+
+Run with `python -m benchmarks.suite [--output FILE] [--baseline FILE]`
+
+The results are written as JSON with --output. Given a baseline JSON written
+by a previous run, the command fails when a benchmark is slower than the
+baseline by more than the threshold.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from benchmarks.corpus import generate_template, generate_corpus
+from j2lint.api import RULES_DIR
+from j2lint.linter.collection import RulesCollection
+from j2lint.linter.indenter.node import Node
+from j2lint.utils import get_jinja_statements, get_jinja_variables, get_jinja_comments
+
+DEFAULT_THRESHOLD = 0.25
+RESULTS_VERSION = 1
+
+
+def get_benchmarks(corpus_dir):
+    """Returns the benchmarks of the suite
+
+    Args:
+        corpus_dir (string): directory the template corpus is written to
+
+    Returns:
+        dict: functions to time, indexed by benchmark name
+    """
+    large = generate_template(5000)
+    small = generate_template(200)
+    pathological = generate_template(500, pathological=True)
+    indentation_statements = get_jinja_statements(large, indentation=True)
+    collection = RulesCollection.create_from_directory(RULES_DIR, [], [])
+    corpus = generate_corpus(corpus_dir, 20, 200)
+
+    def lint_corpus():
+        for path in corpus:
+            collection.run({'path': path})
+
+    def run_command(*args):
+        subprocess.run([sys.executable, "-m", "j2lint", *args], check=False,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return {
+        "utils.get_jinja_statements": lambda: get_jinja_statements(large),
+        "utils.get_jinja_variables": lambda: get_jinja_variables(large),
+        "utils.get_jinja_comments": lambda: get_jinja_comments(large),
+        "indenter.check_indentation":
+            lambda: Node().check_indentation([], indentation_statements, 0),
+        "collection.run_text.small":
+            lambda: collection.run_text({'path': 'small.j2'}, small),
+        "collection.run_text.large":
+            lambda: collection.run_text({'path': 'large.j2'}, large),
+        "collection.run_text.pathological":
+            lambda: collection.run_text({'path': 'pathological.j2'}, pathological),
+        "collection.run.corpus": lint_corpus,
+        "startup.version": lambda: run_command("--version"),
+        "startup.select": lambda: run_command("--select", "S6", corpus[1]),
+        "startup.lint": lambda: run_command(corpus[1]),
+    }
+
+
+def run_benchmarks(names_filter=None, repeat=5):
+    """Times the benchmarks of the suite
+
+    The number of calls per run is chosen for a run to last at least 0.2s,
+    which also warms up the caches, then the fastest of `repeat` runs is kept.
+
+    Args:
+        names_filter (string, optional): only run the benchmarks with this
+                                         string in their name. Defaults to None.
+        repeat (int, optional): number of timed runs. Defaults to 5.
+
+    Returns:
+        dict: time in seconds indexed by benchmark name
+    """
+    results = {}
+    previous_disable = logging.root.manager.disable
+    logging.disable(sys.maxsize)
+    try:
+        with tempfile.TemporaryDirectory() as corpus_dir:
+            for name, function in get_benchmarks(corpus_dir).items():
+                if names_filter and names_filter not in name:
+                    continue
+                timer = timeit.Timer(function)
+                number = timer.autorange()[0]
+                results[name] = min(timer.repeat(repeat, number)) / number
+    finally:
+        logging.disable(previous_disable)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compares the results to the baseline
+
+    Args:
+        results (dict): time in seconds indexed by benchmark name
+        baseline (dict): baseline time in seconds indexed by benchmark name
+        threshold (float, optional): relative slowdown above which a
+                                     benchmark regressed.
+                                     Defaults to DEFAULT_THRESHOLD.
+
+    Returns:
+        list: tuples of name, baseline time, time and regressed flag of the
+              benchmarks found in both
+    """
+    return [(name, baseline[name], seconds, seconds > baseline[name] * (1 + threshold))
+            for name, seconds in results.items() if name in baseline]
+
+
+def main(args=None):
+    """Runs the suite, writes and compares the results
+
+    Returns:
+        int: 1 if a benchmark regressed, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite",
+                                     description="j2lint benchmark suite")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown failing the comparison")
+    parser.add_argument("--filter", dest="names_filter",
+                        help="only run the benchmarks with this string in their name")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    options = parser.parse_args(args)
+
+    results = run_benchmarks(options.names_filter, options.repeat)
+    for name, seconds in results.items():
+        print(f"{name:<36} {seconds * 1000:>10.2f}ms")
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump({"version": RESULTS_VERSION,
+                       "python": platform.python_version(),
+                       "machine": platform.machine(),
+                       "benchmarks": results}, f, indent=2)
+
+    if not options.baseline:
+        return 0
+    with open(options.baseline) as f:
+        baseline = json.load(f)["benchmarks"]
+    print(f"\ncompared to {os.path.basename(options.baseline)} "
+          f"(threshold {options.threshold:.0%})")
+    regressions = 0
+    for name, baseline_seconds, seconds, regressed in compare(
+            results, baseline, options.threshold):
+        regressions += regressed
+        print(f"{name:<36} {baseline_seconds * 1000:>10.2f}ms -> {seconds * 1000:>10.2f}ms "
+              f"{seconds / baseline_seconds:>6.2f}x{'  REGRESSION' if regressed else ''}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""api.py - Functions to use jinja2 linter from python code.
+"""
+import os
+
+from j2lint.linter.collection import RulesCollection
+from j2lint.utils import LANGUAGE_JINJA
+
+RULES_DIR = os.path.dirname(os.path.realpath(__file__)) + "/rules"
+
+# Collection of the default rules loaded on the first call to lint_text
+default_collection = None
+
+
+def get_default_collection():
+    """Returns the collection of the default rules, loading it on first use
+
+    Returns:
+        RulesCollection: collection of the rules in RULES_DIR
+    """
+    # pylint: disable = global-statement
+    global default_collection
+    if default_collection is None:
+        default_collection = RulesCollection.create_from_directory(
+            RULES_DIR, [], [])
+    return default_collection
+
+
+def lint_text(text, filename="<stdin>", collection=None):
+    """Lints a jinja template held in memory
+
+    The text is always linted as a jinja template and the file system is
+    never accessed.
+
+    Args:
+        text (string): template text
+        filename (string, optional): file name reported in the lint errors.
+                                     Defaults to "<stdin>".
+        collection (RulesCollection, optional): rules collection to use.
+                                                Defaults to the default rules.
+
+    Returns:
+        tuple: list of errors and list of warnings
+    """
+    if collection is None:
+        collection = get_default_collection()
+    return collection.run_text({'path': filename, 'type': LANGUAGE_JINJA}, text)
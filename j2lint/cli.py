@@ -1,20 +1,34 @@
 """cli.py - Command line argument parser.
 """
+import os
 import sys
 import errno
-import os
 import argparse
-import logging
-import tempfile
+import contextlib
 import json
+import logging
+import subprocess
+from time import perf_counter
 from j2lint import NAME, VERSION, DESCRIPTION
+from j2lint.api import RULES_DIR, lint_text
 from j2lint.linter.collection import RulesCollection
 from j2lint.linter.runner import Runner
-from j2lint.utils import get_files
+from j2lint.linter.parallel import jobs_count
+from j2lint.linter.cache import ResultCache
+from j2lint.linter.duplicates import DuplicateFinder
+from j2lint.linter.profile import Profiler
+from j2lint.linter.error import LinterError
+from j2lint.utils import get_files, get_file_type, get_changed_files, iter_files
+# sort_issues and sort_and_print_issues moved to the reporters and are still
+# importable from the cli
+# pylint: disable = unused-import
+from j2lint.reporter import REPORTERS, sort_issues, sort_and_print_issues
+# pylint: enable = unused-import
 from j2lint.logger import logger, add_handler
 from j2lint.settings import settings
 
-RULES_DIR = os.path.dirname(os.path.realpath(__file__)) + "/rules"
+STDIN_FILENAME = "<stdin>"
+NO_ISSUES = ((), ())
 IGNORE_RULES = WARN_RULES = ['jinja-syntax-error',
                              'single-space-decorator',
                              'operator-enclosed-by-spaces',
@@ -44,6 +58,9 @@ def create_parser():
                         help='files or directories to lint')
     parser.add_argument('-i', '--ignore', nargs='*',
                         choices=IGNORE_RULES, default=[], help='rules to ignore')
+    parser.add_argument('--select', nargs='*',
+                        choices=IGNORE_RULES, default=[], help='rules to run, '
+                                                               'the others are ignored')
     parser.add_argument('-w', '--warn', nargs='*',
                         choices=WARN_RULES, default=[], help='rules to warn')
     parser.add_argument('-l', '--list', default=False,
@@ -56,6 +73,9 @@ def create_parser():
                         action='store_true', help='enable debug logs')
     parser.add_argument('-j', '--json', default=False,
                         action='store_true', help='enable JSON output')
+    parser.add_argument('--format', default='text', choices=sorted(REPORTERS),
+                        help='output format, ndjson prints each issue as soon '
+                             'as its file is linted')
     parser.add_argument('-s', '--stdin', default=False,
                         action='store_true', help='accept template from STDIN')
     parser.add_argument('--log', default=False,
@@ -64,71 +84,351 @@ def create_parser():
                         action='store_true', help='Version of j2lint')
     parser.add_argument('-stdout', '--vv', default=False,
                         action='store_true', help='stdout logging')
+    parser.add_argument('--jobs', default=1, type=jobs_count,
+                        help="number of processes used for linting, "
+                             "'auto' to use all the CPUs")
+    parser.add_argument('--cache-dir', dest='cache_dir', default=None,
+                        help='directory to cache the linting results')
+    parser.add_argument('--exclude', nargs='*', default=[],
+                        help='glob patterns of the files and directories '
+                             'not to lint')
+    parser.add_argument('--fail-fast', dest='fail_fast', default=False,
+                        action='store_true',
+                        help='stop linting at the first error, same as '
+                             '--max-errors 1')
+    parser.add_argument('--max-errors', dest='max_errors', default=None,
+                        type=max_errors_count, metavar='N',
+                        help='stop linting once N errors are found')
+    parser.add_argument('--shard', default=None, type=shard_argument,
+                        metavar='INDEX/COUNT',
+                        help='lint only one of COUNT shards of the files, '
+                             'balanced by file size')
+    parser.add_argument('--shard-timings', dest='shard_timings', default=None,
+                        metavar='FILE',
+                        help='balance the shards by the linting times of a '
+                             'timings.json file read by every shard')
+    parser.add_argument('--watch', default=False, action='store_true',
+                        help='lint the files again each time they change')
+    parser.add_argument('--changed-since', dest='changed_since', default=None,
+                        metavar='REF', help='lint only the files changed since '
+                                            'the git ref')
+    parser.add_argument('--staged', default=False, action='store_true',
+                        help='lint only the files staged in git')
+    parser.add_argument('--profile', default=False, action='store_true',
+                        help='report the time spent by each rule and on the '
+                             'slowest files to stderr')
+    parser.add_argument('--profile-format', dest='profile_format', default='text',
+                        choices=['text', 'json'], help='format of the profile report')
+    parser.add_argument('--socket', default=None,
+                        help='lint with the server listening on this Unix socket '
+                             'when available')
+
+    return parser
+
+
+def create_server_parser():
+    """Initializes a new argument parser object for the lint server
+
+    Returns:
+        Object: Argument parser object
+    """
+    parser = argparse.ArgumentParser(prog=f"{NAME} server",
+                                     description="Jinja2 lint server")
+
+    parser.add_argument('--socket', required=True,
+                        help='Unix socket the server listens on')
+    parser.add_argument('--log', default=False,
+                        action='store_true', help='enable logging')
+    parser.add_argument('-d', '--debug', default=False,
+                        action='store_true', help='enable debug logs')
+    parser.add_argument('-stdout', '--vv', default=False,
+                        action='store_true', help='stdout logging')
+
+    return parser
+
+
+def create_merge_parser():
+    """Initializes a new argument parser object to merge the JSON reports
+
+    Returns:
+        Object: Argument parser object
+    """
+    parser = argparse.ArgumentParser(
+        prog=f"{NAME} merge-reports",
+        description="Merge the JSON reports of the shards into one JSON report")
+
+    parser.add_argument('reports', metavar='REPORT', nargs='+',
+                        help='JSON report written with --format json')
 
     return parser
 
 
-def sort_issues(issues):
-    """Sorted list of issues
+def max_errors_count(value):
+    """Converts the --max-errors command line value to a number of errors
 
     Args:
-        issues (list): list of issue dictionaries
+        value (string): number of errors
+
+    Raises:
+        argparse.ArgumentTypeError: Raises error if the value is not a
+                                    positive integer
 
     Returns:
-        list: list of sorted issue dictionaries
+        int: maximum number of errors
     """
-    issues.sort(
-        key=lambda issue: (
-            issue.filename,
-            issue.linenumber,
-            issue.rule.id
-        )
-    )
-    return issues
+    try:
+        max_errors = int(value)
+    except ValueError:
+        max_errors = 0
+    if max_errors < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected a positive integer and got '{value}'")
+    return max_errors
 
 
-def sort_and_print_issues(options, lint_issues, issue_type, json_output):
-    """ Sort and print linting errors """
-    total_issues = 0
-    if lint_issues:
-        for key, issues in lint_issues.items():
-            if not issues:
-                continue
-            if not total_issues and not options.json:
-                print(f"\nJINJA2 LINT {issue_type}")
-            total_issues = total_issues + len(issues)
-            sorted_issues = sort_issues(issues)
-            if options.json:
-                # pylint: disable = fixme
-                # FIXME - this is not doing the correct job as it will overwrite
-                # whatever is in the issue_type key in the dictionnary
-                # The outcome is that for json, only the last file errors are printed
-                json_output[issue_type] = ([json.loads(str(issue)) for issue in sorted_issues])
-            else:
-                print("************ File {}".format(key))
-                for j2_issue in sorted_issues:
-                    print("{}".format(j2_issue))
-    return total_issues, json_output
+def create_collection(options, all_rules=False):
+    """Collects the rules from the configuration
 
+    The modules of the ignored and unselected rules are not executed unless
+    all the rules are requested.
 
-def run(args=None):
-    """Runs jinja2 linter
+    Args:
+        options (Namespace): command line options
+        all_rules (bool, optional): load all the rules. Defaults to False.
+
+    Returns:
+        RulesCollection: rules collection
+    """
+    collection = RulesCollection(options.verbose)
+    for rulesdir in options.rules_dir:
+        if all_rules:
+            rules = RulesCollection.create_from_directory(
+                rulesdir, options.ignore, options.warn)
+        else:
+            rules = RulesCollection.create_from_directory(
+                rulesdir, options.ignore, options.warn, options.select, True)
+        collection.extend(rules)
+    return collection
+
+
+def shard_argument(value):
+    """Converts the --shard command line value with j2lint.shard.shard_spec
 
     Args:
-        args ([string], optional): Command line arguments. Defaults to None.
+        value (string): shard as `index/count`, the index starting at 1
 
     Returns:
-        int: 0 on success
+        tuple: shard index starting at 1 and shard count
     """
-    # pylint: disable = fixme
-    # FIXME - `j2lint -stdin tests/data/test.j2`
-    #         will return exit code 2 so that could be confusing.
-    #         `j2lint: error: argument -s/--stdin: ignored explicit argument 'tdin'`
-    parser = create_parser()
-    options = parser.parse_args(args if args is not None else sys.argv[1:])
+    # The shard module is only imported when the option is used
+    # pylint: disable = import-outside-toplevel
+    from j2lint.shard import shard_spec
+    return shard_spec(value)
 
-    # Enable logs
 
+def is_complete(errors, max_errors):
+    """Check if all the rules were run on a file, the rules being skipped once
+    the maximum number of errors is reached
+
+    Args:
+        errors (list): list of errors found in the file
+        max_errors (int): maximum number of errors of the file or None
+
+    Returns:
+        boolean: True if the issues of the file are complete and can be cached
+    """
+    return max_errors is None or len(errors) < max_errors
+
+
+def rename_issues(issues, file_name):
+    """Copies the issues of a file for a file with the same content
+
+    Args:
+        issues (list): list of LinterError objects
+        file_name (string): path of the file with the same content
+
+    Returns:
+        list: list of LinterError objects of the file
+    """
+    return [issue.with_filename(file_name) for issue in issues]
+
+
+def lint_files(collection, files, checked_files, cache=None):
+    """Lints the files one after the other in the current process
+
+    Each content is linted once. The issues of the first file linted with
+    each content are kept, a file with the same size and content hash or the
+    same inode gets a copy of these issues instead of being linted. The
+    files without issues share a single empty result.
+
+    Args:
+        collection (RulesCollection): rules collection
+        files (iterable): file paths, consumed as the files are linted
+        checked_files (set): set of already checked file paths
+        cache (ResultCache, optional): the issues of the cached files are
+                                       replayed and the other files are
+                                       added to the cache. Defaults to None.
+
+    Yields:
+        tuple: file path, list of errors and list of warnings
+    """
+    duplicates = DuplicateFinder()
+    # Issues indexed by the first file found with each content
+    issues_by_content = {}
+    for file_name in files:
+        original = duplicates.find(file_name)
+        if original == file_name:
+            continue
+        if original in issues_by_content:
+            j2_errors, j2_warnings = issues_by_content[original]
+            yield (file_name, rename_issues(j2_errors, file_name),
+                   rename_issues(j2_warnings, file_name))
+            continue
+        cached_issues = cache.get(file_name) if cache else None
+        if cached_issues is not None:
+            j2_errors, j2_warnings = cached_issues
+        else:
+            start = perf_counter()
+            runner = Runner(collection, file_name, checked_files)
+            j2_errors, j2_warnings = runner.run()
+            if cache and is_complete(j2_errors, collection.max_errors):
+                cache.put(file_name, j2_errors, j2_warnings, perf_counter() - start)
+        issues_by_content[file_name] = ((j2_errors, j2_warnings)
+                                        if j2_errors or j2_warnings else NO_ISSUES)
+        yield file_name, j2_errors, j2_warnings
+
+
+def lint_in_parallel(collection, options, files, cache=None):
+    """Lints the files on a process pool
+
+    The issues of the cached files are replayed first. The files with the
+    same content are linted once.
+
+    Args:
+        collection (RulesCollection): rules collection
+        options (Namespace): command line options
+        files (list): files to lint
+        cache (ResultCache, optional): cache of the linting issues. Defaults to None.
+
+    Yields:
+        tuple: file path, list of errors and list of warnings
+    """
+    # Replay the linting issues of the files found in the cache
+    if cache:
+        uncached_files = []
+        for file_name in files:
+            cached_issues = cache.get(file_name)
+            if cached_issues is None:
+                uncached_files.append(file_name)
+                continue
+            yield file_name, cached_issues[0], cached_issues[1]
+        files = uncached_files
+    duplicate_files = DuplicateFinder().group(files)
+
+    # A single file is linted in process, the duplicate files are found again
+    # while linting
+    if len(duplicate_files) <= 1:
+        files = (file_name for original in duplicate_files
+                 for file_name in [original] + duplicate_files[original])
+        yield from lint_files(collection, files, set(), cache)
+        return
+
+    # multiprocessing is only imported to lint in parallel
+    # The workers are terminated when the generator is closed before the end
+    # pylint: disable = import-outside-toplevel
+    from j2lint.linter.parallel import run_parallel
+    timings = {}
+    with contextlib.closing(run_parallel(
+            collection, list(duplicate_files), options, options.jobs, timings)) as results:
+        for file_name, j2_errors, j2_warnings in results:
+            if cache and is_complete(j2_errors, options.max_errors):
+                cache.put(file_name, j2_errors, j2_warnings, timings.get(file_name))
+            yield file_name, j2_errors, j2_warnings
+            for duplicate_file in duplicate_files[file_name]:
+                yield (duplicate_file, rename_issues(j2_errors, duplicate_file),
+                       rename_issues(j2_warnings, duplicate_file))
+
+
+def lint_in_process(collection, options, file_or_dir_names, stdin_text):
+    """Lints the files and the STDIN template in the current process
+
+    The files are linted one after the other as they are found, unless they
+    are linted in parallel. The files with the same content are linted once.
+
+    Args:
+        collection (RulesCollection): rules collection
+        options (Namespace): command line options
+        file_or_dir_names (set): files or directories to lint
+        stdin_text (string): template read from STDIN or None
+
+    Yields:
+        tuple: file path, list of errors and list of warnings
+    """
+    checked_files = set()
+    files = iter_files(sorted(file_or_dir_names), options.exclude)
+    cache = None
+    if options.cache_dir:
+        cache = ResultCache(options.cache_dir, collection, options.rules_dir)
+
+    # The cache index is saved even when the linting stops early
+    try:
+        if options.jobs > 1:
+            yield from lint_in_parallel(collection, options, list(files), cache)
+        else:
+            yield from lint_files(collection, files, checked_files, cache)
+    finally:
+        if cache:
+            cache.save()
+
+    # Lint the template read from STDIN in memory
+    if stdin_text is not None:
+        j2_errors, j2_warnings = lint_text(stdin_text, STDIN_FILENAME, collection)
+        yield STDIN_FILENAME, j2_errors, j2_warnings
+
+
+def lint_with_server(options, file_or_dir_names, stdin_text):
+    """Lints the files and the STDIN template with the lint server
+
+    Args:
+        options (Namespace): command line options
+        file_or_dir_names (set): files or directories to lint
+        stdin_text (string): template read from STDIN or None
+
+    Returns:
+        tuple: list of the rules and list of the file path, list of errors and
+               list of warnings of each file or None if the server is not
+               available
+    """
+    # pylint: disable = import-outside-toplevel
+    from j2lint.server import request_lint, load_rules_metadata
+    request = {"cwd": os.getcwd(),
+               "paths": list(file_or_dir_names),
+               "rules_dir": options.rules_dir,
+               "ignore": options.ignore,
+               "warn": options.warn,
+               "select": options.select,
+               "exclude": options.exclude}
+    if stdin_text is not None:
+        request["text"] = stdin_text
+        request["filename"] = STDIN_FILENAME
+    response = request_lint(options.socket, request)
+    if response is None:
+        return None
+    rules_by_id = load_rules_metadata(response["rules"])
+    return list(rules_by_id.values()), [(result["filename"],
+             [LinterError.from_dict(error, rules_by_id[error["id"]])
+              for error in result["errors"]],
+             [LinterError.from_dict(warning, rules_by_id[warning["id"]])
+              for warning in result["warnings"]])
+            for result in response["results"]]
+
+
+def enable_logs(options):
+    """Enables the logs selected by the command line options
+
+    Args:
+        options (Namespace): command line options
+    """
     if not options.log and not options.vv:
         logging.disable(sys.maxsize)
 
@@ -141,26 +441,276 @@ def run(args=None):
         if options.vv:
             add_handler(logger, True, log_level)
 
-    logger.debug("Lint options selected {}".format(options))
 
-    stdin_filename = None
-    file_or_dir_names = set(options.files)
-    checked_files = set()
+def set_output_options(options):
+    """Sets the output selected by the command line options
 
-    if options.stdin and not sys.stdin.isatty():
-        with tempfile.NamedTemporaryFile('w', suffix='.j2', delete=False) as stdin_tmpfile:
-            stdin_tmpfile.write(sys.stdin.read())
-            stdin_filename = stdin_tmpfile.name
-            file_or_dir_names.add(stdin_filename)
+    Args:
+        options (Namespace): command line options
+    """
+    # Print verbose output for linting
+    if options.verbose:
+        settings.verbose = True
+        logger.debug("Verbose mode enabled")
 
-    # Collect the rules from the configuration
-    collection = RulesCollection(options.verbose)
-    for rulesdir in options.rules_dir:
-        collection.extend(RulesCollection.create_from_directory(
-            rulesdir, options.ignore, options.warn))
+    if options.fail_fast:
+        options.max_errors = 1
+
+    if options.json:
+        options.format = "json"
+    options.json = options.format == "json"
+
+    if options.json:
+        settings.output = "json"
+        logger.debug("JSON output enabled")
+
+
+def run_server(args):
+    """Runs the lint server until interrupted
+
+    Args:
+        args ([string]): Command line arguments following `server`
+
+    Returns:
+        int: 0 on success
+    """
+    # pylint: disable = import-outside-toplevel
+    from j2lint.server import serve
+    options = create_server_parser().parse_args(args)
+    enable_logs(options)
+    try:
+        serve(options.socket)
+    except OSError as e:
+        print(f"{NAME}: error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def get_changed_file_names(parser, options, file_or_dir_names):
+    """Gets the files changed in git selected with --changed-since or --staged
+
+    Args:
+        parser (ArgumentParser): parser reporting the git errors
+        options (Namespace): command line options
+        file_or_dir_names (set): paths the changed files are searched under
+
+    Returns:
+        set: changed files
+    """
+    changed_files = set()
+    try:
+        changed_files = set(get_changed_files(
+            options.changed_since, options.staged, sorted(file_or_dir_names)))
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", None)
+        parser.error("unable to get the changed files from git: {}".format(
+            stderr.strip() if stderr else e))
+    return changed_files
+
+
+def get_shard_files(parser, options, file_or_dir_names):
+    """Gets the files of the shard selected with --shard
+
+    Args:
+        parser (ArgumentParser): parser reporting the unreadable shard timings
+        options (Namespace): command line options
+        file_or_dir_names (set): files and directories to lint
+
+    Returns:
+        set: files of the shard
+    """
+    # pylint: disable = import-outside-toplevel
+    from j2lint.shard import get_shard, read_timings
+    timings = None
+    if options.shard_timings:
+        # A shard which cannot read the timings would not agree with the
+        # other shards
+        try:
+            timings = read_timings(options.shard_timings)
+        except (IOError, ValueError) as e:
+            parser.error(f"unable to read the shard timings {options.shard_timings}: {e}")
+    shard_files = set(get_shard(
+        get_files(sorted(file_or_dir_names), options.exclude), options.shard, timings))
+    logger.debug("Linting shard %d/%d: %d files", options.shard[0],
+                 options.shard[1], len(shard_files))
+    return shard_files
+
+
+def start_linting(options, file_or_dir_names, stdin_text):
+    """Starts linting the files, with the lint server when it is available
+
+    The linting is profiled in process.
+
+    Args:
+        options (Namespace): command line options
+        file_or_dir_names (set): files and directories to lint
+        stdin_text (string): text read from stdin, or None
+
+    Returns:
+        tuple: the rules collection, None when linted by the server, the list
+               of the rules and an iterator of the file names and their errors
+               and warnings
+    """
+    if options.socket and not options.profile:
+        server_results = lint_with_server(options, file_or_dir_names, stdin_text)
+        if server_results is not None:
+            rules, results = server_results
+            return None, rules, results
+    collection = create_collection(options)
+    if options.profile:
+        collection.profiler = Profiler()
+    collection.max_errors = options.max_errors
+    results = lint_in_process(collection, options, file_or_dir_names, stdin_text)
+    return collection, list(collection), results
+
+
+def report_results(options, collection, rules, results):
+    """Reports the linting issues as the files are linted, until the maximum
+    number of errors is reached
+
+    Args:
+        options (Namespace): command line options
+        collection (RulesCollection): rules collection linting in process, or
+                                      None when linted by the server
+        rules (list): list of the rules
+        results (iterator): file names and their errors and warnings
+
+    Returns:
+        Reporter: the finished reporter
+    """
+    reporter = REPORTERS[options.format](options)
+    reporter.start(rules)
+    for file_name, j2_errors, j2_warnings in results:
+        if options.max_errors is not None:
+            remaining_errors = options.max_errors - reporter.total_errors
+            if len(j2_errors) >= remaining_errors:
+                reporter.truncated = True
+                j2_errors = j2_errors[:remaining_errors]
+        reporter.report_file(file_name, j2_errors, j2_warnings)
+        if reporter.truncated:
+            logger.info("Maximum number of errors reached, linting stopped")
+            break
+        if collection is not None and options.max_errors is not None:
+            # The next file is only linted until the remaining errors are found
+            collection.max_errors = options.max_errors - reporter.total_errors
+    if reporter.truncated and collection is not None:
+        # Stop linting the files still scheduled
+        results.close()
+    reporter.finish()
+    return reporter
+
+
+def get_exit_code(reporter):
+    """Gets the exit code of the linting
+
+    Args:
+        reporter (Reporter): the finished reporter
+
+    Returns:
+        int: 3 when the linting stopped before all the files were linted,
+             2 when errors were found, else 0
+    """
+    if reporter.truncated:
+        return 3
+    if reporter.total_errors:
+        return 2
+    return 0
+
+
+def watch_files(options, file_or_dir_names):
+    """Lints the files then lints them again each time they change, until
+    interrupted
+
+    Args:
+        options (Namespace): command line options
+        file_or_dir_names (set): files or directories to watch
+
+    Returns:
+        int: 0 once interrupted
+    """
+    # pylint: disable = import-outside-toplevel
+    from j2lint.watch import watch
+    collection = create_collection(options)
+
+    def lint_changes(file_names):
+        reporter = REPORTERS[options.format](options)
+        reporter.start(list(collection))
+        for file_name in file_names:
+            j2_errors, j2_warnings = collection.run(
+                {'path': file_name, 'type': get_file_type(file_name)})
+            reporter.report_file(file_name, j2_errors, j2_warnings)
+        reporter.finish()
+        sys.stdout.flush()
+
+    watch(lint_changes, file_or_dir_names, options.exclude)
+    return 0
+
+
+def run_merge_reports(args):
+    """Prints the merged JSON reports of the shards
+
+    Args:
+        args ([string]): Command line arguments following `merge-reports`
+
+    Returns:
+        int: 0 if there are no errors, 2 if there are errors, 3 if a shard was
+             truncated
+    """
+    # pylint: disable = import-outside-toplevel
+    from j2lint.shard import merge_reports
+    parser = create_merge_parser()
+    options = parser.parse_args(args)
+    reports = []
+    for report_file in options.reports:
+        try:
+            with open(report_file, mode="r", encoding="utf-8") as f:
+                reports.append(json.load(f))
+        except (IOError, ValueError) as e:
+            parser.error(f"unable to read the report {report_file}: {e}")
+    merged = merge_reports(reports)
+    print(json.dumps(merged))
+    if merged.get("TRUNCATED"):
+        return 3
+    if merged["ERRORS"]:
+        return 2
+    return 0
+
+
+# Commands run instead of linting, by first command line argument
+SUBCOMMANDS = {
+    "server": run_server,
+    "merge-reports": run_merge_reports,
+}
+
+
+def run(args=None):
+    """Runs jinja2 linter
+
+    Args:
+        args ([string], optional): Command line arguments. Defaults to None.
+
+    Returns:
+        int: 0 on success
+    """
+    # pylint: disable = fixme
+    # FIXME - `j2lint -stdin tests/data/test.j2`
+    #         will return exit code 2 so that could be confusing.
+    #         `j2lint: error: argument -s/--stdin: ignored explicit argument 'tdin'`
+    args = args if args is not None else sys.argv[1:]
+    if args and args[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[args[0]](args[1:])
+
+    parser = create_parser()
+    options = parser.parse_args(args)
+
+    # Enable logs
+    enable_logs(options)
+
+    logger.debug("Lint options selected %s", options)
 
     # List lint rules
     if options.list:
+        collection = create_collection(options, all_rules=True)
         rules = "Jinja2 lint rules\n{}\n".format(collection)
         print(rules)
         logger.debug(rules)
@@ -171,53 +721,36 @@ def run(args=None):
         print(f"Jinja2-Linter Version {VERSION}")
         return 0
 
+    stdin_text = None
+    file_or_dir_names = set(options.files)
+
+    if options.stdin and not sys.stdin.isatty():
+        stdin_text = sys.stdin.read()
+
     # Print help message
-    if not file_or_dir_names:
+    lint_changed_files = options.changed_since is not None or options.staged
+    if not file_or_dir_names and stdin_text is None and not lint_changed_files:
         parser.print_help(file=sys.stderr)
         return 1
 
-    # Print verbose output for linting
-    if options.verbose:
-        settings.verbose = True
-        logger.debug("Verbose mode enabled")
-
-    if options.json:
-        settings.output = "json"
-        logger.debug("JSON output enabled")
+    # Lint only the files changed in git, under the given paths if any
+    if lint_changed_files:
+        file_or_dir_names = get_changed_file_names(parser, options, file_or_dir_names)
 
-    lint_errors = {}
-    lint_warnings = {}
-    files = get_files(file_or_dir_names)
+    # Lint only the files of the shard
+    if options.shard:
+        file_or_dir_names = get_shard_files(parser, options, file_or_dir_names)
 
-    # Get linting issues
-    for file_name in files:
-        runner = Runner(collection, file_name, checked_files)
-        if file_name not in lint_errors:
-            lint_errors[file_name] = []
-        if file_name not in lint_warnings:
-            lint_warnings[file_name] = []
-        j2_errors, j2_warnings = runner.run()
-        lint_errors[file_name].extend(j2_errors)
-        lint_warnings[file_name].extend(j2_warnings)
-
-    # Remove temporary file
-    if stdin_filename:
-        os.unlink(stdin_filename)
+    set_output_options(options)
 
-    # Sort and print linting issues
-    json_output = {}
+    # Lint the files each time they change until interrupted
+    if options.watch:
+        return watch_files(options, file_or_dir_names)
 
-    total_errors, json_output = sort_and_print_issues(options, lint_errors, 'ERRORS', json_output)
-    total_warnings, json_output = sort_and_print_issues(options, lint_warnings, 'WARNINGS', json_output)
+    collection, rules, results = start_linting(options, file_or_dir_names, stdin_text)
+    reporter = report_results(options, collection, rules, results)
 
-    if options.json:
-        print(json.dumps(json_output))
-    elif not total_errors and not total_warnings:
-        print("Linting complete. No problems found.")
-    else:
-        print(f"Jinja2 linting finished with "
-              f"{total_errors} issue(s) and {total_warnings} warning(s)")
+    if options.profile:
+        print(collection.profiler.format(options.profile_format), file=sys.stderr)
 
-    if total_errors:
-        return 2
-    return 0
+    return get_exit_code(reporter)
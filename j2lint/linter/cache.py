@@ -0,0 +1,247 @@
+"""cache.py - Class to cache the linting results of the files on disk.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from j2lint import VERSION
+from j2lint.linter.error import LinterError
+from j2lint.logger import logger
+
+INDEX_FILE = "index.json"
+TIMINGS_FILE = "timings.json"
+FINGERPRINT_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+# The results of other rules settings are kept for the most recently used
+# fingerprints, unless they were not used for this number of seconds
+MAX_FINGERPRINTS = 8
+MAX_FINGERPRINT_AGE = 30 * 24 * 3600
+
+
+def get_file_digest(file_path):
+    """Returns the hash of the file content
+
+    Args:
+        file_path (string): file path
+
+    Returns:
+        string: sha256 hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1048576), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_rules_fingerprint(collection, rules_dirs):
+    """Returns a fingerprint of the loaded rules
+
+    The fingerprint changes when a rule is added, removed, ignored or set
+    as a warning, when a plugin source file changes or when j2lint is
+    upgraded.
+
+    Args:
+        collection (RulesCollection): rules collection
+        rules_dirs (list): rules directories the collection was loaded from
+
+    Returns:
+        string: sha256 hex digest of the rules settings
+    """
+    plugins = []
+    for rules_dir in rules_dirs:
+        pattern = os.path.join(os.path.expanduser(rules_dir), '[A-Za-z]*.py')
+        for plugin_file in sorted(glob.glob(pattern)):
+            plugins.append(get_file_digest(plugin_file))
+    rules = sorted([rule.id, rule.short_description, rule.ignore,
+                    rule in rule.warn] for rule in collection)
+    fingerprint = json.dumps([VERSION, plugins, rules])
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def load_timings(cache_dir):
+    """Returns the time spent linting each file on the last runs
+
+    Args:
+        cache_dir (string): cache directory
+
+    Returns:
+        dict: linting time in seconds indexed by file path, empty if the
+              cache has no timings
+    """
+    try:
+        with open(os.path.join(cache_dir, TIMINGS_FILE), mode="r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+class ResultCache:
+    """Class to store the linting results of the files on disk
+
+    The results are stored by file content hash in a directory named after
+    the rules fingerprint. An index maps each file path to the modification
+    time, size and content hash seen on the last run so that the files which
+    were not modified are not hashed again. The time spent linting each file
+    is kept whatever the rules, to balance the shards.
+    """
+
+    def __init__(self, cache_dir, collection, rules_dirs):
+        self.cache_dir = cache_dir
+        self.fingerprint = get_rules_fingerprint(collection, rules_dirs)
+        self.directory = os.path.join(cache_dir, self.fingerprint)
+        self.rules_by_id = {rule.id: rule for rule in collection}
+        self.index = {}
+        self.timings = load_timings(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), mode="r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (IOError, ValueError):
+            logger.debug("No cache index found in %s", self.directory)
+
+    def get_digest(self, file_path):
+        """Returns the content hash of a file using the index when the file
+        modification time and size did not change
+
+        Args:
+            file_path (string): file path
+
+        Returns:
+            string: content hash of the file or None if it cannot be read
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        entry = self.index.get(file_path)
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["digest"]
+        try:
+            digest = get_file_digest(file_path)
+        except IOError:
+            return None
+        self.index[file_path] = {"mtime": stat.st_mtime_ns,
+                                 "size": stat.st_size,
+                                 "digest": digest}
+        return digest
+
+    def get(self, file_path):
+        """Returns the cached linting results of a file
+
+        Args:
+            file_path (string): file path
+
+        Returns:
+            tuple: list of errors and list of warnings or None on cache miss
+        """
+        digest = self.get_digest(file_path)
+        if digest is None:
+            self.misses += 1
+            return None
+        try:
+            with open(os.path.join(self.directory, digest + ".json"), mode="r", encoding="utf-8") as f:
+                entry = json.load(f)
+            results = tuple(
+                [LinterError.from_dict(dict(issue, filename=file_path),
+                                       self.rules_by_id[issue["id"]])
+                 for issue in entry[key]]
+                for key in ("errors", "warnings"))
+        except (IOError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return results
+
+    def put(self, file_path, errors, warnings, seconds=None):
+        """Stores the linting results of a file
+
+        Args:
+            file_path (string): file path
+            errors (list): list of LinterError objects
+            warnings (list): list of LinterError objects
+            seconds (float, optional): time spent linting the file.
+                                       Defaults to None.
+        """
+        if seconds is not None:
+            self.timings[file_path] = seconds
+        entry = self.index.get(file_path)
+        if entry is None:
+            return
+        data = {}
+        for key, issues in (("errors", errors), ("warnings", warnings)):
+            data[key] = []
+            for issue in issues:
+                issue_dict = issue.to_dict()
+                del issue_dict["filename"]
+                data[key].append(issue_dict)
+        self.write_json(entry["digest"] + ".json", data)
+
+    def evict_fingerprints(self):
+        """Removes the least recently used directories of the other rules
+        fingerprints
+
+        A directory is last used when its index is written.
+        """
+        last_uses = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if (name == self.fingerprint or not FINGERPRINT_PATTERN.match(name)
+                    or not os.path.isdir(path)):
+                continue
+            try:
+                last_use = os.path.getmtime(os.path.join(path, INDEX_FILE))
+            except OSError:
+                last_use = os.path.getmtime(path)
+            last_uses.append((last_use, path))
+        # The current fingerprint is one of the most recently used ones
+        last_uses.sort(reverse=True)
+        oldest_use = time.time() - MAX_FINGERPRINT_AGE
+        for index, (last_use, path) in enumerate(last_uses):
+            if index >= MAX_FINGERPRINTS - 1 or last_use < oldest_use:
+                logger.debug("Evicting the cache directory %s", path)
+                shutil.rmtree(path, ignore_errors=True)
+
+    def write_json(self, file_name, data, directory=None):
+        """Atomically writes a JSON file in the cache directory
+
+        Args:
+            file_name (string): file name in the cache directory
+            data (object): JSON serializable data
+            directory (string, optional): directory to write the file to.
+                                          Defaults to the directory of the
+                                          rules fingerprint.
+        """
+        directory = directory or self.directory
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, os.path.join(directory, file_name))
+
+    def save(self):
+        """Writes the index and evicts the stale entries
+
+        Entries of deleted files and results no longer referenced by the
+        index are removed. The directories of other rules fingerprints are
+        removed when they were not used for MAX_FINGERPRINT_AGE seconds or
+        are not among the MAX_FINGERPRINTS most recently used ones.
+        """
+        self.index = {path: entry for path, entry in self.index.items()
+                      if os.path.exists(path)}
+        self.write_json(INDEX_FILE, self.index)
+        self.timings = {path: seconds for path, seconds in self.timings.items()
+                        if os.path.exists(path)}
+        self.write_json(TIMINGS_FILE, self.timings, self.cache_dir)
+        digests = {entry["digest"] for entry in self.index.values()}
+        for entry_file in glob.glob(os.path.join(self.directory, "*.json")):
+            name = os.path.basename(entry_file)[:-len(".json")]
+            if FINGERPRINT_PATTERN.match(name) and name not in digests:
+                os.unlink(entry_file)
+        self.evict_fingerprints()
+        logger.info("Result cache: %d hit(s), %d miss(es)", self.hits, self.misses)
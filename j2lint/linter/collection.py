@@ -1,12 +1,20 @@
 """collection.py - Class to create a collection of linting rules.
 """
 from collections import defaultdict
+import logging
+import mmap
 import os
 import sys
+from time import perf_counter
 
-from j2lint.utils import load_plugins, is_rule_disabled
+from j2lint.utils import load_plugins, RULE_METADATA
+from j2lint.linter.context import FileContext, LargeFileContext, create_environment
+from j2lint.linter.scanner import LineScanner
 from j2lint.logger import logger
 
+# Files from this size in bytes are memory mapped and checked line by line
+LARGE_FILE_SIZE = 16 * 1024 * 1024
+
 
 class RulesCollection:
     """RulesCollection class which checks the linting rules against a file.
@@ -15,6 +23,10 @@ class RulesCollection:
     def __init__(self, verbose=False):
         self.rules = []
         self.verbose = verbose
+        self.environment = None
+        self.profiler = None
+        self.large_file_size = LARGE_FILE_SIZE
+        self.max_errors = None
 
     def __iter__(self):
         return iter(self.rules)
@@ -32,6 +44,17 @@ class RulesCollection:
         """
         self.rules.extend(more)
 
+    def get_environment(self):
+        """Returns the jinja2 environment shared by all the files linted with
+        this collection, creating it on first use
+
+        Returns:
+            jinja2.Environment: jinja2 environment
+        """
+        if self.environment is None:
+            self.environment = create_environment()
+        return self.environment
+
     def run(self, file_dict):
         """Runs the linting rules for given file
 
@@ -42,36 +65,120 @@ class RulesCollection:
             list: list of linting errors found
         """
         text = ""
-        errors = []
-        warnings = []
 
         try:
+            if (self.large_file_size is not None
+                    and os.path.getsize(file_dict['path']) >= self.large_file_size):
+                return self.run_large_file(file_dict)
             with open(file_dict['path'], mode='r') as f:
                 text = f.read()
         except IOError as e:
             print("WARNING: Couldn't open %s - %s" %
                   (file_dict['path'], e.strerror), file=sys.stderr)
-            return errors, warnings
+            return [], []
+
+        return self.run_text(file_dict, text)
+
+    def run_large_file(self, file_dict):
+        """Runs the linting rules for a large file without reading it in
+        memory
+
+        The file is memory mapped and its lines are checked one at a time,
+        only the rules checking the whole text decode it at once.
+
+        Args:
+            file_dict (dict): file path and file type
+
+        Returns:
+            list: list of linting errors found
+        """
+        logger.debug("Linting large file %s", file_dict['path'])
+        with open(file_dict['path'], mode='rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return self.run_context(
+                file_dict, LargeFileContext(file_dict, buffer, self.get_environment))
+
+    def run_text(self, file_dict, text):
+        """Runs the linting rules for the given text without accessing the
+        file system
+
+        Args:
+            file_dict (dict): file path and file type
+            text (string): text of the file
+
+        Returns:
+            list: list of linting errors found
+        """
+        # The context is shared by all the rules so the text is only
+        # split and searched for jinja elements once
+        return self.run_context(
+            file_dict, FileContext(file_dict, text, self.get_environment))
+
+    def run_context(self, file_dict, context):
+        """Runs the linting rules for the text of a file context
+
+        Args:
+            file_dict (dict): file path and file type
+            context (FileContext): context of the file
+
+        Returns:
+            list: list of linting errors found
+        """
+        errors = []
+        warnings = []
+        profiler = self.profiler
+        if profiler is not None:
+            file_start = perf_counter()
 
+        rules = []
         for rule in self.rules:
             if rule.ignore:
-                logger.debug("Ignoring rule {}:{} for file {}".format(
-                    rule.id, rule.short_description, file_dict['path']))
+                logger.debug("Ignoring rule %s:%s for file %s",
+                             rule.id, rule.short_description, file_dict['path'])
                 continue
-            if is_rule_disabled(text, rule):
-                logger.debug("Skipping linting rule {} on file {}".format(
-                    rule, file_dict['path']))
+            if context.pragmas.is_disabled(rule):
+                logger.debug("Skipping linting rule %s on file %s",
+                             rule, file_dict['path'])
                 continue
-            logger.debug("Running linting rule {} on file {}".format(
-                rule, file_dict['path']))
-            if rule in rule.warn:
-                warnings.extend(rule.checklines(file_dict, text))
-                warnings.extend(rule.checkfulltext(file_dict, text))
+            rules.append(rule)
+
+        # The line checks of the rules are run in a single pass over the lines
+        scanner = LineScanner(
+            [rule for rule in rules if rule.can_scan_lines(file_dict)])
+        max_errors = self.max_errors
+        line_issues = scanner.scan(file_dict, context, profiler, max_errors)
+
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for rule in rules:
+            # The remaining rules are skipped once enough errors are found
+            if max_errors is not None and len(errors) >= max_errors:
+                logger.debug("Maximum number of errors reached on file %s",
+                             file_dict['path'])
+                break
+            if debug:
+                logger.debug("Running linting rule %s on file %s", rule, file_dict['path'])
+            issues = warnings if rule in rule.warn else errors
+            if profiler is not None:
+                start = perf_counter()
+            if rule in line_issues:
+                rule_issues = line_issues[rule]
             else:
-                errors.extend(rule.checklines(file_dict, text))
-                errors.extend(rule.checkfulltext(file_dict, text))
-        for error in errors:
-            logger.error(error)
+                rule_issues = list(rule.checklines(file_dict, context))
+            rule_issues.extend(rule.checkfulltext(file_dict, context))
+            # The issues on the lines where the rule is disabled are dropped
+            issues.extend(context.pragmas.filter_issues(rule, rule_issues))
+            if profiler is not None:
+                # The line checks run by the scanner are already added
+                profiler.add_rule(rule.id, perf_counter() - start,
+                                  0 if rule in line_issues else 1)
+        if max_errors is not None:
+            del errors[max_errors:]
+        if logger.isEnabledFor(logging.ERROR):
+            for error in errors:
+                logger.error("%s", error)
+        if profiler is not None:
+            profiler.add_file(file_dict['path'], context.size,
+                              perf_counter() - file_start)
         return errors, warnings
 
     def __repr__(self):
@@ -79,40 +186,73 @@ class RulesCollection:
                           for rule in sorted(self.rules, key=lambda x: x.id)])
 
     @classmethod
-    def create_from_directory(clazz, rules_dir, ignore_rules, warn_rules):
+    def create_from_directory(clazz, rules_dir, ignore_rules, warn_rules,
+                              select_rules=None, skip_ignored=False):
         """Creates a collection from all rule modules
 
         Args:
             clazz (Object): object of a rule class
             rules_dir (string): rules directory
             ignore_rules (list): list of rule descriptions to ignore
+            warn_rules (list): list of rule descriptions to warn
+            select_rules (list, optional): list of rule descriptions to run,
+                                           the other rules are ignored.
+                                           Defaults to None.
+            skip_ignored (bool, optional): do not execute the modules of the
+                                           ignored and unselected rules when
+                                           their id and descriptions can be
+                                           read statically. Defaults to False.
 
         Returns:
             list: a collection of rule objects
         """
         result = clazz()
-        result.rules = load_plugins(os.path.expanduser(rules_dir))
+        rules_dir = os.path.expanduser(rules_dir)
+        if skip_ignored:
+            def skip(metadata):
+                return is_rule_ignored(metadata, ignore_rules, select_rules)
+
+            result.rules = load_plugins(rules_dir, skip)
+        else:
+            result.rules = load_plugins(rules_dir)
         # FIXME: once the first version of j2lint is tagged and publish,
         #        remove the deprecated_short_description
         for rule in result.rules:
-            if (
-                rule.short_description in ignore_rules
-                or rule.id in ignore_rules
-                or (
-                    hasattr(rule, "deprecated_short_description")
-                    and rule.deprecated_short_description in ignore_rules
-                )
-            ):
+            attributes = {key: getattr(rule, key, None) for key in RULE_METADATA}
+            if is_rule_ignored(attributes, ignore_rules, select_rules):
                 rule.ignore = True
-            if (
-                rule.short_description in warn_rules
-                or rule.id in warn_rules
-                or (
-                    hasattr(rule, "deprecated_short_description")
-                    and rule.deprecated_short_description in warn_rules
-                )
-            ):
+            if is_rule_named(attributes, warn_rules):
                 rule.warn.append(rule)
-        logger.info(
-            "Created collection from rules directory {}".format(rules_dir))
+        logger.info("Created collection from rules directory %s", rules_dir)
         return result
+
+
+def is_rule_named(rule_attributes, names):
+    """Check if the rule id or one of its descriptions is in the names
+
+    Args:
+        rule_attributes (dict): rule class attributes
+        names (list): list of rule ids and descriptions
+
+    Returns:
+        boolean: True if the rule is named
+    """
+    return any(rule_attributes.get(key) in names
+               for key in RULE_METADATA if rule_attributes.get(key) is not None)
+
+
+def is_rule_ignored(rule_attributes, ignore_rules, select_rules=None):
+    """Check if the rule is ignored or not selected
+
+    Args:
+        rule_attributes (dict): rule class attributes
+        ignore_rules (list): list of rule descriptions to ignore
+        select_rules (list, optional): list of rule descriptions to run.
+                                       Defaults to None.
+
+    Returns:
+        boolean: True if the rule must not run
+    """
+    if is_rule_named(rule_attributes, ignore_rules):
+        return True
+    return bool(select_rules) and not is_rule_named(rule_attributes, select_rules)
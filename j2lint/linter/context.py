@@ -0,0 +1,315 @@
+"""context.py - Class holding the text of a file and the jinja elements
+                extracted from it, shared by all the rules.
+"""
+from array import array
+import locale
+
+from j2lint.utils import (get_jinja_statements, get_jinja_variables,
+                          get_jinja_comments, get_line_offsets,
+                          get_buffer_pragmas, NEWLINE_PATTERN, CHUNK_SIZE)
+from j2lint.linter.pragma import PragmaMap
+
+JINJA_EXTENSIONS = ['jinja2.ext.do', 'jinja2.ext.loopcontrols']
+
+
+def create_environment():
+    """Creates the jinja2 environment used to parse the templates
+
+    Returns:
+        jinja2.Environment: environment with the do and loopcontrols extensions
+    """
+    # jinja2 is only imported once a template is parsed
+    # pylint: disable = import-outside-toplevel
+    import jinja2
+    return jinja2.Environment(extensions=JINJA_EXTENSIONS)
+
+
+class FileContext:
+    """Class holding the text of a file being linted
+
+    The lines, the jinja statements, variables, comments and pragmas and the
+    parsed template are computed the first time a rule asks for them and then shared
+    with the other rules.
+    """
+
+    def __init__(self, file, text, get_environment=None):
+        self.file = file
+        self.text = text
+        self.get_environment = get_environment or create_environment
+        self._parsed = False
+        self._ast = None
+        self._syntax_error = None
+        self._lines = None
+        self._line_offsets = None
+        self._statements = None
+        self._indentation_statements = None
+        self._variables = None
+        self._comments = None
+        self._pragmas = None
+        self._line_statements = {}
+        self._line_variables = {}
+
+    @classmethod
+    def from_text(cls, file, text):
+        """Returns a context for the text
+
+        Args:
+            file (dict): file path and file type
+            text (string or FileContext): file text or an existing context
+
+        Returns:
+            FileContext: context of the file
+        """
+        if isinstance(text, cls):
+            return text
+        return cls(file, text)
+
+    @property
+    def lines(self):
+        """list: lines of the file"""
+        if self._lines is None:
+            self._lines = self.text.split("\n")
+        return self._lines
+
+    @property
+    def line_offsets(self):
+        """list: offset in the text of the first character of each line"""
+        if self._line_offsets is None:
+            self._line_offsets = get_line_offsets(self.text)
+        return self._line_offsets
+
+    @property
+    def statements(self):
+        """list: jinja statements of the file"""
+        if self._statements is None:
+            self._statements = get_jinja_statements(
+                self.text, line_offsets=self.line_offsets)
+        return self._statements
+
+    @property
+    def indentation_statements(self):
+        """list: jinja statements starting a line, used for indentation"""
+        if self._indentation_statements is None:
+            self._indentation_statements = get_jinja_statements(
+                self.text, indentation=True, line_offsets=self.line_offsets)
+        return self._indentation_statements
+
+    @property
+    def variables(self):
+        """list: jinja variables of the file"""
+        if self._variables is None:
+            self._variables = get_jinja_variables(self.text)
+        return self._variables
+
+    @property
+    def comments(self):
+        """list: jinja comments of the file"""
+        if self._comments is None:
+            self._comments = get_jinja_comments(self.text)
+        return self._comments
+
+    @property
+    def size(self):
+        """int: size of the text in bytes"""
+        return len(self.text.encode('utf-8'))
+
+    @property
+    def pragmas(self):
+        """PragmaMap: rules disabled by the j2lint comments of the file"""
+        if self._pragmas is None:
+            self._pragmas = PragmaMap.from_text(self.text, self.line_offsets)
+        return self._pragmas
+
+    def get_line_statements(self, index):
+        """Returns the jinja statements of a single line
+
+        Args:
+            index (int): index of the line in the file, starting at 0
+
+        Returns:
+            list: jinja statements of the line
+        """
+        if index not in self._line_statements:
+            self._line_statements[index] = get_jinja_statements(self.lines[index])
+        return self._line_statements[index]
+
+    def get_line_variables(self, index):
+        """Returns the jinja variables of a single line
+
+        Args:
+            index (int): index of the line in the file, starting at 0
+
+        Returns:
+            list: jinja variables of the line
+        """
+        if index not in self._line_variables:
+            self._line_variables[index] = get_jinja_variables(self.lines[index])
+        return self._line_variables[index]
+
+    def parse(self):
+        """Parses the text with jinja2 once and stores the template AST or the
+        syntax error raised while parsing
+        """
+        if self._parsed:
+            return
+        # pylint: disable = import-outside-toplevel
+        import jinja2
+        try:
+            self._ast = self.get_environment().parse(self.text)
+        except jinja2.TemplateSyntaxError as e:
+            self._syntax_error = e
+        self._parsed = True
+
+    @property
+    def ast(self):
+        """jinja2.nodes.Template: AST of the template, None on syntax error"""
+        self.parse()
+        return self._ast
+
+    @property
+    def syntax_error(self):
+        """jinja2.TemplateSyntaxError: syntax error raised while parsing the
+        template, None if the syntax is correct"""
+        self.parse()
+        return self._syntax_error
+
+
+class BufferLines:
+    """Class reading the lines of an encoded text one at a time
+
+    The lines are decoded by chunks as they are iterated and only the last
+    one is kept, a line accessed by index is found by reading the text again
+    from the start.
+    """
+
+    def __init__(self, buffer, encoding):
+        self.buffer = buffer
+        self.encoding = encoding
+        self.index = None
+        self.line = None
+
+    def read_lines(self):
+        """Reads the lines of the buffer, decoding a chunk of lines at a time
+
+        Yields:
+            tuple: index and text of each line, without the line ending
+        """
+        buffer = self.buffer
+        size = len(buffer)
+        position = 0
+        index = 0
+        while True:
+            end = size
+            if position + CHUNK_SIZE < size:
+                # The chunk ends on a line end, unless the line is longer
+                end = buffer.rfind(b'\n', position, position + CHUNK_SIZE)
+                if end == -1:
+                    end = buffer.find(b'\n', position + CHUNK_SIZE)
+                    if end == -1:
+                        end = size
+            for line in str(buffer[position:end], self.encoding).split('\n'):
+                if line.endswith('\r'):
+                    line = line[:-1]
+                yield index, line
+                index += 1
+            if end == size:
+                return
+            position = end + 1
+
+    def __iter__(self):
+        for self.index, self.line in self.read_lines():
+            yield self.line
+
+    def __getitem__(self, index):
+        if index == self.index:
+            return self.line
+        for line_index, line in self.read_lines():
+            if line_index == index:
+                return line
+        raise IndexError(f"line index {index} out of range")
+
+
+class LargeFileContext(FileContext):
+    """Class holding a memory mapped file too large to be split in lines
+
+    The lines are decoded one at a time while they are checked and the jinja
+    elements of a line are dropped once the next line is checked. The whole
+    text is only decoded for the rules checking it, the pragmas are read from
+    the encoded text.
+    """
+
+    def __init__(self, file, buffer, get_environment=None, encoding=None):
+        self.buffer = buffer
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        super().__init__(file, None, get_environment)
+        self._lines = BufferLines(buffer, self.encoding)
+        self._line_index = None
+
+    @property
+    def text(self):
+        """string: text of the file, decoded on first use"""
+        if self._text is None:
+            self._text = str(self.buffer, self.encoding)
+            if "\r" in self._text:
+                self._text = self._text.replace("\r\n", "\n")
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text
+
+    @property
+    def size(self):
+        """int: size of the file in bytes"""
+        return len(self.buffer)
+
+    @property
+    def line_offsets(self):
+        """array: offset in the text of the first character of each line"""
+        if self._line_offsets is None:
+            self._line_offsets = array('q', [0])
+            self._line_offsets.extend(
+                m.end() for m in NEWLINE_PATTERN.finditer(self.text))
+        return self._line_offsets
+
+    @property
+    def pragmas(self):
+        """PragmaMap: rules disabled by the j2lint comments of the file"""
+        if self._pragmas is None:
+            self._pragmas = PragmaMap(get_buffer_pragmas(self.buffer))
+        return self._pragmas
+
+    def forget_lines(self, index):
+        """Drops the jinja elements of the lines checked before a line
+
+        Args:
+            index (int): index of the line being checked
+        """
+        if index != self._line_index:
+            self._line_statements.clear()
+            self._line_variables.clear()
+            self._line_index = index
+
+    def get_line_statements(self, index):
+        """Returns the jinja statements of the line being checked
+
+        Args:
+            index (int): index of the line in the file, starting at 0
+
+        Returns:
+            list: jinja statements of the line
+        """
+        self.forget_lines(index)
+        return super().get_line_statements(index)
+
+    def get_line_variables(self, index):
+        """Returns the jinja variables of the line being checked
+
+        Args:
+            index (int): index of the line in the file, starting at 0
+
+        Returns:
+            list: jinja variables of the line
+        """
+        self.forget_lines(index)
+        return super().get_line_variables(index)
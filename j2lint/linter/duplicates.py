@@ -0,0 +1,95 @@
+"""duplicates.py - Class to find the files having the same content as a file
+                  found before, to lint each content once.
+"""
+import os
+
+from j2lint.linter.cache import get_file_digest
+from j2lint.logger import logger
+
+
+class DuplicateFinder:
+    """Class recording the files as they are found and matching each file
+    with the first file found with the same content
+
+    The files reached through several paths, such as symbolic links, are
+    matched by device and inode. The other files are only hashed when a file
+    of the same size was found before.
+    """
+
+    def __init__(self):
+        self.inodes = {}
+        self.unhashed_files = {}
+        self.digests = {}
+
+    def get_digest_original(self, file_name, size):
+        """Records the content hash of a file
+
+        Args:
+            file_name (string): file path
+            size (int): file size in bytes
+
+        Returns:
+            string: first file found with the same size and content hash
+        """
+        try:
+            digest = get_file_digest(file_name)
+        except IOError:
+            return file_name
+        return self.digests.setdefault((size, digest), file_name)
+
+    def find(self, file_name):
+        """Records a file and returns the first file found with the same
+        content
+
+        Args:
+            file_name (string): file path
+
+        Returns:
+            string: path of the first file with the same content, the file
+                    path itself if it was already recorded, None if the
+                    content of the file was not found before
+        """
+        try:
+            stat = os.stat(file_name)
+        except OSError:
+            return None
+        key = (stat.st_dev, stat.st_ino)
+        if key in self.inodes:
+            original = self.inodes[key]
+        else:
+            self.inodes[key] = file_name
+            size = stat.st_size
+            if size not in self.unhashed_files:
+                # The first file of a size is not hashed unless another file
+                # of the same size is found
+                self.unhashed_files[size] = [file_name]
+                return None
+            for unhashed_file in self.unhashed_files[size]:
+                self.get_digest_original(unhashed_file, size)
+            self.unhashed_files[size] = []
+            original = self.get_digest_original(file_name, size)
+            if original == file_name:
+                return None
+            # The other paths of the file are matched with the first one too
+            self.inodes[key] = original
+        logger.debug("File %s has the same content as %s", file_name, original)
+        return original
+
+    def group(self, files):
+        """Groups the files by content
+
+        Args:
+            files (list): list of file paths
+
+        Returns:
+            dict: paths of the files with the same content indexed by the
+                  first path found with this content, in the files order
+        """
+        groups = {}
+        for file_name in files:
+            original = self.find(file_name)
+            if original is None:
+                groups[file_name] = []
+            elif original != file_name:
+                groups[original].append(file_name)
+        return groups
@@ -4,32 +4,80 @@ from j2lint.settings import settings
 from j2lint.logger import logger
 import json
 
+TEXT_FORMAT = u"{2}:{3} {5} ({6})"
+VERBOSE_FORMAT = u"Linting rule: {0}\nRule description: {1}\nError line: {2}:{3} {4}\nError message: {5}\n"
+
 
 class LinterError:
     """Class for lint errors.
+
+    The lint errors have no instance dictionary and the description of the
+    rule class is not stored when it is the error message. The message is
+    captured when the error is created, as rules may change their
+    description from line to line. The line is the line string of the file,
+    shared by the errors found on the same line. The error text is only
+    rendered when the error is printed.
     """
 
+    __slots__ = ("linenumber", "line", "filename", "rule", "_message")
+
     def __init__(self, linenumber, line, filename, rule, message=None):
         self.linenumber = linenumber
         self.line = line
         self.filename = filename
         self.rule = rule
-        self.message = rule.description if not message else message
+        message = message or rule.description
+        self._message = None if message == type(rule).description else message
+
+    @property
+    def message(self):
+        """Error message, the description of the rule class by default"""
+        return type(self.rule).description if self._message is None else self._message
+
+    def to_dict(self):
+        """Returns the lint error as a dictionary
+
+        Returns:
+            dict: lint error attributes with the rule id and severity
+        """
+        return {"id": self.rule.id,
+                "message": self.message,
+                "filename": self.filename,
+                "linenumber": self.linenumber,
+                "line": self.line,
+                "severity": self.rule.severity
+                }
+
+    def with_filename(self, filename):
+        """Returns a copy of the lint error found in another file
+
+        Args:
+            filename (string): file path of the copy
+
+        Returns:
+            LinterError: new lint error object
+        """
+        return LinterError(self.linenumber, self.line, filename, self.rule, self._message)
+
+    @classmethod
+    def from_dict(cls, error, rule):
+        """Creates a lint error from a dictionary returned by to_dict
+
+        Args:
+            error (dict): lint error attributes
+            rule (Rule): rule object matching the error id
+
+        Returns:
+            LinterError: new lint error object
+        """
+        return cls(error["linenumber"], error["line"], error["filename"],
+                   rule, error["message"])
 
     def __repr__(self, verbose=False):
         if settings.output == "json":
-            error = json.dumps({"id": self.rule.id,
-                                "message": self.message,
-                                "filename": self.filename,
-                                "linenumber": self.linenumber,
-                                "line": self.line,
-                                "severity": self.rule.severity
-                                })
+            error = json.dumps(self.to_dict())
         else:
-            if not settings.verbose:
-                formatstr = u"{2}:{3} {5} ({6})"
-            else:
-                formatstr = u"Linting rule: {0}\nRule description: {1}\nError line: {2}:{3} {4}\nError message: {5}\n"
+            formatstr = VERBOSE_FORMAT if settings.verbose else TEXT_FORMAT
             error = formatstr.format(self.rule.id, self.rule.description,
                                      self.filename, self.linenumber, self.line, self.message, self.rule.short_description)
         return error
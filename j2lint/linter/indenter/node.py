@@ -15,9 +15,6 @@ DEFAULT_WHITESPACES = 1
 BLOCK_START_INDENT = 0
 JINJA_START_DELIMITERS = ['{%-', '{%+']
 
-jinja_node_stack = []
-jinja_delimiter_stack = []
-
 
 class Node:
     """Node class which represents a jinja file as a tree
@@ -27,9 +24,12 @@ class Node:
     tag = None
     node_start = 0
     node_end = 0
-    children = []
     expected_indent = 0
 
+    def __init__(self):
+        self.children = []
+        self.parent = None
+
     def create_node(self, line, line_no, indent_level=0):
         """Initializes a Node class object
 
@@ -71,15 +71,16 @@ class Node:
                                         node.statement.end_delimiter),
                 message)
 
-    def check_indent_level(self, result, node):
+    def check_indent_level(self, result, node, node_stack):
         """check if the actual and expected indent level for a line match
 
         Args:
             result (list): list of tuples of indentation errors
             node (Node): Node object for which to check the level is correct
+            node_stack (list): stack of the currently open block nodes
         """
         actual = node.statement.begin
-        if len(jinja_node_stack) and jinja_node_stack[0].statement.start_delimiter in JINJA_START_DELIMITERS:
+        if len(node_stack) and node_stack[0].statement.start_delimiter in JINJA_START_DELIMITERS:
             BLOCK_START_INDENT = 1
         elif node.expected_indent == 0 and node.statement.start_delimiter in JINJA_START_DELIMITERS:
             BLOCK_START_INDENT = 1
@@ -100,6 +101,13 @@ class Node:
     def check_indentation(self, result, lines, line_no=0, indent_level=0):
         """Checks indentation for a list of lines
 
+        The tree is walked with an explicit stack of frames rather than with
+        recursion so that deeply nested templates do not hit the recursion
+        limit. Each frame holds the node whose block is being read, the
+        expected indent level of the lines of the block and the child node
+        to check once the block of the child is read. All the state is local
+        to the call so concurrent calls are safe.
+
         Args:
             result (list): list of indentation error tuples
             lines (list): lines which are to be checked for indentation
@@ -115,61 +123,84 @@ class Node:
         Returns:
             list: updates the 'result' list argument with indentation errors
         """
-        while line_no < len(lines):
+        node_stack = []
+        frames = [[self, indent_level, None]]
+        while True:
+            frame = frames[-1]
+            parent_node = frame[0]
+            if line_no >= len(lines):
+                frames.pop()
+                if not frames:
+                    return None
+                # The block of the child node is never closed
+                self.check_indent_level(result, frames[-1][2], node_stack)
+                raise JinjaLinterError(
+                    "Missing end tag for '{}'".format(node_stack[-1].tag))
+
             line = lines[line_no]
-            node = self.create_node(line, line_no, indent_level)
+            node = parent_node.create_node(line, line_no, frame[1])
             if node.tag in BEGIN_TAGS:
-                jinja_node_stack.append(node)
-                self.children.append(node)
-                line_no = node.check_indentation(
-                    result, lines, line_no + 1, indent_level + INDENT_SHIFT)
-                self.check_indent_level(result, node)
+                node_stack.append(node)
+                parent_node.children.append(node)
+                frame[2] = node
+                frames.append([node, frame[1] + INDENT_SHIFT, None])
+                line_no = line_no + 1
                 continue
             elif node.tag in END_TAGS:
-                if ('end' + jinja_node_stack[-1].tag) == node.tag:
-                    if len(jinja_node_stack) and jinja_node_stack[-1] != self:
+                if node_stack and ('end' + node_stack[-1].tag) == node.tag:
+                    if node_stack[-1] != parent_node:
+                        # The end tag closes the block of an ancestor
                         del node
-                        return line_no
-                    matchnode = jinja_node_stack[-1]
-                    matchnode.node_end = line_no
-                    node.node_end = line_no
-                    node.expected_indent = matchnode.expected_indent
-                    self.parent.children.append(node)
-                    if matchnode == self:
+                    else:
+                        matchnode = node_stack[-1]
+                        matchnode.node_end = line_no
+                        node.node_end = line_no
+                        node.expected_indent = matchnode.expected_indent
+                        parent_node.parent.children.append(node)
                         line_no = line_no + 1
-                        self.check_indent_level(result, node)
-                        jinja_node_stack.pop()
+                        self.check_indent_level(result, node, node_stack)
+                        node_stack.pop()
+                    frames.pop()
+                    if not frames:
                         return line_no
+                    self.check_indent_level(result, frames[-1][2], node_stack)
+                    continue
                 message = "Tag is out of order '{}'".format(node.tag)
-                error = self.create_indentation_error(node, message)
-                result.append(error)
-                raise JinjaLinterError(
-                    "Tag is out of order '{}'".format(node.tag))
+                if node_stack:
+                    error = self.create_indentation_error(node, message)
+                    result.append(error)
+                raise JinjaLinterError(message)
             elif node.tag in MIDDLE_TAGS:
-                begin_tag_tuple = get_tuple(
-                    JINJA_STATEMENT_TAG_NAMES, jinja_node_stack[-1].tag)
-                if node.tag in begin_tag_tuple:
-                    if jinja_node_stack[-1] != self:
+                begin_tag_tuple = None
+                if node_stack:
+                    begin_tag_tuple = get_tuple(
+                        JINJA_STATEMENT_TAG_NAMES, node_stack[-1].tag)
+                if begin_tag_tuple and node.tag in begin_tag_tuple:
+                    if node_stack[-1] != parent_node:
+                        # The middle tag belongs to the block of an ancestor
                         del node
-                        return line_no
-                    matchnode = jinja_node_stack[-1]
+                        frames.pop()
+                        if not frames:
+                            return line_no
+                        self.check_indent_level(result, frames[-1][2], node_stack)
+                        continue
+                    matchnode = node_stack[-1]
                     node.node_end = line_no
                     node.expected_indent = matchnode.expected_indent
-                    indent_level = node.expected_indent
+                    frame[1] = node.expected_indent
                     matchnode.parent.children.append(node)
                     node.parent = matchnode.parent
-                    line_no = node.check_indentation(
-                        result, lines, line_no + 1, indent_level + INDENT_SHIFT)
-                    self.check_indent_level(result, node)
+                    frame[2] = node
+                    frames.append([node, frame[1] + INDENT_SHIFT, None])
+                    line_no = line_no + 1
                     continue
-                else:
-                    message = "Unsupported tag '%s' found" % (node.tag)
+                message = "Unsupported tag '%s' found" % (node.tag)
+                if node_stack:
                     error = self.create_indentation_error(node, message)
                     result.append(error)
-                    raise JinjaLinterError(
-                        "Unsupported tag '%s' found" % (node.tag))
+                raise JinjaLinterError(message)
             else:
-                self.children.append(node)
+                parent_node.children.append(node)
                 line_no = line_no + 1
-                self.check_indent_level(result, node)
+                self.check_indent_level(result, node, node_stack)
                 continue
@@ -0,0 +1,159 @@
+"""parallel.py - Functions to run the rules collection on a pool of worker
+                 processes.
+"""
+import argparse
+import logging
+import os
+from time import perf_counter
+
+from j2lint.linter.collection import RulesCollection
+from j2lint.linter.error import LinterError
+from j2lint.linter.profile import Profiler
+from j2lint.linter.runner import Runner
+from j2lint.logger import logger
+
+# Rules collection loaded once in each worker process by init_worker
+worker_collection = None
+
+
+def jobs_count(value):
+    """Converts the --jobs command line value to a number of processes
+
+    Args:
+        value (string): number of jobs or 'auto'
+
+    Raises:
+        argparse.ArgumentTypeError: Raises error if the value is not a
+                                    positive integer or 'auto'
+
+    Returns:
+        int: number of worker processes to use
+    """
+    if value == "auto":
+        return os.cpu_count() or 1
+    try:
+        jobs = int(value)
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected a positive integer or 'auto' and got '{value}'")
+    return jobs
+
+
+def init_worker(rules_dirs, ignore_rules, warn_rules, verbose, log_disable_level,
+                profile=False, select_rules=None, max_errors=None):
+    """Loads the rules collection in a worker process
+
+    Args:
+        rules_dirs (list): rules directories
+        ignore_rules (list): list of rule descriptions to ignore
+        warn_rules (list): list of rule descriptions to warn
+        verbose (boolean): verbose flag of the collection
+        log_disable_level (int): logging level disabled in the parent process
+        profile (boolean, optional): profile the linting of each file.
+                                     Defaults to False.
+        select_rules (list, optional): list of rule descriptions to run.
+                                       Defaults to None.
+        max_errors (int, optional): maximum number of errors reported for a
+                                    file. Defaults to None.
+    """
+    # pylint: disable = global-statement
+    global worker_collection
+    if log_disable_level:
+        logging.disable(log_disable_level)
+    collection = RulesCollection(verbose)
+    for rules_dir in rules_dirs:
+        collection.extend(RulesCollection.create_from_directory(
+            rules_dir, ignore_rules, warn_rules, select_rules, True))
+    if profile:
+        collection.profiler = Profiler()
+    collection.max_errors = max_errors
+    worker_collection = collection
+
+
+def lint_file(file_name):
+    """Runs the worker rules collection on a single file
+
+    Args:
+        file_name (string): file path
+
+    Returns:
+        tuple: file path, list of error dictionaries, list of warning
+               dictionaries, profile dictionary of the file or None and
+               linting time in seconds
+    """
+    profile = None
+    if worker_collection.profiler is not None:
+        worker_collection.profiler = Profiler()
+    start = perf_counter()
+    runner = Runner(worker_collection, file_name, None)
+    errors, warnings = runner.run()
+    seconds = perf_counter() - start
+    if worker_collection.profiler is not None:
+        profile = worker_collection.profiler.to_dict()
+    return (file_name,
+            [error.to_dict() for error in errors],
+            [warning.to_dict() for warning in warnings],
+            profile,
+            seconds)
+
+
+def load_issues(issues, rules_by_id):
+    """Converts issue dictionaries back to LinterError objects
+
+    Args:
+        issues (list): list of issue dictionaries
+        rules_by_id (dict): rule objects indexed by rule id
+
+    Returns:
+        list: list of LinterError objects
+    """
+    return [LinterError.from_dict(issue, rules_by_id[issue["id"]])
+            for issue in issues]
+
+
+def run_parallel(collection, files, options, jobs, timings=None):
+    """Lints the files on a pool of worker processes
+
+    The results are yielded in the same order as the files. The profiles of
+    the files are merged into the profiler of the collection if any. Closing
+    the generator terminates the workers, cancelling the files not linted yet.
+
+    Args:
+        collection (RulesCollection): rules collection of the main process
+        files (list): list of file paths
+        options (Namespace): command line options used to load the rules
+        jobs (int): number of worker processes
+        timings (dict, optional): filled with the linting time of each file
+                                  before its results are yielded.
+                                  Defaults to None.
+
+    Yields:
+        tuple: file path, list of errors and list of warnings
+    """
+    # multiprocessing is only imported when the files are linted in parallel
+    # pylint: disable = import-outside-toplevel
+    import multiprocessing
+    rules_by_id = {rule.id: rule for rule in collection}
+    # Duplicate paths would only be linted once by the serial path
+    files = list(dict.fromkeys(files))
+    chunksize = max(1, len(files) // (jobs * 4))
+    if options.max_errors is not None:
+        # The results come back file by file to stop as soon as possible
+        chunksize = 1
+    logger.debug("Linting %d files with %d processes", len(files), jobs)
+    profiler = collection.profiler
+    initargs = (options.rules_dir, options.ignore, options.warn,
+                options.verbose, logging.root.manager.disable,
+                profiler is not None, options.select, options.max_errors)
+    with multiprocessing.Pool(jobs, init_worker, initargs) as pool:
+        for file_name, errors, warnings, profile, seconds in pool.imap(
+                lint_file, files, chunksize):
+            if profile is not None:
+                profiler.merge(profile)
+            if timings is not None:
+                timings[file_name] = seconds
+            yield (file_name,
+                   load_issues(errors, rules_by_id),
+                   load_issues(warnings, rules_by_id))
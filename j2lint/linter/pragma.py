@@ -0,0 +1,154 @@
+"""pragma.py - Class holding the rules disabled by the j2lint comments of a
+               file.
+"""
+import bisect
+
+from j2lint.utils import get_jinja_pragmas, RULE_METADATA
+
+NO_PRAGMAS = (False, frozenset(), ())
+
+
+class PragmaMap:
+    """Class indexing the j2lint pragmas of a file by rule id or description
+
+    - `j2lint: disable=<rule>` in a file without any `enable` of the rule
+      disables the rule for the whole file.
+    - `j2lint: disable=<rule>` followed by `j2lint: enable=<rule>` disables
+      the rule on the lines from the disable comment to the enable comment.
+      When the rule is enabled somewhere in the file, a `disable` without a
+      following `enable` disables the rule until the end of the file.
+    - `j2lint: disable-next-line=<rule>` disables the rule on the line
+      following the comment.
+    """
+
+    def __init__(self, pragmas):
+        self.pragmas_by_name = {}
+        for action, name, line in pragmas:
+            self.pragmas_by_name.setdefault(name, []).append((line, action))
+        self._rule_pragmas = {}
+
+    @classmethod
+    def from_text(cls, text, line_offsets=None):
+        """Returns the pragma map of the text
+
+        Args:
+            text (string): text of the file
+            line_offsets (list, optional): line start offsets of the text.
+                                           Defaults to None.
+
+        Returns:
+            PragmaMap: pragmas of the text
+        """
+        return cls(get_jinja_pragmas(text, line_offsets))
+
+    @staticmethod
+    def get_names(rule):
+        """Returns the names a rule can be disabled with
+
+        Args:
+            rule (Rule): rule
+
+        Returns:
+            list: rule id and descriptions
+        """
+        return [name for name in (getattr(rule, key, None) for key in RULE_METADATA)
+                if name]
+
+    def get_rule_pragmas(self, rule):
+        """Returns the lines where a rule is disabled, computed on first use
+
+        A rule can be disabled with its id and enabled again with one of its
+        descriptions.
+
+        Args:
+            rule (Rule): rule
+
+        Returns:
+            tuple: True if the rule is disabled for the whole file, set of the
+                   disabled line numbers and sorted list of the disabled
+                   line ranges
+        """
+        if not self.pragmas_by_name:
+            return NO_PRAGMAS
+        names = tuple(self.get_names(rule))
+        if names not in self._rule_pragmas:
+            pragmas = sorted(pragma for name in names
+                             for pragma in self.pragmas_by_name.get(name, ()))
+            next_lines = set()
+            ranges = []
+            range_start = None
+            enabled = False
+            for line, action in pragmas:
+                if action == "disable-next-line":
+                    next_lines.add(line + 1)
+                elif action == "disable":
+                    if range_start is None:
+                        range_start = line
+                else:
+                    enabled = True
+                    if range_start is not None:
+                        ranges.append((range_start, line))
+                        range_start = None
+            file_disabled = range_start is not None and not enabled
+            if range_start is not None and enabled:
+                # The last disable of a rule enabled before lasts until the
+                # end of the file
+                ranges.append((range_start, float("inf")))
+            self._rule_pragmas[names] = (file_disabled, next_lines, ranges)
+        return self._rule_pragmas[names]
+
+    def is_disabled(self, rule):
+        """Check if the rule is disabled for the whole file
+
+        Args:
+            rule (Rule): rule
+
+        Returns:
+            boolean: True if the rule is disabled
+        """
+        return self.get_rule_pragmas(rule)[0]
+
+    def has_line_pragmas(self, rule):
+        """Check if the rule is disabled on some lines of the file
+
+        Args:
+            rule (Rule): rule
+
+        Returns:
+            boolean: True if a line of the file disables the rule
+        """
+        _, next_lines, ranges = self.get_rule_pragmas(rule)
+        return bool(next_lines or ranges)
+
+    def is_line_disabled(self, rule, linenumber):
+        """Check if the rule is disabled on a line
+
+        Args:
+            rule (Rule): rule
+            linenumber (int): line number, starting at 1
+
+        Returns:
+            boolean: True if the rule is disabled on the line
+        """
+        _, next_lines, ranges = self.get_rule_pragmas(rule)
+        if linenumber in next_lines:
+            return True
+        # The ranges do not overlap, the candidate is the last one starting
+        # before or on the line
+        index = bisect.bisect_right(ranges, (linenumber, float("inf"))) - 1
+        return index >= 0 and linenumber <= ranges[index][1]
+
+    def filter_issues(self, rule, issues):
+        """Removes the issues of a rule on the lines where it is disabled
+
+        Args:
+            rule (Rule): rule which found the issues
+            issues (list): list of LinterError objects
+
+        Returns:
+            list: issues on the lines where the rule is enabled
+        """
+        if not self.has_line_pragmas(rule):
+            return issues
+        return [issue for issue in issues
+                if not self.is_line_disabled(rule, issue.linenumber)]
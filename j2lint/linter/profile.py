@@ -0,0 +1,138 @@
+"""profile.py - Class to measure the time spent by each rule and on each
+                file while linting.
+"""
+import heapq
+import json
+from time import perf_counter
+
+TOP_FILES = 10
+
+
+class Profiler:
+    """Class accumulating the linting times
+
+    The time of each rule is the cumulative time of its line and text checks,
+    its calls are the number of files it checked.
+    """
+
+    def __init__(self, top_files=TOP_FILES):
+        self.top_files = top_files
+        self.rules = {}
+        self.slowest_files = []
+        self.file_count = 0
+        self.total_bytes = 0
+        self.total_seconds = 0.0
+
+    def add_rule(self, rule_id, seconds, calls=1):
+        """Adds the time spent by a rule
+
+        Args:
+            rule_id (string): rule id
+            seconds (float): time spent in seconds
+            calls (int, optional): number of checks timed. Defaults to 1.
+        """
+        timing = self.rules.setdefault(rule_id, [0.0, 0])
+        timing[0] += seconds
+        timing[1] += calls
+
+    def add_file(self, path, size, seconds):
+        """Adds the time spent linting a file
+
+        Args:
+            path (string): file path
+            size (int): file size in bytes
+            seconds (float): time spent in seconds
+        """
+        self.file_count += 1
+        self.total_bytes += size
+        self.total_seconds += seconds
+        self.push_slow_file(seconds, path, size)
+
+    def push_slow_file(self, seconds, path, size):
+        """Keeps the file if it is one of the slowest files
+
+        Args:
+            seconds (float): time spent in seconds
+            path (string): file path
+            size (int): file size in bytes
+        """
+        entry = (seconds, path, size)
+        if len(self.slowest_files) < self.top_files:
+            heapq.heappush(self.slowest_files, entry)
+        else:
+            heapq.heappushpop(self.slowest_files, entry)
+
+    @staticmethod
+    def timed_check(function, timings, rule):
+        """Wraps a line check function to accumulate its time
+
+        Args:
+            function (function): check function
+            timings (dict): time in seconds indexed by rule
+            rule (Rule): rule the check belongs to
+
+        Returns:
+            function: timed check function
+        """
+        def timed_function(*args):
+            start = perf_counter()
+            result = function(*args)
+            timings[rule] += perf_counter() - start
+            return result
+        return timed_function
+
+    def to_dict(self):
+        """Returns the profile as a dictionary
+
+        Returns:
+            dict: totals, time and calls per rule id and slowest files
+        """
+        return {"files": self.file_count,
+                "bytes": self.total_bytes,
+                "seconds": self.total_seconds,
+                "bytes_per_second": (self.total_bytes / self.total_seconds
+                                     if self.total_seconds else 0.0),
+                "rules": {rule_id: {"seconds": seconds, "calls": calls}
+                          for rule_id, (seconds, calls) in sorted(
+                              self.rules.items(), key=lambda item: -item[1][0])},
+                "slowest_files": [{"path": path, "bytes": size, "seconds": seconds}
+                                  for seconds, path, size in sorted(
+                                      self.slowest_files, reverse=True)]}
+
+    def merge(self, profile):
+        """Adds the times of a profile returned by to_dict
+
+        Args:
+            profile (dict): profile dictionary
+        """
+        for rule_id, timing in profile["rules"].items():
+            self.add_rule(rule_id, timing["seconds"], timing["calls"])
+        self.file_count += profile["files"]
+        self.total_bytes += profile["bytes"]
+        self.total_seconds += profile["seconds"]
+        for slow_file in profile["slowest_files"]:
+            self.push_slow_file(slow_file["seconds"], slow_file["path"], slow_file["bytes"])
+
+    def format(self, output="text"):
+        """Formats the profile report
+
+        Args:
+            output (string, optional): text or json. Defaults to "text".
+
+        Returns:
+            string: profile report
+        """
+        profile = self.to_dict()
+        if output == "json":
+            return json.dumps({"profile": profile})
+        lines = [f"Profile: {profile['files']} file(s), {profile['bytes']} bytes "
+                 f"in {profile['seconds']:.3f}s "
+                 f"({profile['bytes_per_second'] / 1024:.1f} KiB/s)",
+                 f"{'Rule':<8} {'Calls':>8} {'Time (s)':>10}"]
+        for rule_id, timing in profile["rules"].items():
+            lines.append(f"{rule_id:<8} {timing['calls']:>8} {timing['seconds']:>10.4f}")
+        lines.append("Slowest files")
+        for slow_file in profile["slowest_files"]:
+            lines.append(f"{slow_file['seconds']:>10.4f}s {slow_file['bytes']:>10} bytes "
+                         f"{slow_file['path']}")
+        return "\n".join(lines)
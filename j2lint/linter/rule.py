@@ -5,18 +5,28 @@ import re
 
 from j2lint.utils import is_valid_file_type, LANGUAGE_JINJA
 from j2lint.linter.error import LinterError
+from j2lint.linter.context import FileContext
+from j2lint.linter.scanner import LineScanner
 from j2lint.logger import logger
 
 
 class Rule:
     """Rule class which acts as a base class for rules with regex match
        functions.
+
+    Rules implement check_line(context, index) and/or check_text(context)
+    which receive the FileContext shared by all the rules. The legacy
+    check(file, line) and checktext(file, text) functions are still called
+    with the raw line and text for the rules not implementing them.
     """
 
     id = None
     description = None
     check = None
     checktext = None
+    check_line = None
+    check_text = None
+    line_markers = None
     ignore = False
     warn = []
 
@@ -27,77 +37,83 @@ class Rule:
         """Check if the file is a valid Jinja file
 
         Args:
-            file (string): file path
+            file (dict): file path and optional file type
 
         Returns:
-            boolean: True if file extension is correct
+            boolean: True if file type or file extension is correct
 
         TODO: refactor to use the j2lint.utils.is_valid_language
         """
 
-        if is_valid_file_type(file["path"]):
+        if file.get("type") == LANGUAGE_JINJA or is_valid_file_type(file["path"]):
             return True
         return False
 
+    def can_scan_lines(self, file):
+        """Check if the line checks of the rule can be run by a LineScanner
+        shared with other rules for the given file
+
+        Args:
+            file (dict): file path and file type
+
+        Returns:
+            boolean: True if the rule has a line check and does not override
+                     checklines
+        """
+        return (bool(self.check_line or self.check)
+                and type(self).checklines is Rule.checklines
+                and self.is_valid_language(file))
+
     def checklines(self, file, text):
         """Checks each line of file against the error regex
 
         Args:
             file (string): file path of the file to be checked
-            text (string): file text of the same file
+            text (string or FileContext): file text or context of the same file
 
         Returns:
             list: list of issues in the given file
         """
         errors = []
 
-        if not self.check:
-            logger.debug("Check line rule does not exist for {}".format(
-                __class__.__name__))
+        if not self.check_line and not self.check:
+            logger.debug("Check line rule does not exist for %s", __class__.__name__)
             return errors
 
         if not self.is_valid_language(file):
             logger.debug(
-                "Skipping file {}. Linter does not support linting this file type".format(file))
+                "Skipping file %s. Linter does not support linting this file type", file)
             return errors
 
-        for (index, line) in enumerate(text.split("\n")):
-            # pylint: disable = fixme
-            # FIXME - parsing jinja2 templates .. lines starting with `#
-            #         should probably still be parsed somewhow as these
-            #         are not comments.
-            if line.lstrip().startswith('#'):
-                continue
-
-            result = self.check(file, line)
-            if not result:
-                continue
-            errors.append(LinterError(index+1, line, file['path'], self))
-        return errors
+        context = FileContext.from_text(file, text)
+        return LineScanner([self]).scan(file, context)[self]
 
     def checkfulltext(self, file, text):
         """Checks the entire file text against a lint rule
 
         Args:
             file (string): file path of the file to be checked
-            text (string): file text of the same file
+            text (string or FileContext): file text or context of the same file
 
         Returns:
             list: list of issues in the given file
         """
         errors = []
 
-        if not self.checktext:
-            logger.debug("Check text rule does not exist for {}".format(
-                __class__.__name__))
+        if not self.check_text and not self.checktext:
+            logger.debug("Check text rule does not exist for %s", __class__.__name__)
             return errors
 
         if not self.is_valid_language(file):
             logger.debug(
-                "Skipping file {}. Linter does not support linting this file type".format(file))
+                "Skipping file %s. Linter does not support linting this file type", file)
             return errors
 
-        results = self.checktext(file, text)
+        context = FileContext.from_text(file, text)
+        if self.check_text:
+            results = self.check_text(context)
+        else:
+            results = self.checktext(file, context.text)
 
         for line, section, message in results:
             errors.append(LinterError(
@@ -43,7 +43,7 @@ class Runner:
         """
         files = []
         for index, file in enumerate(self.files):
-            logger.debug("Running linting rules for {}".format(file))
+            logger.debug("Running linting rules for %s", file)
             file_path = file[0]
             file_type = file[1]
             file_dict = {'path': file_path, 'type': file_type}
@@ -70,5 +70,5 @@ class Runner:
         self.checked_files.update([file_dict['path'] for file_dict in files])
 
         # TODO - log also warnings
-        logger.info("Linting errors found {}".format(errors))
+        logger.info("Linting errors found %s", errors)
         return errors, warnings
@@ -0,0 +1,87 @@
+"""scanner.py - Class to check the lines of a file against several line rules
+                in a single pass.
+"""
+from functools import partial
+
+from j2lint.linter.error import LinterError
+from j2lint.linter.profile import Profiler
+
+
+class LineScanner:
+    """Class which visits each line of a file once and runs every line rule
+    on it, attributing each issue to the rule which found it
+
+    A rule can set `line_markers` to a tuple of strings of which at least one
+    must be in a line for the rule to report it. The rule is not called on
+    the lines without any of its markers.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def scan(self, file, context, profiler=None, max_errors=None):
+        """Checks each line of the file against the rules
+
+        Args:
+            file (dict): file path and file type
+            context (FileContext): context of the file
+            profiler (Profiler, optional): profiler the time of the checks of
+                                           each rule is added to.
+                                           Defaults to None.
+            max_errors (int, optional): stop checking the lines once the
+                                        rules which are not warnings found
+                                        this number of issues.
+                                        Defaults to None.
+
+        Returns:
+            dict: list of issues found by each rule, indexed by rule
+        """
+        issues = {}
+        checks = []
+        timings = {}
+        for rule in self.rules:
+            issues[rule] = []
+            check_line, check = rule.check_line, rule.check
+            if profiler is not None:
+                timings[rule] = 0.0
+                check_line = check_line and Profiler.timed_check(check_line, timings, rule)
+                check = check and Profiler.timed_check(check, timings, rule)
+            # The issues on the lines where the rule is disabled by a pragma
+            # are not counted as errors
+            counted = rule not in rule.warn
+            if counted and max_errors is not None and context.pragmas.has_line_pragmas(rule):
+                counted = partial(context.pragmas.is_line_disabled, rule)
+            checks.append((rule, check_line, check,
+                           rule.line_markers, issues[rule], counted))
+        file_path = file['path']
+        error_count = 0
+
+        for (index, line) in enumerate(context.lines):
+            # pylint: disable = fixme
+            # FIXME - parsing jinja2 templates .. lines starting with `#
+            #         should probably still be parsed somewhow as these
+            #         are not comments.
+            if line.lstrip().startswith('#'):
+                continue
+
+            for rule, check_line, check, markers, errors, counted in checks:
+                if markers:
+                    for marker in markers:
+                        if marker in line:
+                            break
+                    else:
+                        continue
+                if check_line:
+                    result = check_line(context, index)
+                else:
+                    result = check(file, line)
+                if result:
+                    errors.append(LinterError(index+1, line, file_path, rule))
+                    if counted is True or (counted and not counted(index + 1)):
+                        error_count += 1
+            if max_errors is not None and error_count >= max_errors:
+                break
+
+        for rule, seconds in timings.items():
+            profiler.add_rule(rule.id, seconds)
+        return issues
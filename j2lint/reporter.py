@@ -0,0 +1,265 @@
+"""reporter.py - Reporters printing the linting issues as the files are
+                 linted.
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+from j2lint import NAME, VERSION
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+INFORMATION_URI = "https://github.com/aristanetworks/j2lint"
+
+
+def sort_issues(issues):
+    """Sorted list of issues
+
+    Args:
+        issues (list): list of issue dictionaries
+
+    Returns:
+        list: list of sorted issue dictionaries
+    """
+    issues.sort(
+        key=lambda issue: (
+            issue.filename,
+            issue.linenumber,
+            issue.rule.id
+        )
+    )
+    return issues
+
+
+def sort_and_print_issues(options, lint_issues, issue_type, json_output):
+    """ Sort and print linting errors """
+    total_issues = 0
+    if lint_issues:
+        for key, issues in lint_issues.items():
+            if not issues:
+                continue
+            if not total_issues and not options.json:
+                print(f"\nJINJA2 LINT {issue_type}")
+            total_issues = total_issues + len(issues)
+            sorted_issues = sort_issues(issues)
+            if options.json:
+                json_output.setdefault(issue_type, []).extend(
+                    issue.to_dict() for issue in sorted_issues)
+            else:
+                print("************ File {}".format(key))
+                for j2_issue in sorted_issues:
+                    print("{}".format(j2_issue))
+    return total_issues, json_output
+
+
+class Reporter:
+    """Base class for the reporters
+
+    The reporters receive the linting issues file by file and keep running
+    counters of the issues for the summary. `truncated` is set when the
+    linting stopped before all the files were linted.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.total_errors = 0
+        self.total_warnings = 0
+        self.truncated = False
+
+    def start(self, rules):
+        """Called before the first file is reported
+
+        Args:
+            rules (list): rules the files are linted with
+        """
+
+    def report_file(self, file_name, errors, warnings):
+        """Reports the linting issues of a file
+
+        Args:
+            file_name (string): file path
+            errors (list): list of LinterError objects
+            warnings (list): list of LinterError objects
+        """
+        self.total_errors += len(errors)
+        self.total_warnings += len(warnings)
+
+    def finish(self):
+        """Called after the last file is reported
+        """
+
+    def get_summary(self):
+        """Summary of the linting issues
+
+        Returns:
+            string: summary line
+        """
+        if self.truncated:
+            return (f"Jinja2 linting stopped after the maximum number of errors with "
+                    f"{self.total_errors} issue(s) and {self.total_warnings} warning(s)")
+        if not self.total_errors and not self.total_warnings:
+            return "Linting complete. No problems found."
+        return (f"Jinja2 linting finished with "
+                f"{self.total_errors} issue(s) and {self.total_warnings} warning(s)")
+
+
+class TextReporter(Reporter):
+    """Reporter printing the errors then the warnings of all the files
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.lint_errors = {}
+        self.lint_warnings = {}
+
+    def report_file(self, file_name, errors, warnings):
+        super().report_file(file_name, errors, warnings)
+        self.lint_errors.setdefault(file_name, []).extend(errors)
+        self.lint_warnings.setdefault(file_name, []).extend(warnings)
+
+    def finish(self):
+        sort_and_print_issues(self.options, self.lint_errors, 'ERRORS', {})
+        sort_and_print_issues(self.options, self.lint_warnings, 'WARNINGS', {})
+        print(self.get_summary())
+
+
+class JsonReporter(Reporter):
+    """Reporter printing a JSON object with the errors and the warnings of all
+    the files
+
+    The errors are printed as the files are reported. The warnings, which come
+    after them in the JSON object, are spooled to a temporary file meanwhile.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.warnings_file = None
+
+    def start(self, rules):
+        self.warnings_file = tempfile.TemporaryFile("w+", encoding="utf-8")
+        sys.stdout.write('{"ERRORS": [')
+
+    def report_file(self, file_name, errors, warnings):
+        self.write_issues(sys.stdout, errors, self.total_errors)
+        self.write_issues(self.warnings_file, warnings, self.total_warnings)
+        super().report_file(file_name, errors, warnings)
+
+    @staticmethod
+    def write_issues(stream, issues, count):
+        """Writes the issues as JSON array items
+
+        Args:
+            stream (file): output stream
+            issues (list): list of LinterError objects
+            count (int): number of items already written to the array
+        """
+        for issue in sort_issues(issues):
+            if count:
+                stream.write(", ")
+            stream.write(json.dumps(issue.to_dict()))
+            count += 1
+
+    def finish(self):
+        sys.stdout.write('], "WARNINGS": [')
+        self.warnings_file.seek(0)
+        shutil.copyfileobj(self.warnings_file, sys.stdout)
+        self.warnings_file.close()
+        if self.truncated:
+            sys.stdout.write('], "TRUNCATED": true}\n')
+        else:
+            sys.stdout.write(']}\n')
+
+
+class NdjsonReporter(Reporter):
+    """Reporter printing a JSON object per issue as soon as its file is
+    reported, the summary is printed to stderr
+    """
+
+    def report_file(self, file_name, errors, warnings):
+        super().report_file(file_name, errors, warnings)
+        for issue_type, issues in (("error", errors), ("warning", warnings)):
+            for issue in sort_issues(issues):
+                issue_dict = issue.to_dict()
+                issue_dict["type"] = issue_type
+                print(json.dumps(issue_dict))
+        sys.stdout.flush()
+
+    def finish(self):
+        print(self.get_summary(), file=sys.stderr)
+
+
+class SarifReporter(Reporter):
+    """Reporter printing a SARIF 2.1 log, the results are printed as the files
+    are reported
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        # urllib is only imported for the SARIF output
+        # pylint: disable = import-outside-toplevel
+        from urllib.parse import quote
+        self.quote = quote
+        self.rule_indexes = {}
+
+    def start(self, rules):
+        self.rule_indexes = {rule.id: index for index, rule in enumerate(rules)}
+        driver = {"name": NAME,
+                  "version": VERSION,
+                  "informationUri": INFORMATION_URI,
+                  "rules": [{"id": rule.id,
+                             "name": rule.short_description,
+                             "shortDescription": {"text": rule.description},
+                             "properties": {"severity": rule.severity}}
+                            for rule in rules]}
+        # The run object is left open to stream the results
+        log = json.dumps({"$schema": SARIF_SCHEMA,
+                          "version": SARIF_VERSION,
+                          "runs": [{"tool": {"driver": driver}, "results": []}]})
+        sys.stdout.write(log[:-len("]}]}")])
+
+    def report_file(self, file_name, errors, warnings):
+        count = self.total_errors + self.total_warnings
+        for level, issues in (("error", errors), ("warning", warnings)):
+            for issue in sort_issues(issues):
+                if count:
+                    sys.stdout.write(", ")
+                sys.stdout.write(json.dumps(self.get_result(issue, level)))
+                count += 1
+        super().report_file(file_name, errors, warnings)
+
+    def get_result(self, issue, level):
+        """Returns the SARIF result of an issue
+
+        Args:
+            issue (LinterError): linting issue
+            level (string): SARIF level, error or warning
+
+        Returns:
+            dict: SARIF result object
+        """
+        result = {"ruleId": issue.rule.id,
+                  "level": level,
+                  "message": {"text": issue.message},
+                  "locations": [{"physicalLocation": {
+                      "artifactLocation": {"uri": self.quote(issue.filename.replace(os.sep, "/"))},
+                      "region": {"startLine": issue.linenumber,
+                                 "snippet": {"text": issue.line}}}}]}
+        if issue.rule.id in self.rule_indexes:
+            result["ruleIndex"] = self.rule_indexes[issue.rule.id]
+        return result
+
+    def finish(self):
+        if self.truncated:
+            sys.stdout.write('], "properties": {"truncated": true}}]}\n')
+        else:
+            sys.stdout.write("]}]}\n")
+
+
+REPORTERS = {
+    "text": TextReporter,
+    "json": JsonReporter,
+    "ndjson": NdjsonReporter,
+    "sarif": SarifReporter,
+}
@@ -12,6 +12,7 @@ class JinjaOperatorHasSpaceRule(Rule):
     short_description = 'operator-enclosed-by-spaces'
     description = "When variables are used in combination with an operator, the operator shall be enclosed by space: '{{ my_value | to_json }}'"
     severity = 'LOW'
+    line_markers = ('|', '+', '==')
 
     operators = ['|', '+', '==']
     regexes = []
@@ -23,17 +24,18 @@ class JinjaOperatorHasSpaceRule(Rule):
             operator + " \s+[^ |^{])(.*?)[}|%]})"
         regexes.append(re.compile(regex))
 
-    def check(self, file, line):
+    def check_line(self, context, index):
         """Checks if the given line matches the error regex
 
         Args:
-            file (string): file path
-            line (string): a single line from the file
+            context (FileContext): context of the file
+            index (int): index of the line in the file
 
         Returns:
             Object: Returns error object if found else None
         """
         issues = []
+        line = context.lines[index]
 
         if "\'" in line:
             regx = re.findall("\'([^\']*)\'", line)
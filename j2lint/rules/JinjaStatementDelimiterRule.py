@@ -1,10 +1,7 @@
 """JinjaStatementDelimiterRule.py - Rule class to check if jinja delimiters
                                     are wrong.
 """
-import re
-import jinja2
 from j2lint.linter.rule import Rule
-from j2lint.utils import get_jinja_statements
 
 
 class JinjaStatementDelimiterRule(Rule):
@@ -19,18 +16,19 @@ class JinjaStatementDelimiterRule(Rule):
     deprecated_short_description = 'jinja-statements-delimeter'
     description = "Jinja statements should not have {%- or {%+ or -%} as delimiters"
     severity = 'LOW'
+    line_markers = ('{%-', '{%+', '-%}')
 
-    def check(self, file, line):
+    def check_line(self, context, index):
         """Checks if the given line matches the wrong delimiters
 
         Args:
-            file (string): file path
-            line (string): a single line from the file
+            context (FileContext): context of the file
+            index (int): index of the line in the file
 
         Returns:
             Object: Returns True if error is found else False
         """
-        statements = get_jinja_statements(line)
+        statements = context.get_line_statements(index)
         for statement in statements:
             if statement[3] in ["{%-", "{%+"] or statement[4] == "-%}":
                 return True
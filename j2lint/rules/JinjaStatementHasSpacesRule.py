@@ -14,17 +14,18 @@ class JinjaStatementHasSpacesRule(Rule):
     short_description = 'jinja-statements-single-space'
     description = "Jinja statement should have a single space before and after: '{% statement %}'"
     severity = 'LOW'
+    line_markers = ('{%', '%}')
 
     regex = re.compile(r"{%[^ \-\+]|{%[\-\+][^ ]|[^ \-\+]%}|[^ ][\-\+]%}")
 
-    def check(self, file, line):
+    def check_line(self, context, index):
         """Checks if the given line matches the error regex
 
         Args:
-            file (string): file path
-            line (string): a single line from the file
+            context (FileContext): context of the file
+            index (int): index of the line in the file
 
         Returns:
             Object: Returns error object if found else None
         """
-        return self.regex.search(line)
+        return self.regex.search(context.lines[index])
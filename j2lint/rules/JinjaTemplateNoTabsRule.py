@@ -2,7 +2,6 @@
                                 for indentation.
 """
 import re
-import jinja2
 from j2lint.linter.rule import Rule
 
 
@@ -13,17 +12,18 @@ class JinjaTemplateNoTabsRule(Rule):
     short_description = 'jinja-statements-no-tabs'
     description = "Indentation are 4 spaces and NOT tabulation"
     severity = 'LOW'
+    line_markers = ('\t',)
 
     regex = re.compile(r"\t+")
 
-    def check(self, file, line):
+    def check_line(self, context, index):
         """Checks if the given line matches the error regex
 
         Args:
-            file (string): file path
-            line (string): a single line from the file
+            context (FileContext): context of the file
+            index (int): index of the line in the file
 
         Returns:
             Object: Returns error object if found else None
         """
-        return self.regex.search(line)
+        return self.regex.search(context.lines[index])
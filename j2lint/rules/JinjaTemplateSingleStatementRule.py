@@ -2,10 +2,7 @@
                                          jinja statement is present on each
                                          line.
 """
-import re
-import jinja2
 from j2lint.linter.rule import Rule
-from j2lint.utils import get_jinja_statements
 
 
 class JinjaTemplateSingleStatementRule(Rule):
@@ -16,17 +13,18 @@ class JinjaTemplateSingleStatementRule(Rule):
     short_description = 'single-statement-per-line'
     description = "Jinja statements should be on separate lines"
     severity = 'MEDIUM'
+    line_markers = ('{%',)
 
-    def check(self, file, line):
+    def check_line(self, context, index):
         """Checks if the given line matches the error regex
 
         Args:
-            file (string): file path
-            line (string): a single line from the file
+            context (FileContext): context of the file
+            index (int): index of the line in the file
 
         Returns:
             Object: Returns True if error is found else False
         """
-        if len(get_jinja_statements(line)) > 1:
+        if len(context.get_line_statements(index)) > 1:
             return True
         return False
@@ -14,18 +14,19 @@ class JinjaVariableHasSpaceRule(Rule):
     short_description = 'single-space-decorator'
     description = "A single space shall be added between Jinja2 curly brackets and a variable’s name: '{{ ethernet_interface }}'"
     severity = 'LOW'
+    line_markers = ('{{', '}}')
 
     regex = re.compile(
         r"{{[^ \-\+\d]|{{[-\+][^ ]|[^ \-\+\d]}}|[^ {][-\+\d]}}|{{ \s+[^ \-\+]|[^ \-\+] \s+}}")
 
-    def check(self, file, line):
+    def check_line(self, context, index):
         """Checks if the given line matches the error regex
 
           Args:
-              file (string): file path
-              line (string): a single line from the file
+              context (FileContext): context of the file
+              index (int): index of the line in the file
 
           Returns:
               Object: Returns error object if found else None
           """
-        return self.regex.search(line)
+        return self.regex.search(context.lines[index])
@@ -3,7 +3,6 @@
 """
 import re
 from j2lint.linter.rule import Rule
-from j2lint.utils import get_jinja_variables
 
 
 class JinjaVariableNameCaseRule(Rule):
@@ -13,20 +12,21 @@ class JinjaVariableNameCaseRule(Rule):
     short_description = 'jinja-variable-lower-case'
     description = "All variables shall use lower case: '{{ variable }}'"
     severity = 'LOW'
+    line_markers = ('{{',)
 
     regex = re.compile(r"([a-zA-Z0-9-_\"']*[A-Z][a-zA-Z0-9-_\"']*)")
 
-    def check(self, file, line):
+    def check_line(self, context, index):
         """Checks if the given line matches the error regex
 
         Args:
-            file (string): file path
-            line (string): a single line from the file
+            context (FileContext): context of the file
+            index (int): index of the line in the file
 
         Returns:
             Object: Returns error object if found else None
         """
-        variables = get_jinja_variables(line)
+        variables = context.get_line_variables(index)
         for var in variables:
             matches = re.findall(self.regex, var)
             matches = [match for match in matches if (match not in ['False', 'True']) and (
@@ -3,7 +3,6 @@
 """
 import re
 from j2lint.linter.rule import Rule
-from j2lint.utils import get_jinja_variables
 
 
 class JinjaVariableNameFormatRule(Rule):
@@ -13,27 +12,25 @@ class JinjaVariableNameFormatRule(Rule):
     short_description = 'jinja-variable-format'
     description = "If variable is multi-words, underscore _ shall be used as a separator: '{{ my_variable_name }}'"
     severity = 'LOW'
+    line_markers = ('-',)
 
     regex = re.compile(r"[a-zA-Z0-9-_\"']+[-][a-zA-Z0-9-_\"']+")
 
-    def check(self, file, line):
+    def check_line(self, context, index):
         """Checks if the given line matches the error regex
 
         Args:
-            file (string): file path
-            line (string): a single line from the file
+            context (FileContext): context of the file
+            index (int): index of the line in the file
 
         Returns:
             Object: Returns error object if found else None
         """
-        variables = get_jinja_variables(line)
+        variables = context.get_line_variables(index)
         for var in variables:
             matches = re.findall(self.regex, var)
             matches = [match for match in matches if (
                 "'" not in match) and ('"' not in match)]
             if matches:
-                # pylint: disable = fixme
-                # FIXME - this print should be removed.
-                print(matches)
                 return True
         return False
@@ -0,0 +1,251 @@
+"""server.py - Lint server keeping the rules collections loaded and answering
+               lint requests over a Unix domain socket.
+
+The protocol is one JSON object per line. A request holds the `paths` to lint
+and/or a `text` to lint with its `filename`, along with the `cwd` of the
+client, the `exclude` patterns and the `rules_dir`, `ignore`, `warn` and
+`select` rules settings.
+The response holds the metadata of the `rules` and the `results` of each
+file, or an `error` message.
+"""
+import json
+import os
+import socket
+import socketserver
+
+from j2lint.api import RULES_DIR, lint_text
+from j2lint.linter.collection import RulesCollection
+from j2lint.linter.rule import Rule
+from j2lint.utils import iter_files, get_file_type
+from j2lint.logger import logger
+
+# Seconds the client waits for each read or write on the socket before
+# linting in process
+REQUEST_TIMEOUT = 60.0
+SOCKET_MODE = 0o600
+
+
+def get_rules_metadata(collection):
+    """Returns the attributes of the rules needed to print their issues
+
+    Args:
+        collection (RulesCollection): rules collection
+
+    Returns:
+        dict: description, short description and severity indexed by rule id
+    """
+    return {rule.id: {"description": rule.description,
+                      "short_description": rule.short_description,
+                      "severity": rule.severity}
+            for rule in collection}
+
+
+def load_rules_metadata(metadata):
+    """Creates rule objects from the metadata returned by the server
+
+    Args:
+        metadata (dict): rules metadata as returned by get_rules_metadata
+
+    Returns:
+        dict: rule objects indexed by rule id
+    """
+    rules_by_id = {}
+    for rule_id, attributes in metadata.items():
+        rule = Rule()
+        rule.id = rule_id
+        rule.description = attributes["description"]
+        rule.short_description = attributes["short_description"]
+        rule.severity = attributes["severity"]
+        rules_by_id[rule_id] = rule
+    return rules_by_id
+
+
+class LintServer(socketserver.UnixStreamServer):
+    """Class for the lint server
+
+    The requests are handled one at a time. A rules collection is loaded for
+    each distinct rules settings and kept for the next requests. As the
+    requests can load rules from any directory, the socket is only
+    accessible to its owner.
+    """
+
+    def __init__(self, socket_path):
+        self.collections = {}
+        super().__init__(socket_path, LintRequestHandler)
+
+    def server_bind(self):
+        # The socket is created without group and other permissions
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        os.chmod(self.server_address, SOCKET_MODE)
+
+    def get_collection(self, rules_dirs, ignore_rules, warn_rules, select_rules=None):
+        """Returns the rules collection for the rules settings, loading it on
+        first use
+
+        Args:
+            rules_dirs (list): rules directories
+            ignore_rules (list): list of rule descriptions to ignore
+            warn_rules (list): list of rule descriptions to warn
+            select_rules (list, optional): list of rule descriptions to run.
+                                           Defaults to None.
+
+        Returns:
+            RulesCollection: rules collection
+        """
+        key = (tuple(rules_dirs), tuple(sorted(ignore_rules)),
+               tuple(sorted(warn_rules)), tuple(sorted(select_rules or [])))
+        if key not in self.collections:
+            collection = RulesCollection()
+            for rules_dir in rules_dirs:
+                collection.extend(RulesCollection.create_from_directory(
+                    rules_dir, ignore_rules, warn_rules, select_rules, True))
+            self.collections[key] = collection
+        return self.collections[key]
+
+    def lint(self, request):
+        """Lints the files and text of a request
+
+        Args:
+            request (dict): lint request
+
+        Returns:
+            dict: rules metadata and lint results
+        """
+        cwd = os.getcwd()
+        client_cwd = request.get("cwd", cwd)
+        # The rules directories are relative to the client directory
+        rules_dirs = [os.path.normpath(os.path.join(client_cwd, os.path.expanduser(rules_dir)))
+                      for rules_dir in request.get("rules_dir", [RULES_DIR])]
+        collection = self.get_collection(rules_dirs,
+                                         request.get("ignore", []),
+                                         request.get("warn", []),
+                                         request.get("select", []))
+        results = []
+        # The file names are reported relative to the client directory
+        os.chdir(client_cwd)
+        try:
+            for file_name in iter_files(request.get("paths", []),
+                                        request.get("exclude", [])):
+                errors, warnings = collection.run(
+                    {'path': file_name, 'type': get_file_type(file_name)})
+                results.append(self.get_result(file_name, errors, warnings))
+            if request.get("text") is not None:
+                filename = request.get("filename", "<stdin>")
+                errors, warnings = lint_text(request["text"], filename, collection)
+                results.append(self.get_result(filename, errors, warnings))
+        finally:
+            os.chdir(cwd)
+        return {"rules": get_rules_metadata(collection), "results": results}
+
+    @staticmethod
+    def get_result(file_name, errors, warnings):
+        """Returns the lint result of a file as plain data
+
+        Args:
+            file_name (string): file path
+            errors (list): list of LinterError objects
+            warnings (list): list of LinterError objects
+
+        Returns:
+            dict: file name and lists of error and warning dictionaries
+        """
+        return {"filename": file_name,
+                "errors": [error.to_dict() for error in errors],
+                "warnings": [warning.to_dict() for warning in warnings]}
+
+
+class LintRequestHandler(socketserver.StreamRequestHandler):
+    """Class handling the lint requests of a client connection
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.lint(json.loads(line))
+            except Exception as e:
+                logger.error("Lint request failed: %s", e)
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def is_server_running(socket_path):
+    """Check if a server is listening on the socket
+
+    Args:
+        socket_path (string): Unix domain socket path
+
+    Returns:
+        boolean: True if a connection to the socket succeeds
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(socket_path):
+    """Runs the lint server until interrupted
+
+    Args:
+        socket_path (string): Unix domain socket path
+
+    Raises:
+        OSError: Raises error if a server is already listening on the socket
+    """
+    if os.path.exists(socket_path):
+        if is_server_running(socket_path):
+            raise OSError(f"A lint server is already running on {socket_path}")
+        os.unlink(socket_path)
+    with LintServer(socket_path) as server:
+        logger.info("Lint server listening on %s", socket_path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+def request_lint(socket_path, request, timeout=REQUEST_TIMEOUT):
+    """Sends a lint request to the server
+
+    Args:
+        socket_path (string): Unix domain socket path
+        request (dict): lint request
+        timeout (float, optional): socket timeout in seconds.
+                                   Defaults to REQUEST_TIMEOUT.
+
+    Returns:
+        dict: server response or None if the server is not available, did
+              not answer in time or failed to handle the request
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as response_file:
+                data = response_file.readline()
+    except socket.timeout:
+        logger.warning("Lint server on %s did not answer in %s seconds", socket_path, timeout)
+        return None
+    except OSError as e:
+        logger.info("Lint server not available on %s: %s", socket_path, e)
+        return None
+    if not data:
+        return None
+    try:
+        response = json.loads(data)
+    except ValueError as e:
+        logger.warning("Invalid lint server response: %s", e)
+        return None
+    if "error" in response:
+        logger.warning("Lint server error: %s", response["error"])
+        return None
+    return response
@@ -0,0 +1,146 @@
+"""shard.py - Functions to split the files to lint between several runs of
+              the linter and to merge the JSON reports of the runs.
+"""
+import argparse
+import heapq
+import json
+import os
+
+from j2lint.logger import logger
+
+
+def shard_spec(value):
+    """Converts the --shard command line value to a shard index and count
+
+    Args:
+        value (string): shard as `index/count`, the index starting at 1
+
+    Raises:
+        argparse.ArgumentTypeError: Raises error if the value is not a valid
+                                    shard
+
+    Returns:
+        tuple: shard index starting at 1 and shard count
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        index = count = 0
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(
+            f"expected INDEX/COUNT with 1 <= INDEX <= COUNT and got '{value}'")
+    return index, count
+
+
+def read_timings(file_name):
+    """Reads the linting time of the files from a timings file
+
+    Args:
+        file_name (string): path of a timings.json file written by the cache
+
+    Raises:
+        IOError: Raises error if the file cannot be read
+        ValueError: Raises error if the file does not hold the linting time
+                    of the files
+
+    Returns:
+        dict: linting time in seconds indexed by file path
+    """
+    with open(file_name, mode="r", encoding="utf-8") as f:
+        timings = json.load(f)
+    if not isinstance(timings, dict) or not all(
+            isinstance(seconds, (int, float)) for seconds in timings.values()):
+        raise ValueError("expected the linting time in seconds of each file")
+    return timings
+
+
+def get_file_costs(files, timings=None):
+    """Estimates the time needed to lint each file
+
+    The time spent on the last run is used when it is known. The other files
+    are estimated from their size, at the throughput of the timed files.
+
+    Args:
+        files (list): list of file paths
+        timings (dict, optional): linting time in seconds indexed by file
+                                  path. Defaults to None.
+
+    Returns:
+        dict: cost of each file indexed by file path
+    """
+    timings = timings or {}
+    sizes = {}
+    for file_name in files:
+        try:
+            sizes[file_name] = os.path.getsize(file_name)
+        except OSError:
+            sizes[file_name] = 0
+    timed_files = [file_name for file_name in files if file_name in timings]
+    timed_bytes = sum(sizes[file_name] for file_name in timed_files)
+    timed_seconds = sum(timings[file_name] for file_name in timed_files)
+    seconds_per_byte = timed_seconds / timed_bytes if timed_bytes else 1
+    return {file_name: timings[file_name] if file_name in timings
+            else sizes[file_name] * seconds_per_byte
+            for file_name in files}
+
+
+def partition_files(files, shard_count, costs):
+    """Splits the files in shards of about the same total cost
+
+    The most expensive files are assigned first, each one to the shard with
+    the lowest total cost. The same files and costs always give the same
+    shards.
+
+    Args:
+        files (list): list of file paths
+        shard_count (int): number of shards
+        costs (dict): cost of each file indexed by file path
+
+    Returns:
+        list: sorted list of the file paths of each shard
+    """
+    shards = [[] for _ in range(shard_count)]
+    # Total cost and index of each shard, the ties go to the lowest index
+    loads = [(0, index) for index in range(shard_count)]
+    for file_name in sorted(set(files), key=lambda file_name: (-costs[file_name], file_name)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(file_name)
+        heapq.heappush(loads, (load + costs[file_name], index))
+    logger.debug("Shards costs %s", sorted(loads, key=lambda load: load[1]))
+    return [sorted(shard) for shard in shards]
+
+
+def get_shard(files, shard, timings=None):
+    """Returns the files of a shard
+
+    Args:
+        files (list): list of file paths
+        shard (tuple): shard index starting at 1 and shard count
+        timings (dict, optional): linting time in seconds indexed by file
+                                  path. Defaults to None.
+
+    Returns:
+        list: sorted list of the file paths of the shard
+    """
+    index, count = shard
+    return partition_files(files, count, get_file_costs(files, timings))[index - 1]
+
+
+def merge_reports(reports):
+    """Merges the JSON reports of several runs
+
+    Args:
+        reports (list): JSON reports as written by the json format
+
+    Returns:
+        dict: errors and warnings of all the reports sorted by file, and the
+              TRUNCATED key if one of the runs was truncated
+    """
+    merged = {}
+    for issue_type in ("ERRORS", "WARNINGS"):
+        issues = [issue for report in reports for issue in report.get(issue_type, [])]
+        # The sort is stable so the issues of a file keep their order
+        merged[issue_type] = sorted(issues, key=lambda issue: issue["filename"])
+    if any(report.get("TRUNCATED") for report in reports):
+        merged["TRUNCATED"] = True
+    return merged
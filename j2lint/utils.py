@@ -1,9 +1,16 @@
 """utils.py - Utility functions for jinja2 linter.
 """
+import ast
+import bisect
+import fnmatch
 import glob
 import importlib.util
+import logging
 import os
 import re
+import subprocess
+import sys
+import warnings
 
 try:
     from collections.abc import Iterable
@@ -13,33 +20,105 @@ except ImportError:
 from j2lint.logger import logger
 
 LANGUAGE_JINJA = "jinja"
+JINJA_FILE_EXTENSIONS = (".jinja", ".jinja2", ".j2")
+PRUNED_DIRECTORIES = frozenset(['.git', '.tox', 'node_modules', '__pycache__'])
 
+NEWLINE_PATTERN = re.compile(r'\n')
+STATEMENT_PATTERN = re.compile("(\\{%[-|+]?)((.|\n)*?)([-]?\\%})", re.MULTILINE)
+COMMENT_PATTERN = re.compile("(\\{#)((.|\n)*?)(\\#})", re.MULTILINE)
+DISABLE_PATTERN = re.compile(r"j2lint\s*:\s*disable\s*=\s*([\w-]+)")
+PRAGMA_PATTERN = re.compile(
+    r"j2lint\s*:\s*(disable-next-line|disable|enable)\s*=\s*([\w-]+)")
+COMMENT_BYTES_PATTERN = re.compile(COMMENT_PATTERN.pattern.encode(), re.MULTILINE)
+PRAGMA_BYTES_PATTERN = re.compile(PRAGMA_PATTERN.pattern.encode())
+CHUNK_SIZE = 1 << 20
 
-def load_plugins(directory):
+
+RULE_METADATA = ('id', 'short_description', 'deprecated_short_description')
+
+
+def get_plugin_metadata(pluginfile, pluginname):
+    """Reads the rule id and descriptions of a Rule module without executing it
+
+    Args:
+        pluginfile (string): module path
+        pluginname (string): name of the rule class
+
+    Returns:
+        dict: string values of the id and descriptions class attributes, None
+              if the rule class is not found
+    """
+    with open(pluginfile, "rb") as f:
+        source = f.read()
+    # The warnings of the module source are reported when it is executed
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            tree = ast.parse(source, pluginfile)
+        except SyntaxError:
+            return None
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == pluginname:
+            metadata = {}
+            for statement in node.body:
+                if not isinstance(statement, ast.Assign):
+                    continue
+                value = get_string_constant(statement.value)
+                if value is None:
+                    continue
+                for target in statement.targets:
+                    if isinstance(target, ast.Name) and target.id in RULE_METADATA:
+                        metadata[target.id] = value
+            return metadata
+    return None
+
+
+def get_string_constant(node):
+    """Returns the value of a string literal node
+
+    Args:
+        node (ast.AST): expression node
+
+    Returns:
+        string: value of the string literal, None for the other nodes
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    # Python 3.6 and 3.7 parse the string literals as ast.Str
+    if sys.version_info < (3, 8) and isinstance(node, ast.Str):
+        return node.s
+    return None
+
+
+def load_plugins(directory, skip=None):
     """Loads and executes all the Rule modules from the specified directory
 
     Args:
         directory (string): Loads the modules a directory
+        skip (function, optional): called with the metadata read statically
+                                   from each module, the module is not
+                                   executed when it returns True.
+                                   Defaults to None.
 
     Returns:
         list: List of rule classes
     """
     result = []
-    file_handle = None
 
     for pluginfile in glob.glob(os.path.join(directory, '[A-Za-z]*.py')):
         pluginname = os.path.basename(pluginfile.replace('.py', ''))
-        try:
-            logger.debug("Loading plugin {}".format(pluginname))
-            spec = importlib.util.spec_from_file_location(
-                pluginname, pluginfile)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            obj = getattr(module, pluginname)()
-            result.append(obj)
-        finally:
-            if file_handle:
-                file_handle.close()
+        if skip is not None:
+            metadata = get_plugin_metadata(pluginfile, pluginname)
+            if metadata and skip(metadata):
+                logger.debug("Skipping plugin %s", pluginname)
+                continue
+        logger.debug("Loading plugin %s", pluginname)
+        spec = importlib.util.spec_from_file_location(
+            pluginname, pluginfile)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        obj = getattr(module, pluginname)()
+        result.append(obj)
     return result
 
 
@@ -52,10 +131,7 @@ def is_valid_file_type(file_name):
     Returns:
         boolean: True if file type is correct
     """
-    extension = os.path.splitext(file_name)[1].lower()
-    if extension in [".jinja", ".jinja2", ".j2"]:
-        return True
-    return False
+    return file_name.lower().endswith(JINJA_FILE_EXTENSIONS)
 
 
 def get_file_type(file_name):
@@ -74,34 +150,134 @@ def get_file_type(file_name):
     return None
 
 
-def get_files(file_or_dir_names):
+def is_excluded(path, name, exclude):
+    """Checks if a path matches one of the exclude glob patterns
+
+    Args:
+        path (string): file or directory path
+        name (string): base name of the path
+        exclude (list): glob patterns matched against the path and its name
+
+    Returns:
+        boolean: True if the path is excluded
+    """
+    return any(fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern)
+               for pattern in exclude)
+
+
+def is_pruned(path, name, exclude):
+    """Checks if a directory is skipped when the directories are walked
+
+    Args:
+        path (string): directory path
+        name (string): base name of the directory
+        exclude (list): glob patterns matched against the path and its name
+
+    Returns:
+        boolean: True if the directory is one of the PRUNED_DIRECTORIES or
+                 is excluded
+    """
+    return name in PRUNED_DIRECTORIES or is_excluded(path, name, exclude)
+
+
+def iter_files(file_or_dir_names, exclude=None):
+    """Yields the jinja files found in the directories recursively and the
+    given jinja files, as they are found
+
+    The PRUNED_DIRECTORIES and the directories matching an exclude pattern
+    are not walked. Symbolic links to directories are not followed.
+
+    Args:
+        file_or_dir_names (list): list of directories and files
+        exclude (list, optional): glob patterns of the files and directories
+                                  to skip. Defaults to None.
+
+    Yields:
+        string: file path
+    """
+    exclude = exclude or []
+    for file_or_dir in file_or_dir_names:
+        if not os.path.isdir(file_or_dir):
+            if (is_valid_file_type(file_or_dir) and not
+                    is_excluded(file_or_dir, os.path.basename(file_or_dir), exclude)):
+                yield file_or_dir
+            continue
+        # Depth first walk visiting the subdirectories in the os.walk order
+        directories = [file_or_dir]
+        while directories:
+            subdirectories = []
+            try:
+                with os.scandir(directories.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if not is_dir:
+                            if (entry.name.lower().endswith(JINJA_FILE_EXTENSIONS)
+                                    and not is_excluded(entry.path, entry.name, exclude)):
+                                yield entry.path
+                        elif (not entry.is_symlink()
+                              and not is_pruned(entry.path, entry.name, exclude)):
+                            subdirectories.append(entry.path)
+            except OSError:
+                continue
+            directories.extend(reversed(subdirectories))
+
+
+def get_files(file_or_dir_names, exclude=None):
     """Get files from a directory recursively
 
     Args:
         file_or_dir_names (list): list of directories and files
+        exclude (list, optional): glob patterns of the files and directories
+                                  to skip. Defaults to None.
 
     Returns:
         list: list of file paths
     """
-    file_paths = []
-
     if not isinstance(file_or_dir_names, (list, set)):
         raise TypeError(
             f"get_files expects a list or a set and got {file_or_dir_names}"
         )
 
-    for file_or_dir in file_or_dir_names:
-        if os.path.isdir(file_or_dir):
-            for root, dirs, files in os.walk(file_or_dir):
-                for f in files:
-                    file_path = os.path.join(root, f)
-                    if get_file_type(file_path) == LANGUAGE_JINJA:
-                        file_paths.append(file_path)
-        else:
-            if get_file_type(file_or_dir) == LANGUAGE_JINJA:
-                file_paths.append(file_or_dir)
-    logger.debug("Linting directory {}: files {}".format(
-        file_or_dir_names, file_paths))
+    file_paths = list(iter_files(file_or_dir_names, exclude))
+    logger.debug("Linting directory %s: files %s", file_or_dir_names, file_paths)
+    return file_paths
+
+
+def get_changed_files(changed_since=None, staged=False, paths=None):
+    """Get the changed files from the git repository of the current directory
+
+    Args:
+        changed_since (string, optional): git ref the working tree or the
+                                          staged files are compared to.
+                                          Defaults to None.
+        staged (bool, optional): compare the staged files instead of the
+                                 working tree. Defaults to False.
+        paths (list, optional): only keep the files under these paths.
+                                Defaults to None.
+
+    Returns:
+        list: list of the changed jinja file paths relative to the current
+              directory, deleted files excluded
+
+    Raises:
+        OSError: Raises error if git can not be run
+        subprocess.CalledProcessError: Raises error if the git command fails
+    """
+    command = ["git", "diff", "--name-only", "-z", "--relative", "--diff-filter=d"]
+    if staged:
+        command.append("--cached")
+    if changed_since:
+        command.append(changed_since)
+    command.append("--")
+    command.extend(paths or [])
+    output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            check=True, universal_newlines=True).stdout
+    file_paths = [file_path for file_path in output.split("\0")
+                  if file_path and get_file_type(file_path) == LANGUAGE_JINJA]
+    logger.debug("Changed files %s", file_paths)
     return file_paths
 
 
@@ -140,7 +316,21 @@ def get_tuple(l, item):
     return None
 
 
-def get_jinja_statements(text, indentation=False):
+def get_line_offsets(text):
+    """Gets the offset of the first character of each line
+
+    Args:
+        text (string): multiline text
+
+    Returns:
+        [list]: sorted list of line start offsets, the first one being 0
+    """
+    offsets = [0]
+    offsets.extend(m.end() for m in NEWLINE_PATTERN.finditer(text))
+    return offsets
+
+
+def get_jinja_statements(text, indentation=False, line_offsets=None):
     """Gets jinja statements with {%[-/+] [-]%} delimiters
 
     The regex `regex_pattern` will return multiple groups when it matches
@@ -150,6 +340,10 @@ def get_jinja_statements(text, indentation=False):
         text (string): multiline text to search the jinja statements in
         indentation (bool): Set to True if parsing for indentation, it will allow
                             to retrieve multiple lines
+        line_offsets (list, optional): line start offsets of the text as
+                                       returned by get_line_offsets. The line
+                                       numbers are found by binary search in
+                                       this list. Defaults to None.
     Example:
 
     For this given template:
@@ -177,20 +371,22 @@ def get_jinja_statements(text, indentation=False):
         [list]: list of jinja statements
     """
     statements = []
-    count = 0
-    regex_pattern = re.compile(
-        "(\\{%[-|+]?)((.|\n)*?)([-]?\\%})", re.MULTILINE)
-    newline_pattern = re.compile(r'\n')
-    lines = text.split('\n')
-    for m in regex_pattern.finditer(text):
-        count += 1
-        start_line = len(newline_pattern.findall(text, 0, m.start(2)))+1
-        end_line = len(newline_pattern.findall(text, 0, m.end(2)))+1
-        if indentation and lines[start_line - 1].split()[0] not in ["{%", "{%-", "{%+"]:
-            continue
+    if line_offsets is None:
+        line_offsets = get_line_offsets(text)
+    for m in STATEMENT_PATTERN.finditer(text):
+        start_line = bisect.bisect_right(line_offsets, m.start(2))
+        end_line = bisect.bisect_right(line_offsets, m.end(2))
+        # The line is read from the text, without splitting the whole text
+        if indentation:
+            line_end = (line_offsets[start_line] if start_line < len(line_offsets)
+                        else len(text))
+            if text[line_offsets[start_line - 1]:line_end].split()[0] not in [
+                    "{%", "{%-", "{%+"]:
+                continue
         statements.append(
             (m.group(2), start_line, end_line, m.group(1), m.group(4)))
-    logger.debug("Found jinja statements {}".format(statements))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Found jinja statements %s", statements)
     return statements
 
 
@@ -215,12 +411,33 @@ def get_jinja_comments(text):
     Returns:
         [list]: returns list of jinja comments
     """
-    comments = []
-    regex_pattern = re.compile(
-        "(\\{#)((.|\n)*?)(\\#})", re.MULTILINE)
-    for line in regex_pattern.finditer(text):
-        comments.append(line.group(2))
-    return comments
+    return [m.group(2) for m in COMMENT_PATTERN.finditer(text)]
+
+
+def get_jinja_pragmas(text, line_offsets=None):
+    """Gets the j2lint pragmas of the jinja comments
+
+    Args:
+        text (string): text to get the pragmas from
+        line_offsets (list, optional): line start offsets of the text as
+                                       returned by get_line_offsets.
+                                       Defaults to None.
+
+    Returns:
+        [list]: action, rule id or description and line number of each
+                pragma, the line number being the one of the end of its
+                comment
+    """
+    pragmas = []
+    for comment in COMMENT_PATTERN.finditer(text):
+        matches = PRAGMA_PATTERN.findall(comment.group(2))
+        if not matches:
+            continue
+        if line_offsets is None:
+            line_offsets = get_line_offsets(text)
+        end_line = bisect.bisect_right(line_offsets, comment.end() - 1)
+        pragmas.extend((action, name, end_line) for action, name in matches)
+    return pragmas
 
 
 def get_jinja_variables(text):
@@ -240,20 +457,62 @@ def get_jinja_variables(text):
     return variables
 
 
-def is_rule_disabled(text, rule):
+def count_newlines(buffer, start, end):
+    """Counts the newlines of a part of an encoded text, one chunk at a time
+
+    Args:
+        buffer (bytes or mmap.mmap): encoded text
+        start (int): offset of the first byte
+        end (int): offset after the last byte
+
+    Returns:
+        int: number of newlines between the offsets
+    """
+    return sum(buffer[offset:min(offset + CHUNK_SIZE, end)].count(b'\n')
+               for offset in range(start, end, CHUNK_SIZE))
+
+
+def get_buffer_pragmas(buffer):
+    """Gets the j2lint pragmas of the jinja comments of an encoded text
+    without decoding it
+
+    Args:
+        buffer (bytes or mmap.mmap): encoded text
+
+    Returns:
+        [list]: action, rule id or description and line number of each
+                pragma as returned by get_jinja_pragmas
+    """
+    pragmas = []
+    line = 1
+    position = 0
+    for comment in COMMENT_BYTES_PATTERN.finditer(buffer):
+        matches = PRAGMA_BYTES_PATTERN.findall(comment.group(2))
+        if not matches:
+            continue
+        line += count_newlines(buffer, position, comment.end() - 1)
+        position = comment.end() - 1
+        pragmas.extend((action.decode(), name.decode(), line)
+                       for action, name in matches)
+    return pragmas
+
+
+def is_rule_disabled(text, rule, comments=None):
     """Check if rule is disabled
 
     Args:
         text (string): text to check jinja comments
         rule (string): rule id or description
+        comments (list, optional): jinja comments already extracted from
+                                   the text. Defaults to None.
 
     Returns:
         [boolean]: True if rule is disabled
     """
-    comments = get_jinja_comments(text)
-    regex = re.compile("j2lint\s*:\s*disable\s*=\s*([\w-]+)")
+    if comments is None:
+        comments = get_jinja_comments(text)
     for comment in comments:
-        for line in regex.finditer(comment):
+        for line in DISABLE_PATTERN.finditer(comment):
             if rule.short_description == line.group(1):
                 return True
             # FIXME - remove next release
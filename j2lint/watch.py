@@ -0,0 +1,276 @@
+"""watch.py - Classes to watch the templates and lint them again when they
+              change.
+"""
+import abc
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from j2lint.utils import get_files, iter_files, is_excluded, is_pruned, is_valid_file_type
+from j2lint.logger import logger
+
+DEBOUNCE = 0.2
+POLL_INTERVAL = 1.0
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                IN_CREATE | IN_DELETE)
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class Watcher(abc.ABC):
+    """Base class for the watchers which report the templates changed
+    since the previous call
+
+    The watched paths and the changed paths are normalized, so that a file
+    given as `a.j2` matches the `./a.j2` changes. They are compared as
+    absolute paths, so that the `sub/b.j2` changes are in the watched `.`.
+    """
+
+    def __init__(self, file_or_dir_names, exclude=None):
+        self.file_or_dir_names = [os.path.normpath(name) for name in file_or_dir_names]
+        self.watched_paths = [os.path.abspath(name) for name in self.file_or_dir_names]
+        self.exclude = exclude or []
+
+    def is_watched(self, file_path):
+        """Check if a changed file is one of the watched templates
+
+        Args:
+            file_path (string): normalized file path
+
+        Returns:
+            boolean: True if the file is a jinja file in the watched paths
+                     and is not excluded
+        """
+        if not is_valid_file_type(file_path):
+            return False
+        if is_excluded(file_path, os.path.basename(file_path), self.exclude):
+            return False
+        file_path = os.path.abspath(file_path)
+        if file_path in self.watched_paths:
+            return True
+        return any(os.path.isdir(name) and
+                   file_path.startswith(os.path.join(name, ""))
+                   for name in self.watched_paths)
+
+    @abc.abstractmethod
+    def read_changes(self, timeout):
+        """Returns the templates changed since the previous call
+
+        Args:
+            timeout (float): maximum time to wait for a change in seconds,
+                             None to wait forever
+
+        Returns:
+            set: changed file paths, empty if the timeout expired
+        """
+
+    def wait_for_changes(self, debounce=DEBOUNCE):
+        """Waits for changes and returns them once no more change happened
+        for the debounce delay
+
+        Args:
+            debounce (float, optional): quiet delay in seconds. Defaults to DEBOUNCE.
+
+        Returns:
+            set: changed file paths
+        """
+        changes = set()
+        while not changes:
+            changes = self.read_changes(None)
+        while True:
+            more_changes = self.read_changes(debounce)
+            if not more_changes:
+                return changes
+            changes.update(more_changes)
+
+    def close(self):
+        """Releases the resources of the watcher"""
+
+
+class PollingWatcher(Watcher):
+    """Class to watch the templates by comparing their modification time and
+    size at regular intervals
+    """
+
+    def __init__(self, file_or_dir_names, exclude=None, interval=POLL_INTERVAL):
+        super().__init__(file_or_dir_names, exclude)
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        """Returns the modification time and size of the templates
+
+        Returns:
+            dict: tuple of modification time and size indexed by file path
+        """
+        snapshot = {}
+        for file_path in get_files(self.file_or_dir_names, self.exclude):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read_changes(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(deadline - time.monotonic(), 0))
+            time.sleep(delay)
+            snapshot = self.take_snapshot()
+            changes = {path for path in set(snapshot) | set(self.snapshot)
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changes or (deadline is not None and time.monotonic() >= deadline):
+                return changes
+
+
+class InotifyWatcher(Watcher):
+    """Class to watch the templates with the Linux inotify API
+
+    Raises:
+        OSError: Raises error if inotify is not available
+    """
+
+    def __init__(self, file_or_dir_names, exclude=None):
+        super().__init__(file_or_dir_names, exclude)
+        libc_name = ctypes.util.find_library("c")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        for name in self.file_or_dir_names:
+            if os.path.isdir(name):
+                self.add_directory(name)
+            else:
+                self.add_watch(os.path.dirname(name) or os.curdir)
+
+    def add_watch(self, directory):
+        """Watches a single directory
+
+        Args:
+            directory (string): directory path
+        """
+        wd = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), INOTIFY_MASK)
+        if wd < 0:
+            logger.warning("Cannot watch directory %s", directory)
+            return
+        self.directories[wd] = directory
+
+    def add_directory(self, directory):
+        """Watches a directory and its sub directories, except the pruned
+        directories
+
+        Args:
+            directory (string): directory path
+
+        Returns:
+            set: files found in the directories
+        """
+        files = set()
+        if is_pruned(directory, os.path.basename(directory), self.exclude):
+            return files
+        for root, dir_names, file_names in os.walk(directory):
+            dir_names[:] = [name for name in dir_names
+                            if not is_pruned(os.path.join(root, name), name, self.exclude)]
+            self.add_watch(root)
+            files.update(os.path.join(root, f) for f in file_names)
+        return files
+
+    def read_changes(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changes = set()
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return changes
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if wd not in self.directories:
+                continue
+            path = os.path.normpath(os.path.join(self.directories[wd], name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changes.update(self.add_directory(path))
+                continue
+            changes.add(path)
+        return {path for path in changes if self.is_watched(path)}
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(file_or_dir_names, exclude=None):
+    """Creates an inotify watcher where available, a polling watcher
+    otherwise
+
+    Args:
+        file_or_dir_names (list): list of directories and files to watch
+        exclude (list, optional): glob patterns of the files and directories
+                                  not to watch. Defaults to None.
+
+    Returns:
+        Watcher: watcher object
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(file_or_dir_names, exclude)
+        except (OSError, AttributeError) as e:
+            logger.info("Falling back to polling: %s", e)
+    return PollingWatcher(file_or_dir_names, exclude)
+
+
+def watch(lint_files, file_or_dir_names, exclude=None, watcher=None, debounce=DEBOUNCE):
+    """Lints all the templates then lints again the templates which change
+    until interrupted
+
+    Args:
+        lint_files (function): function called with the paths of the files
+                               to lint, once for all the templates then once
+                               for each batch of changes
+        file_or_dir_names (list): list of directories and files to watch
+        exclude (list, optional): glob patterns of the files and directories
+                                  not to watch. Defaults to None.
+        watcher (Watcher, optional): watcher to use. Defaults to the best
+                                     one available.
+        debounce (float, optional): quiet delay in seconds before linting
+                                    the changes. Defaults to DEBOUNCE.
+    """
+    file_or_dir_names = sorted(file_or_dir_names)
+    if watcher is None:
+        watcher = create_watcher(file_or_dir_names, exclude)
+    try:
+        lint_files(iter_files(file_or_dir_names, exclude))
+        while True:
+            changes = sorted(watcher.wait_for_changes(debounce))
+            changed_files = [file_path for file_path in changes if os.path.isfile(file_path)]
+            if changed_files:
+                lint_files(changed_files)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
@@ -20,7 +20,7 @@ setuptools.setup(
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",
     ],
-    packages=setuptools.find_packages(exclude=["tests", "tests.*"]),
+    packages=setuptools.find_packages(exclude=["tests", "tests.*", "benchmarks", "benchmarks.*"]),
     entry_points={
         "console_scripts": [
             "j2lint = j2lint.cli:run",
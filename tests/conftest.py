@@ -1,6 +1,7 @@
 """
 content of conftest.py
 """
+import subprocess
 from unittest.mock import create_autospec
 import pytest
 from j2lint.settings import settings
@@ -211,3 +212,29 @@ def template_tmp_dir(tmp_path_factory):
     rules_hidden_subdir_txt.write_text(CONTENT)
 
     yield [str(rules)]
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    """
+    Create a git repository with committed templates then change some of them:
+    roles/a.j2 is modified, roles/b.j2 is deleted, c.j2 is staged and d.txt
+    is modified. The repository is the current directory during the test.
+    """
+    def git(*args):
+        subprocess.run(["git", "-c", "user.name=j2lint", "-c", "user.email=j2lint@example.com",
+                        *args], cwd=tmp_path, check=True, stdout=subprocess.DEVNULL)
+
+    (tmp_path / "roles").mkdir()
+    for name in ["roles/a.j2", "roles/b.j2", "d.txt"]:
+        (tmp_path / name).write_text("{{ value }}\n")
+    git("init", "-q")
+    git("add", ".")
+    git("commit", "-q", "-m", "initial")
+    (tmp_path / "roles" / "a.j2").write_text("{{value}}\n")
+    (tmp_path / "roles" / "b.j2").unlink()
+    (tmp_path / "c.j2").write_text("{{ Value }}\n")
+    git("add", "c.j2")
+    (tmp_path / "d.txt").write_text("{{value}}\n")
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
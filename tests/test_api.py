@@ -0,0 +1,44 @@
+"""
+Tests for j2lint.api.py
+"""
+from unittest.mock import patch
+
+from j2lint.api import lint_text, get_default_collection
+from j2lint.linter.collection import RulesCollection
+
+
+def test_lint_text():
+    """
+    Test j2lint.api.lint_text does not access the file system
+    """
+    with patch("j2lint.linter.collection.open") as mocked_open:
+        errors, warnings = lint_text("{%set test=42 %}\n{{ Value }}")
+        mocked_open.assert_not_called()
+    assert sorted(
+        (error.rule.id, error.linenumber, error.filename) for error in errors
+    ) == [
+        ("S4", 1, "<stdin>"),
+        ("V1", 2, "<stdin>"),
+    ]
+    assert warnings == []
+
+
+def test_lint_text_filename_and_collection():
+    """
+    Test j2lint.api.lint_text with a filename and a custom collection
+    """
+    collection = RulesCollection.create_from_directory("j2lint/rules", ["S4"], ["V1"])
+    errors, warnings = lint_text(
+        "{%set test=42 %}\n{{ Value }}", filename="template", collection=collection
+    )
+    assert errors == []
+    assert [(warning.rule.id, warning.filename) for warning in warnings] == [
+        ("V1", "template")
+    ]
+
+
+def test_get_default_collection():
+    """
+    Test that the default collection is loaded once
+    """
+    assert get_default_collection() is get_default_collection()
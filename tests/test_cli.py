@@ -1,9 +1,11 @@
 """
 Tests for j2lint.cli.py
 """
+import json
 import logging
 import os
-import re
+import subprocess
+import sys
 from unittest.mock import create_autospec, patch
 from argparse import Namespace
 
@@ -11,6 +13,7 @@ import pytest
 
 from j2lint.settings import settings
 from j2lint.cli import sort_issues, sort_and_print_issues, create_parser, run, RULES_DIR
+from j2lint.linter.collection import RulesCollection
 from j2lint.linter.error import LinterError
 
 from .utils import does_not_raise, j2lint_default_rules_string
@@ -24,16 +27,31 @@ def default_namespace():
     return Namespace(
         files=[],
         ignore=[],
+        select=[],
         warn=[],
         list=False,
         rules_dir=[RULES_DIR],
         verbose=False,
         debug=False,
         json=False,
+        format="text",
         stdin=False,
         log=False,
         version=False,
         vv=False,
+        jobs=1,
+        cache_dir=None,
+        watch=False,
+        changed_since=None,
+        staged=False,
+        profile=False,
+        profile_format="text",
+        socket=None,
+        exclude=[],
+        fail_fast=False,
+        max_errors=None,
+        shard=None,
+        shard_timings=None,
     )
 
 
@@ -382,21 +400,399 @@ def test_run_stdin(capsys):
     ```
 
     In this test, the isatty answer is mocked.
+    The template must be linted in memory without any temporary file.
     """
     with patch("logging.disable") as mocked_logging_disable, patch(
         "sys.stdin"
-    ) as patched_stdin, patch("os.unlink", side_effect=os.unlink) as mocked_os_unlink:
+    ) as patched_stdin, patch("tempfile.NamedTemporaryFile") as mocked_tmpfile, patch(
+        "j2lint.linter.collection.open"
+    ) as mocked_open:
         patched_stdin.isatty.return_value = False
         patched_stdin.read.return_value = "{%set test=42 %}"
         run_return_value = run(["--log", "--stdin"])
         patched_stdin.isatty.assert_called_once()
+        mocked_tmpfile.assert_not_called()
+        mocked_open.assert_not_called()
         captured = capsys.readouterr()
-        matches = re.match(
-            r"\nJINJA2 LINT ERRORS\n\*\*\*\*\*\*\*\*\*\*\*\* File \/.*\n(\/.*.j2):1 Jinja statement should have a single space before and after: '{% statement %}' \(jinja-statements-single-space\)\nJinja2 linting finished with 1 issue\(s\) and 0 warning\(s\)\n",
-            captured.out,
-            re.MULTILINE,
+        assert captured.out == (
+            "\nJINJA2 LINT ERRORS\n"
+            "************ File <stdin>\n"
+            "<stdin>:1 Jinja statement should have a single space before and after: "
+            "'{% statement %}' (jinja-statements-single-space)\n"
+            "Jinja2 linting finished with 1 issue(s) and 0 warning(s)\n"
         )
-        assert matches is not None
-        mocked_os_unlink.assert_called_with(matches.groups()[0])
-        assert os.path.exists(matches.groups()[0]) == False
         assert run_return_value == 2
+
+
+def test_run_jobs(capsys):
+    """
+    Test j2lint.cli.run with --jobs
+
+    The output of the parallel run must match the serial run
+    """
+    files = [
+        "tests/test_rules/data/JinjaOperatorHasSpaceRule.j2",
+        "tests/test_rules/data/JinjaStatementHasSpacesRule.j2",
+        "tests/test_rules/data/JinjaTemplateIndentationRule.j2",
+        "tests/test_rules/data/JinjaVariableNameCaseRule.j2",
+    ]
+    with patch("logging.disable"):
+        serial_return_value = run(files)
+        serial_captured = capsys.readouterr()
+        parallel_return_value = run(["--jobs", "2"] + files)
+        parallel_captured = capsys.readouterr()
+    assert parallel_return_value == serial_return_value == 2
+    assert parallel_captured.out == serial_captured.out
+
+
+def test_run_cache_dir(capsys, tmp_path):
+    """
+    Test j2lint.cli.run with --cache-dir
+
+    The second run must replay the results from the cache without
+    running the rules
+    """
+    cache_dir = str(tmp_path / "cache")
+    argv = ["--cache-dir", cache_dir, "tests/test_rules/data/JinjaStatementHasSpacesRule.j2"]
+    with patch("logging.disable"):
+        first_return_value = run(argv)
+        first_captured = capsys.readouterr()
+        with patch("j2lint.cli.Runner.run") as mocked_runner_run:
+            second_return_value = run(argv)
+            second_captured = capsys.readouterr()
+            mocked_runner_run.assert_not_called()
+    assert first_return_value == second_return_value == 2
+    assert first_captured.out == second_captured.out
+
+
+def test_run_cache_dir_truncated(capsys, tmp_path):
+    """
+    Test j2lint.cli.run with --cache-dir saves the cache index when the
+    linting stops at the maximum number of errors
+    """
+    cache_dir = tmp_path / "cache"
+    (tmp_path / "a.j2").write_text("{{ a }}\n")
+    (tmp_path / "b.j2").write_text("{%set b=42 %}\n{%set c=42 %}\n")
+    with patch("logging.disable"):
+        run_return_value = run(["--cache-dir", str(cache_dir), "--max-errors", "1",
+                                str(tmp_path / "a.j2"), str(tmp_path / "b.j2")])
+    capsys.readouterr()
+    assert run_return_value == 3
+    [index_file] = cache_dir.glob("*/index.json")
+    assert str(tmp_path / "a.j2") in json.loads(index_file.read_text())
+
+
+def test_run_watch(capsys):
+    """
+    Test j2lint.cli.run with --watch reports each batch of linted files with
+    the selected reporter
+    """
+    file_name = "tests/test_rules/data/JinjaStatementHasSpacesRule.j2"
+
+    def fake_watch(lint_files, file_or_dir_names, exclude):
+        assert file_or_dir_names == {file_name}
+        assert exclude == ["*.bak.j2"]
+        lint_files([file_name])
+        lint_files([file_name])
+
+    with patch("logging.disable"), patch("j2lint.watch.watch", side_effect=fake_watch):
+        run_return_value = run(["--watch", file_name, "--exclude", "*.bak.j2"])
+    captured = capsys.readouterr()
+    assert captured.out.count("Jinja2 linting finished with 3 issue(s) and 0 warning(s)") == 2
+    assert run_return_value == 0
+
+    with patch("logging.disable"), patch("j2lint.watch.watch", side_effect=fake_watch):
+        run_return_value = run(["--watch", file_name, "--exclude", "*.bak.j2",
+                                "--format", "ndjson"])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 6
+    assert {json.loads(line)["filename"] for line in lines} == {file_name}
+
+
+def test_run_changed_since(capsys, git_repo):
+    """
+    Test j2lint.cli.run with --changed-since only lints the changed templates
+    """
+    with patch("logging.disable"):
+        run_return_value = run(["--changed-since", "HEAD", "roles"])
+    captured = capsys.readouterr()
+    assert captured.out == (
+        "\nJINJA2 LINT ERRORS\n"
+        "************ File roles/a.j2\n"
+        "roles/a.j2:1 A single space shall be added between Jinja2 curly brackets "
+        "and a variable\u2019s name: '{{ ethernet_interface }}' (single-space-decorator)\n"
+        "Jinja2 linting finished with 1 issue(s) and 0 warning(s)\n"
+    )
+    assert run_return_value == 2
+
+    with patch("logging.disable"):
+        run_return_value = run(["--staged", "roles"])
+    assert capsys.readouterr().out == "Linting complete. No problems found.\n"
+    assert run_return_value == 0
+
+
+def test_run_changed_since_bad_ref(capsys, git_repo):
+    """
+    Test j2lint.cli.run with --changed-since and an unknown git ref
+    """
+    with patch("logging.disable"), pytest.raises(SystemExit):
+        run(["--changed-since", "unknown-ref"])
+    assert "unable to get the changed files from git" in capsys.readouterr().err
+
+
+def test_run_format_ndjson(capsys):
+    """
+    Test j2lint.cli.run with --format ndjson prints one JSON object per issue
+    """
+    file_name = "tests/test_rules/data/JinjaStatementHasSpacesRule.j2"
+    with patch("logging.disable"):
+        run_return_value = run(["--format", "ndjson", file_name])
+    captured = capsys.readouterr()
+    issues = [json.loads(line) for line in captured.out.splitlines()]
+    assert [(issue["id"], issue["linenumber"], issue["type"]) for issue in issues] == [
+        ("S4", 1, "error"), ("S4", 2, "error"), ("S4", 3, "error")
+    ]
+    assert captured.err.endswith("Jinja2 linting finished with 3 issue(s) and 0 warning(s)\n")
+    assert run_return_value == 2
+
+
+def test_run_format_sarif(capsys):
+    """
+    Test j2lint.cli.run with --format sarif prints a SARIF log
+    """
+    file_name = "tests/test_rules/data/JinjaStatementHasSpacesRule.j2"
+    with patch("logging.disable"):
+        run_return_value = run(["--format", "sarif", file_name])
+    sarif = json.loads(capsys.readouterr().out)
+    rule_ids = [rule["id"] for rule in sarif["runs"][0]["tool"]["driver"]["rules"]]
+    assert sorted(rule_ids) == ["S0", "S1", "S2", "S3", "S4", "S5", "S6", "S7", "V1", "V2"]
+    results = sarif["runs"][0]["results"]
+    assert [(result["ruleId"], result["locations"][0]["physicalLocation"]["region"]["startLine"])
+            for result in results] == [("S4", 1), ("S4", 2), ("S4", 3)]
+    assert all(rule_ids[result["ruleIndex"]] == "S4" for result in results)
+    assert run_return_value == 2
+
+
+@pytest.mark.parametrize("profile_format", ["text", "json"])
+def test_run_profile(capsys, profile_format):
+    """
+    Test j2lint.cli.run with --profile reports the rules and files times
+    """
+    file_name = "tests/test_rules/data/JinjaStatementHasSpacesRule.j2"
+    with patch("logging.disable"):
+        run_return_value = run(["--profile", "--profile-format", profile_format, file_name])
+    captured = capsys.readouterr()
+    assert captured.out.endswith("Jinja2 linting finished with 3 issue(s) and 0 warning(s)\n")
+    if profile_format == "json":
+        profile = json.loads(captured.err.splitlines()[-1])["profile"]
+        assert profile["files"] == 1
+        assert sorted(profile["rules"]) == ["S0", "S1", "S2", "S3", "S4", "S5", "S6", "S7", "V1", "V2"]
+        assert profile["slowest_files"][0]["path"] == file_name
+    else:
+        assert "Profile: 1 file(s)" in captured.err
+        assert f"s         50 bytes {file_name}" in captured.err
+    assert run_return_value == 2
+
+
+def test_run_version_startup():
+    """
+    Test that j2lint.cli.run --version neither imports jinja2 nor loads the rules
+    """
+    code = (
+        "import sys\n"
+        "from unittest.mock import patch\n"
+        "from j2lint.cli import run\n"
+        "with patch('j2lint.cli.RulesCollection.create_from_directory') as mocked:\n"
+        "    run(['--version'])\n"
+        "assert not mocked.called\n"
+        "assert 'jinja2' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+
+
+def test_cli_import_startup():
+    """
+    Test that importing j2lint.cli does not import the modules of the optional
+    features
+    """
+    code = (
+        "import sys\n"
+        "import j2lint.cli\n"
+        "for name in ('multiprocessing', 'socketserver', 'ctypes', 'urllib.parse',\n"
+        "             'j2lint.server', 'j2lint.shard', 'j2lint.watch'):\n"
+        "    assert name not in sys.modules, name\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+
+
+def test_run_select(capsys):
+    """
+    Test j2lint.cli.run with --select only runs the selected rules
+    """
+    file_name = "tests/test_rules/data/JinjaStatementDelimiterRule.j2"
+    with patch("logging.disable"):
+        run_return_value = run(["--select", "S6", "--format", "ndjson", file_name])
+    issues = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert issues and {issue["id"] for issue in issues} == {"S6"}
+    assert run_return_value == 2
+
+
+def test_run_exclude(capsys):
+    """
+    Test j2lint.cli.run with --exclude does not lint the excluded templates
+    """
+    with patch("logging.disable"):
+        run_return_value = run(["tests/test_rules/data", "--exclude", "*Rule.j2", "*.j2"])
+    assert capsys.readouterr().out == "Linting complete. No problems found.\n"
+    assert run_return_value == 0
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_run_duplicate_templates(tmp_path, capsys, jobs):
+    """
+    Test j2lint.cli.run lints the templates with the same content once and
+    reports the issues of each template
+    """
+    text = "{%set test=42 %}\n"
+    for name in ("a.j2", "b.j2", "c.j2"):
+        (tmp_path / name).write_text(text)
+    (tmp_path / "d.j2").write_text("{{ value }}\n")
+    with patch("logging.disable"), patch(
+            "j2lint.linter.collection.RulesCollection.run_context",
+            autospec=True,
+            side_effect=RulesCollection.run_context) as run_context:
+        run_return_value = run([str(tmp_path), "--format", "json", "--jobs", jobs])
+    output = json.loads(capsys.readouterr().out)
+    filenames = [error["filename"] for error in output["ERRORS"]]
+    for name in ("a.j2", "b.j2", "c.j2"):
+        assert filenames.count(str(tmp_path / name)) == 1
+    assert run_return_value == 2
+    if jobs == "1":
+        assert run_context.call_count == 2
+
+
+def test_run_lints_while_walking(tmp_path):
+    """
+    Test j2lint.cli.run lints each template before the next one is found
+    """
+    for name in ("a.j2", "b.j2", "c.j2"):
+        (tmp_path / name).write_text(f"{{{{ {name[0]} }}}}\n")
+    events = []
+
+    def iter_files(file_or_dir_names, exclude=None):
+        for name in ("a.j2", "b.j2", "c.j2"):
+            events.append(("found", name))
+            yield str(tmp_path / name)
+
+    def run_context(self, file_dict, context):
+        events.append(("linted", os.path.basename(file_dict["path"])))
+        return [], []
+
+    with patch("logging.disable"), patch("j2lint.cli.iter_files", iter_files), patch(
+            "j2lint.linter.collection.RulesCollection.run_context", run_context):
+        run([str(tmp_path)])
+    assert events == [("found", "a.j2"), ("linted", "a.j2"),
+                      ("found", "b.j2"), ("linted", "b.j2"),
+                      ("found", "c.j2"), ("linted", "c.j2")]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_run_fail_fast(capsys, jobs):
+    """
+    Test j2lint.cli.run with --fail-fast and --max-errors stops at the
+    maximum number of errors and reports the linting was truncated
+    """
+    with patch("logging.disable"):
+        run_return_value = run(["tests/test_rules/data", "--fail-fast", "--jobs", jobs])
+    captured = capsys.readouterr()
+    assert captured.out.count(".j2:") == 1
+    assert captured.out.endswith(
+        "Jinja2 linting stopped after the maximum number of errors with "
+        "1 issue(s) and 0 warning(s)\n")
+    assert run_return_value == 3
+
+    with patch("logging.disable"):
+        run_return_value = run(["tests/test_rules/data", "--max-errors", "4",
+                                "--format", "json", "--jobs", jobs])
+    output = json.loads(capsys.readouterr().out)
+    assert len(output["ERRORS"]) == 4
+    assert output["TRUNCATED"] is True
+    assert run_return_value == 3
+
+    with patch("logging.disable"):
+        run_return_value = run(["tests/test_rules/data/JinjaStatementHasSpacesRule.j2",
+                                "--max-errors", "10", "--jobs", jobs])
+    assert capsys.readouterr().out.endswith(
+        "Jinja2 linting finished with 3 issue(s) and 0 warning(s)\n")
+    assert run_return_value == 2
+
+
+def test_run_max_errors_invalid(capsys):
+    """
+    Test j2lint.cli.run with a --max-errors value which is not a positive
+    integer
+    """
+    with pytest.raises(SystemExit):
+        run(["tests/test_rules/data", "--max-errors", "0"])
+    assert "expected a positive integer and got '0'" in capsys.readouterr().err
+
+
+def test_run_shard_and_merge_reports(capsys, tmp_path):
+    """
+    Test j2lint.cli.run with --shard lints each file in a single shard and
+    the merged reports of the shards match the report of all the files
+    """
+    with patch("logging.disable"):
+        run(["tests/test_rules/data", "--format", "json"])
+    expected = json.loads(capsys.readouterr().out)
+
+    reports = []
+    for index in (1, 2, 3):
+        with patch("logging.disable"):
+            run(["tests/test_rules/data", "--format", "json", "--shard", f"{index}/3"])
+        report = tmp_path / f"shard_{index}.json"
+        report.write_text(capsys.readouterr().out)
+        reports.append(str(report))
+
+    with patch("logging.disable"):
+        run_return_value = run(["merge-reports"] + reports)
+    merged = json.loads(capsys.readouterr().out)
+    for issue_type in ("ERRORS", "WARNINGS"):
+        assert sorted(map(json.dumps, merged[issue_type])) == sorted(
+            map(json.dumps, expected[issue_type]))
+    assert run_return_value == 2
+
+
+def test_run_shard_timings(capsys, tmp_path):
+    """
+    Test j2lint.cli.run with --shard ignores the timings of the cache and
+    only balances the shards with the --shard-timings file
+    """
+    files = [os.path.join("tests/test_rules/data", name)
+             for name in sorted(os.listdir("tests/test_rules/data"))]
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "timings.json").write_text(
+        json.dumps(dict(dict.fromkeys(files, 0.001), **{files[0]: 1000.0})))
+    timings_file = tmp_path / "timings.json"
+    timings_file.write_text(json.dumps(dict(dict.fromkeys(files, 0.001), **{files[-1]: 1000.0})))
+
+    def get_linted_files(*options):
+        linted_files = []
+        for index in (1, 2):
+            with patch("logging.disable"):
+                run(["tests/test_rules/data", "--format", "json", "--shard", f"{index}/2",
+                     *options])
+            output = json.loads(capsys.readouterr().out)
+            linted_files.append({issue["filename"] for issue_type in ("ERRORS", "WARNINGS")
+                                 for issue in output[issue_type]})
+        return linted_files
+
+    by_size = get_linted_files()
+    assert get_linted_files("--cache-dir", str(cache_dir)) == by_size
+    assert get_linted_files("--shard-timings", str(timings_file))[0] == {files[-1]}
+
+    with patch("logging.disable"), pytest.raises(SystemExit):
+        run(["tests/test_rules/data", "--shard", "1/2", "--shard-timings",
+             str(tmp_path / "missing.json")])
+    assert "unable to read the shard timings" in capsys.readouterr().err
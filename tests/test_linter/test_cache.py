@@ -0,0 +1,132 @@
+"""
+Tests for j2lint.linter.cache.py
+"""
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from j2lint.linter.cache import (ResultCache, get_rules_fingerprint, load_timings,
+                                 MAX_FINGERPRINT_AGE)
+from j2lint.linter.collection import RulesCollection
+
+TEMPLATE = "{%set test=42 %}\n{{ value }}\n"
+
+
+@pytest.fixture
+def collection():
+    return RulesCollection.create_from_directory("j2lint/rules", [], [])
+
+
+@pytest.fixture
+def template(tmp_path):
+    template = tmp_path / "template.j2"
+    template.write_text(TEMPLATE)
+    yield str(template)
+
+
+def test_get_rules_fingerprint(collection):
+    """
+    Test that the fingerprint changes with the rules settings
+    """
+    fingerprint = get_rules_fingerprint(collection, ["j2lint/rules"])
+    assert fingerprint == get_rules_fingerprint(collection, ["j2lint/rules"])
+    collection.rules[0].ignore = True
+    assert fingerprint != get_rules_fingerprint(collection, ["j2lint/rules"])
+
+
+def test_result_cache(tmp_path, collection, template):
+    """
+    Test the ResultCache get, put and save methods
+    """
+    cache_dir = str(tmp_path / "cache")
+    cache = ResultCache(cache_dir, collection, ["j2lint/rules"])
+    assert cache.get(template) is None
+    errors, warnings = collection.run({"path": template})
+    assert errors
+    cache.put(template, errors, warnings)
+    cache.save()
+
+    cache = ResultCache(cache_dir, collection, ["j2lint/rules"])
+    cached_errors, cached_warnings = cache.get(template)
+    assert [error.to_dict() for error in cached_errors] == [
+        error.to_dict() for error in errors
+    ]
+    assert cached_warnings == []
+    assert cache.hits == 1
+
+    # A modified file is a cache miss
+    with open(template, "a") as f:
+        f.write("{{ other }}\n")
+    assert cache.get(template) is None
+
+
+def test_result_cache_eviction(tmp_path, collection, template):
+    """
+    Test that stale entries are evicted when saving the cache
+    """
+    cache_dir = str(tmp_path / "cache")
+    cache = ResultCache(cache_dir, collection, ["j2lint/rules"])
+    cache.get(template)
+    cache.put(template, *collection.run({"path": template}))
+    cache.save()
+    recent_fingerprint = os.path.join(cache_dir, "1" * 64)
+    os.makedirs(recent_fingerprint)
+    stale_fingerprint = os.path.join(cache_dir, "0" * 64)
+    os.makedirs(stale_fingerprint)
+    stale_time = time.time() - MAX_FINGERPRINT_AGE - 60
+    os.utime(stale_fingerprint, (stale_time, stale_time))
+    entries = os.listdir(cache.directory)
+    assert len(entries) == 2
+
+    os.unlink(template)
+    cache = ResultCache(cache_dir, collection, ["j2lint/rules"])
+    cache.save()
+    assert os.listdir(cache.directory) == ["index.json"]
+    assert not os.path.exists(stale_fingerprint)
+    assert os.path.exists(recent_fingerprint)
+
+
+def test_result_cache_alternating_settings(tmp_path, collection, template):
+    """
+    Test that runs with different rules settings keep each other's results
+    and that only the most recently used fingerprints are kept
+    """
+    cache_dir = str(tmp_path / "cache")
+    cache = ResultCache(cache_dir, collection, ["j2lint/rules"])
+    cache.get(template)
+    cache.put(template, *collection.run({"path": template}))
+    cache.save()
+
+    collection.rules[0].ignore = True
+    other_cache = ResultCache(cache_dir, collection, ["j2lint/rules"])
+    other_cache.get(template)
+    other_cache.save()
+    collection.rules[0].ignore = False
+    cache = ResultCache(cache_dir, collection, ["j2lint/rules"])
+    assert cache.get(template) is not None
+
+    with patch("j2lint.linter.cache.MAX_FINGERPRINTS", 1):
+        cache.save()
+    assert not os.path.exists(other_cache.directory)
+
+
+def test_result_cache_timings(tmp_path, collection, template):
+    """
+    Test that the linting time of the files is kept whatever the rules
+    """
+    cache_dir = str(tmp_path / "cache")
+    assert load_timings(cache_dir) == {}
+    cache = ResultCache(cache_dir, collection, ["j2lint/rules"])
+    cache.get(template)
+    cache.put(template, *collection.run({"path": template}), 0.5)
+    cache.save()
+    assert load_timings(cache_dir) == {template: 0.5}
+
+    collection.rules[0].ignore = True
+    cache = ResultCache(cache_dir, collection, ["j2lint/rules"])
+    assert cache.timings == {template: 0.5}
+    os.unlink(template)
+    cache.save()
+    assert load_timings(cache_dir) == {}
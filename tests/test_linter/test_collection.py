@@ -6,6 +6,7 @@ import pytest
 from unittest import mock
 
 from j2lint.linter.collection import RulesCollection
+from j2lint.linter.context import create_environment
 from j2lint.rules.JinjaTemplateSyntaxErrorRule import JinjaTemplateSyntaxErrorRule
 from j2lint.rules.JinjaOperatorHasSpaceRule import JinjaOperatorHasSpaceRule
 from j2lint.rules.JinjaStatementDelimiterRule import JinjaStatementDelimiterRule
@@ -128,6 +129,60 @@ class TestRulesCollection:
                 "Skipping linting rule T3" in message for message in caplog.messages
             )
 
+    def test_get_environment(self):
+        """
+        Test that a single jinja2 environment is created per collection
+        """
+        collection = RulesCollection.create_from_directory("j2lint/rules", [], [])
+        with mock.patch(
+            "j2lint.linter.collection.create_environment",
+            side_effect=create_environment,
+        ) as patched_create_environment:
+            collection.run({"path": "tests/test_rules/data/JinjaTemplateSyntaxErrorRule.j2"})
+            collection.run({"path": "tests/test_rules/data/JinjaTemplateNoTabsRule.j2"})
+            patched_create_environment.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "file_name",
+        [
+            "JinjaTemplateSyntaxErrorRule.j2",
+            "JinjaTemplateIndentationRule.j2",
+            "JinjaVariableNameFormatRule.j2",
+            "JinjaStatementDelimiterRule.j2",
+        ],
+    )
+    def test_run_large_file(self, file_name):
+        """
+        Test that the large files are memory mapped and get the same issues
+        """
+        collection = RulesCollection.create_from_directory("j2lint/rules", [], [])
+        file_dict = {"path": f"tests/test_rules/data/{file_name}", "type": "jinja"}
+        expected = [[error.to_dict() for error in issues]
+                    for issues in collection.run(file_dict)]
+        collection.large_file_size = 0
+        with mock.patch.object(
+            collection, "run_large_file", wraps=collection.run_large_file
+        ) as patched_run_large_file:
+            issues = collection.run(file_dict)
+        patched_run_large_file.assert_called_once()
+        assert [[error.to_dict() for error in issues]
+                for issues in issues] == expected
+
+    def test_run_max_errors(self):
+        """
+        Test that the remaining rules are skipped once the maximum number of
+        errors is found
+        """
+        collection = RulesCollection.create_from_directory("j2lint/rules", [], [])
+        file_dict = {"path": "tests/test_rules/data/JinjaStatementHasSpacesRule.j2"}
+        collection.max_errors = 2
+        with mock.patch.object(
+            JinjaTemplateSyntaxErrorRule, "checkfulltext", return_value=[]
+        ) as patched_checkfulltext:
+            errors, _ = collection.run(file_dict)
+        assert [error.linenumber for error in errors] == [1, 2]
+        patched_checkfulltext.assert_not_called()
+
     def test__repr__(self, test_collection, test_other_rule):
         """
         Test the RuleCollection.extend method
@@ -194,3 +249,30 @@ class TestRulesCollection:
                     and rule.deprecated_short_description in warn_rules
                 ):
                     assert rule in rule.warn
+
+    @pytest.mark.parametrize(
+        "ignore_rules, select_rules, skip_ignored, expected_ids, expected_ignored",
+        [
+            pytest.param(["S0", "jinja-statements-delimeter"], None, True,
+                         ["S1", "S2", "S3", "S4", "S5", "S7", "V1", "V2"], [], id="skip_ignored"),
+            pytest.param([], ["S4", "jinja-variable-format"], True,
+                         ["S4", "V2"], [], id="select"),
+            pytest.param(["S4"], ["S4", "S5"], True, ["S5"], [], id="select_and_ignore"),
+            pytest.param(["S0"], ["S4"], False,
+                         ["S0", "S1", "S2", "S3", "S4", "S5", "S6", "S7", "V1", "V2"],
+                         ["S0", "S1", "S2", "S3", "S5", "S6", "S7", "V1", "V2"],
+                         id="no_skip"),
+        ],
+    )
+    def test_create_from_directory_select(
+        self, ignore_rules, select_rules, skip_ignored, expected_ids, expected_ignored
+    ):
+        """
+        Test that the modules of the ignored or unselected rules are not loaded
+        when skipped and are flagged as ignored otherwise
+        """
+        collection = RulesCollection.create_from_directory(
+            "j2lint/rules", ignore_rules, [], select_rules, skip_ignored
+        )
+        assert sorted(rule.id for rule in collection) == expected_ids
+        assert sorted(rule.id for rule in collection if rule.ignore) == expected_ignored
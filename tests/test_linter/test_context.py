@@ -0,0 +1,143 @@
+"""
+Tests for j2lint.linter.context.py
+"""
+from unittest import mock
+
+import jinja2
+import pytest
+
+from j2lint.linter.context import (FileContext, LargeFileContext,
+                                   create_environment)
+
+TEXT = (
+    "{# a comment #}\n"
+    "{% if switch %}\n"
+    "  {{ value }} {% set a = 1 %}\n"
+    "{% endif %}"
+)
+
+
+class TestFileContext:
+    def test_from_text(self):
+        """
+        Test that from_text wraps a text and returns an existing context as is
+        """
+        context = FileContext.from_text({"path": "test.j2"}, TEXT)
+        assert isinstance(context, FileContext)
+        assert context.text == TEXT
+        assert FileContext.from_text({"path": "test.j2"}, context) is context
+
+    def test_lines(self):
+        """
+        Test the lines and line_offsets properties
+        """
+        context = FileContext({"path": "test.j2"}, TEXT)
+        assert context.lines == TEXT.split("\n")
+        assert context.line_offsets == [0, 16, 32, 62]
+        for offset, line in zip(context.line_offsets, context.lines):
+            assert TEXT[offset:].startswith(line)
+
+    def test_jinja_elements(self):
+        """
+        Test the statements, variables and comments properties
+        """
+        context = FileContext({"path": "test.j2"}, TEXT)
+        assert [statement[0] for statement in context.statements] == [
+            " if switch ",
+            " set a = 1 ",
+            " endif ",
+        ]
+        assert [statement[0] for statement in context.indentation_statements] == [
+            " if switch ",
+            " endif ",
+        ]
+        assert context.variables == [" value "]
+        assert context.comments == [" a comment "]
+        assert context.get_line_statements(2)[0][0] == " set a = 1 "
+        assert context.get_line_variables(2) == [" value "]
+
+    def test_lazy_evaluation(self):
+        """
+        Test that each element is only computed once
+        """
+        with mock.patch(
+            "j2lint.linter.context.get_jinja_statements", return_value=[]
+        ) as patched_statements:
+            context = FileContext({"path": "test.j2"}, TEXT)
+            patched_statements.assert_not_called()
+            for _ in range(3):
+                context.statements
+                context.get_line_statements(1)
+            assert patched_statements.call_count == 2
+
+    def test_parse(self):
+        """
+        Test that the template is parsed once and the AST is shared
+        """
+        environment = create_environment()
+        with mock.patch.object(
+            environment, "parse", wraps=environment.parse
+        ) as patched_parse:
+            context = FileContext({"path": "test.j2"}, TEXT, lambda: environment)
+            assert context.ast is not None
+            assert context.syntax_error is None
+            assert context.ast is context.ast
+            patched_parse.assert_called_once_with(TEXT)
+
+    def test_parse_syntax_error(self):
+        """
+        Test that the syntax error is stored on the context
+        """
+        context = FileContext({"path": "test.j2"}, "{% if a %}\n")
+        assert context.ast is None
+        assert isinstance(context.syntax_error, jinja2.TemplateSyntaxError)
+        assert context.syntax_error.lineno == 1
+
+
+class TestLargeFileContext:
+    def test_lines(self):
+        """
+        Test that the lines are decoded one at a time and can be accessed by
+        index
+        """
+        context = LargeFileContext({"path": "test.j2"}, (TEXT + "\r\n").encode(),
+                                   encoding="utf-8")
+        assert list(context.lines) == TEXT.split("\n") + [""]
+        assert context.lines[2] == "  {{ value }} {% set a = 1 %}"
+        with pytest.raises(IndexError):
+            context.lines[10]
+        assert context.text == TEXT + "\n"
+        assert list(context.line_offsets) == [0, 16, 32, 62, 74]
+        assert context.size == len(TEXT) + 2
+
+    @pytest.mark.parametrize(
+        "text", ["a\nbb\n", "abcdefgh\nx", "", "\n\n", "a\r\nbcdefghij\r\n"]
+    )
+    def test_lines_chunks(self, text):
+        """
+        Test that the lines are the same whatever the chunks they are read by
+        """
+        context = LargeFileContext({"path": "test.j2"}, text.encode(), encoding="utf-8")
+        with mock.patch("j2lint.linter.context.CHUNK_SIZE", 4):
+            assert list(context.lines) == text.replace("\r\n", "\n").split("\n")
+
+    def test_line_elements_dropped(self):
+        """
+        Test that only the jinja elements of the line being checked are kept
+        """
+        context = LargeFileContext({"path": "test.j2"}, TEXT.encode(), encoding="utf-8")
+        for index, _ in enumerate(context.lines):
+            context.get_line_statements(index)
+            context.get_line_variables(index)
+            assert list(context._line_statements) == [index]
+            assert list(context._line_variables) == [index]
+        assert context._text is None
+
+    def test_pragmas(self):
+        """
+        Test that the pragmas are read from the encoded text
+        """
+        text = "line 1\n{# j2lint: disable-next-line=S1 #}\nline 3\n"
+        context = LargeFileContext({"path": "test.j2"}, text.encode(), encoding="utf-8")
+        assert context.pragmas.pragmas_by_name == {"S1": [(2, "disable-next-line")]}
+        assert context._text is None
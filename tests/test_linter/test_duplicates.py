@@ -0,0 +1,70 @@
+"""
+Tests for j2lint.linter.duplicates.py
+"""
+import os
+from unittest.mock import patch
+
+from j2lint.linter.duplicates import DuplicateFinder
+
+TEMPLATE = "{%set test=42 %}\n{{ value }}\n"
+
+
+def test_find_same_content(tmp_path):
+    """
+    Test DuplicateFinder.find matches the files with the same content
+    """
+    first, copy, other = (tmp_path / "first.j2", tmp_path / "copy.j2", tmp_path / "other.j2")
+    first.write_text(TEMPLATE)
+    copy.write_text(TEMPLATE)
+    other.write_text(TEMPLATE.upper())
+    finder = DuplicateFinder()
+    assert finder.find(str(first)) is None
+    assert finder.find(str(other)) is None
+    assert finder.find(str(copy)) == str(first)
+    # A path found again is returned as it is
+    assert finder.find(str(first)) == str(first)
+    assert finder.find(str(tmp_path / "missing.j2")) is None
+
+
+def test_find_same_inode(tmp_path):
+    """
+    Test DuplicateFinder.find matches the links to a file without hashing it
+    """
+    template = tmp_path / "template.j2"
+    template.write_text(TEMPLATE)
+    os.link(template, tmp_path / "hardlink.j2")
+    os.symlink(template, tmp_path / "symlink.j2")
+    finder = DuplicateFinder()
+    with patch("j2lint.linter.duplicates.get_file_digest") as get_file_digest:
+        assert finder.find(str(template)) is None
+        assert finder.find(str(tmp_path / "hardlink.j2")) == str(template)
+        assert finder.find(str(tmp_path / "symlink.j2")) == str(template)
+    get_file_digest.assert_not_called()
+
+
+def test_find_different_sizes(tmp_path):
+    """
+    Test DuplicateFinder.find does not hash the files of different sizes
+    """
+    for index in range(3):
+        (tmp_path / f"{index}.j2").write_text(TEMPLATE * (index + 1))
+    finder = DuplicateFinder()
+    with patch("j2lint.linter.duplicates.get_file_digest") as get_file_digest:
+        for index in range(3):
+            assert finder.find(str(tmp_path / f"{index}.j2")) is None
+    get_file_digest.assert_not_called()
+
+
+def test_group(tmp_path):
+    """
+    Test DuplicateFinder.group groups the files by content in order
+    """
+    files = []
+    for name, text in (("a.j2", TEMPLATE), ("b.j2", "{{ other }}\n"),
+                       ("c.j2", TEMPLATE), ("d.j2", TEMPLATE)):
+        (tmp_path / name).write_text(text)
+        files.append(str(tmp_path / name))
+    assert DuplicateFinder().group(files + files[:1]) == {
+        files[0]: [files[2], files[3]],
+        files[1]: [],
+    }
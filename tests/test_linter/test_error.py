@@ -5,6 +5,7 @@ import pytest
 
 from j2lint.settings import settings
 from j2lint.linter.error import LinterError
+from j2lint.linter.rule import Rule
 
 RULE_TEXT_OUTPUT = (
     "Linting rule: T0\n"
@@ -47,3 +48,57 @@ def test_LinterError_repr(test_issue, verbose, output, expected):
     settings.verbose = verbose
     settings.output = output
     assert repr(test_issue) == expected
+
+
+def test_LinterError_to_dict_from_dict(test_issue):
+    """
+    Test that LinterError.from_dict rebuilds the output of LinterError.to_dict
+    """
+    error_dict = test_issue.to_dict()
+    assert error_dict == {
+        "id": "T0",
+        "message": "test rule 0",
+        "filename": "dummy.j2",
+        "linenumber": 1,
+        "line": "dummy",
+        "severity": "LOW",
+    }
+    issue = LinterError.from_dict(error_dict, test_issue.rule)
+    assert issue.rule is test_issue.rule
+    assert issue.to_dict() == error_dict
+
+
+def test_LinterError_with_filename(test_issue):
+    """
+    Test that LinterError.with_filename copies the issue for another file
+    """
+    issue = test_issue.with_filename("copy.j2")
+    assert issue.filename == "copy.j2"
+    assert test_issue.filename == "dummy.j2"
+    assert issue.to_dict() == dict(test_issue.to_dict(), filename="copy.j2")
+
+
+def test_LinterError_message(test_issue):
+    """
+    Test that LinterError only stores the messages other than the description
+    of the rule class and has no instance dictionary
+    """
+
+    class DescribedRule(Rule):
+        id = "T9"
+        description = "test rule 9"
+
+    rule = DescribedRule()
+    issue = LinterError(1, "dummy", "dummy.j2", rule)
+    assert issue.message == "test rule 9"
+    assert issue._message is None
+    # The message is captured when the rule changes its description
+    rule.description = "changed description"
+    changed_issue = LinterError(2, "dummy", "dummy.j2", rule)
+    rule.description = "test rule 9"
+    assert changed_issue.message == "changed description"
+    assert issue.message == "test rule 9"
+    issue = LinterError(1, "dummy", "dummy.j2", test_issue.rule, "other message")
+    assert issue.message == "other message"
+    assert issue.with_filename("copy.j2").message == "other message"
+    assert not hasattr(issue, "__dict__")
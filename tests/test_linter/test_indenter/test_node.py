@@ -1,10 +1,36 @@
 """
 Tests for j2lint.linter.node.py
 """
+import threading
+
 import pytest
 
+from j2lint.linter.error import JinjaLinterError
 from j2lint.linter.indenter.statement import JinjaStatement
 from j2lint.linter.indenter.node import Node
+from j2lint.utils import get_jinja_statements
+
+GOOD_TEMPLATE = (
+    "{% for a in b %}\n"
+    "{%     if a %}\n"
+    "{%     set c = a %}\n"
+    "{%     elif b %}\n"
+    "{%         set c = b %}\n"
+    "{%     else %}\n"
+    "{%         set c = 1 %}\n"
+    "{%     endif %}\n"
+    "{% endfor %}\n"
+)
+BAD_TEMPLATE = "{% if a %}\n{%     for b in c %}\n{% endif %}\n"
+
+
+def check_indentation(text):
+    """
+    Return the indentation errors of a text
+    """
+    result = []
+    Node().check_indentation(result, get_jinja_statements(text, indentation=True), 0)
+    return result
 
 
 class TestNode:
@@ -36,3 +62,71 @@ class TestNode:
             "{% if switch.platform_settings.tcam_profile is arista.avd.defined %}",
             "test",
         )
+
+    def test_check_indentation(self):
+        """
+        Test the Node.check_indentation method
+        """
+        assert check_indentation(GOOD_TEMPLATE) == [
+            (3, "{%     set c = a %}", "Bad Indentation, expected 9, got 5")
+        ]
+
+    def test_check_indentation_out_of_order(self):
+        """
+        Test that out of order tags raise and that no state is kept
+        between two calls
+        """
+        result = []
+        with pytest.raises(JinjaLinterError, match="Tag is out of order 'endif'"):
+            Node().check_indentation(
+                result, get_jinja_statements(BAD_TEMPLATE, indentation=True), 0
+            )
+        assert result == [(3, "{% endif %}", "Tag is out of order 'endif'")]
+        assert check_indentation(GOOD_TEMPLATE) == [
+            (3, "{%     set c = a %}", "Bad Indentation, expected 9, got 5")
+        ]
+
+    def test_check_indentation_missing_end_tag(self):
+        """
+        Test that unclosed blocks raise a JinjaLinterError
+        """
+        with pytest.raises(JinjaLinterError, match="Missing end tag for 'for'"):
+            check_indentation("{% if a %}\n{% endif %}\n{% for b in c %}\n")
+
+    def test_check_indentation_deep_nesting(self):
+        """
+        Test that deeply nested templates do not hit the recursion limit
+        """
+        depth = 1500
+        lines = ["{{%{}if a{} %}}".format(" " * (4 * i + 1), i) for i in range(depth)]
+        lines += [
+            "{{%{}endif %}}".format(" " * (4 * i + 1)) for i in reversed(range(depth))
+        ]
+        assert check_indentation("\n".join(lines)) == []
+
+    def test_check_indentation_children(self):
+        """
+        Test that the children of a node are not shared with other nodes
+        """
+        root = Node()
+        root.check_indentation([], get_jinja_statements(GOOD_TEMPLATE, indentation=True), 0)
+        assert [child.tag for child in root.children] == ["for", "endfor"]
+        assert Node().children == []
+
+    def test_check_indentation_threads(self):
+        """
+        Test that concurrent calls return the same results as a single call
+        """
+        expected = check_indentation(GOOD_TEMPLATE)
+        results = []
+
+        def worker():
+            for _ in range(50):
+                results.append(check_indentation(GOOD_TEMPLATE))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [expected] * 200
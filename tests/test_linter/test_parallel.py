@@ -0,0 +1,74 @@
+"""
+Tests for j2lint.linter.parallel.py
+"""
+import argparse
+import pytest
+
+from j2lint.linter.collection import RulesCollection
+from j2lint.linter.parallel import jobs_count, init_worker, lint_file, load_issues
+
+from tests.utils import does_not_raise
+
+
+@pytest.mark.parametrize(
+    "value, expected, expectation",
+    [
+        ("1", 1, does_not_raise()),
+        ("8", 8, does_not_raise()),
+        ("0", None, pytest.raises(argparse.ArgumentTypeError)),
+        ("-2", None, pytest.raises(argparse.ArgumentTypeError)),
+        ("many", None, pytest.raises(argparse.ArgumentTypeError)),
+    ],
+)
+def test_jobs_count(value, expected, expectation):
+    """
+    Test the parallel.jobs_count function
+    """
+    with expectation:
+        assert jobs_count(value) == expected
+
+
+def test_jobs_count_auto():
+    """
+    Test the parallel.jobs_count function with 'auto'
+    """
+    assert jobs_count("auto") >= 1
+
+
+def test_lint_file():
+    """
+    Test that a worker returns plain data matching the serial run
+    """
+    file_name = "tests/test_rules/data/JinjaStatementHasSpacesRule.j2"
+    init_worker(["j2lint/rules"], [], [], False, 0)
+    result_file_name, errors, warnings, profile, seconds = lint_file(file_name)
+
+    collection = RulesCollection.create_from_directory("j2lint/rules", [], [])
+    expected_errors, expected_warnings = collection.run({"path": file_name})
+
+    assert result_file_name == file_name
+    assert profile is None
+    assert seconds > 0
+    assert all(isinstance(error, dict) for error in errors)
+    assert errors == [error.to_dict() for error in expected_errors]
+    assert warnings == [warning.to_dict() for warning in expected_warnings]
+
+    rules_by_id = {rule.id: rule for rule in collection}
+    issues = load_issues(errors, rules_by_id)
+    assert [(issue.rule.id, issue.linenumber) for issue in issues] == [
+        (error.rule.id, error.linenumber) for error in expected_errors
+    ]
+
+
+def test_lint_file_profile():
+    """
+    Test that a profiling worker returns the profile of each file alone
+    """
+    file_name = "tests/test_rules/data/JinjaStatementHasSpacesRule.j2"
+    init_worker(["j2lint/rules"], [], [], False, 0, True)
+    lint_file(file_name)
+    profile = lint_file(file_name)[3]
+
+    assert profile["files"] == 1
+    assert profile["slowest_files"][0]["path"] == file_name
+    assert all(timing["calls"] == 1 for timing in profile["rules"].values())
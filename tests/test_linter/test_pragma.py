@@ -0,0 +1,84 @@
+"""
+Tests for j2lint.linter.pragma.py
+"""
+from j2lint.linter.collection import RulesCollection
+from j2lint.linter.pragma import PragmaMap
+from j2lint.rules.JinjaStatementHasSpacesRule import JinjaStatementHasSpacesRule
+
+TEXT = (
+    "{# j2lint: disable=T0 #}\n"
+    "{# j2lint: disable=test-rule-1 #}\n"
+    "line 3\n"
+    "{# j2lint: enable=T1 #}\n"
+    "{# j2lint: disable-next-line=T2 j2lint: enable=T3 #}\n"
+    "line 6\n"
+    "line 7\n"
+)
+
+
+def test_pragma_map(make_rules):
+    """
+    Test that the unmatched disable pragmas apply to the whole file and the
+    other ones to ranges of lines
+    """
+    rules = make_rules(4)
+    pragmas = PragmaMap.from_text(TEXT)
+    assert pragmas.is_disabled(rules[0])
+    assert [pragmas.is_disabled(rule) for rule in rules[1:]] == [False, False, False]
+    assert [pragmas.is_line_disabled(rules[1], line) for line in range(1, 6)] == [
+        False, True, True, True, False]
+    assert [pragmas.is_line_disabled(rules[2], line) for line in range(4, 8)] == [
+        False, False, True, False]
+    assert not pragmas.has_line_pragmas(rules[3])
+
+
+def test_pragma_map_trailing_disable(make_rules):
+    """
+    Test that a disable after a closed range lasts until the end of the file
+    and does not disable the rule before the first range
+    """
+    rule = make_rules(1)[0]
+    pragmas = PragmaMap.from_text(
+        "line 1\n"
+        "{# j2lint: disable=T0 #}\n"
+        "line 3\n"
+        "{# j2lint: enable=T0 #}\n"
+        "line 5\n"
+        "{# j2lint: disable=T0 #}\n"
+        "line 7\n"
+        "line 8\n"
+    )
+    assert not pragmas.is_disabled(rule)
+    assert [pragmas.is_line_disabled(rule, line) for line in range(1, 10)] == [
+        False, True, True, True, False, True, True, True, True]
+
+
+def test_pragma_map_multiline_comment(make_rules):
+    """
+    Test that disable-next-line applies to the line after the end of the
+    comment
+    """
+    rule = make_rules(1)[0]
+    pragmas = PragmaMap.from_text("{#\n  j2lint: disable-next-line=T0\n#}\nline 4\n")
+    assert [pragmas.is_line_disabled(rule, line) for line in range(1, 6)] == [
+        False, False, False, True, False]
+
+
+def test_run_text_line_pragmas():
+    """
+    Test that RulesCollection.run_text drops the issues on the disabled lines
+    """
+    collection = RulesCollection()
+    collection.extend([JinjaStatementHasSpacesRule()])
+    text = (
+        "{%if a %}{% endif %}\n"
+        "{# j2lint: disable-next-line=S4 #}\n"
+        "{%if a %}{% endif %}\n"
+        "{# j2lint: disable=jinja-statements-single-space #}\n"
+        "{%if a %}{% endif %}\n"
+        "{# j2lint: enable=S4 #}\n"
+        "{%if a %}{% endif %}\n"
+    )
+    errors, warnings = collection.run_text({"path": "test.j2", "type": "jinja"}, text)
+    assert [error.linenumber for error in errors] == [1, 7]
+    assert warnings == []
@@ -0,0 +1,58 @@
+"""
+Tests for j2lint.linter.profile.py
+"""
+import json
+
+from j2lint.linter.profile import Profiler
+
+
+def test_add_file_keeps_slowest():
+    """
+    Test that only the slowest files are kept while the totals cover all files
+    """
+    profiler = Profiler(top_files=2)
+    for index, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+        profiler.add_file(f"{index}.j2", 100, seconds)
+    profile = profiler.to_dict()
+    assert profile["files"] == 4
+    assert profile["bytes"] == 400
+    assert [slow_file["path"] for slow_file in profile["slowest_files"]] == ["2.j2", "0.j2"]
+    assert profile["bytes_per_second"] == 400 / profile["seconds"]
+
+
+def test_timed_check():
+    """
+    Test that the timed check returns the check result and adds its time
+    """
+    timings = {"rule": 0.0}
+    timed = Profiler.timed_check(lambda context, index: index == 1, timings, "rule")
+    assert [timed(None, index) for index in range(3)] == [False, True, False]
+    assert timings["rule"] > 0
+
+
+def test_merge_and_format():
+    """
+    Test that merged profiles add up and are formatted as text or JSON
+    """
+    worker = Profiler()
+    worker.add_rule("S1", 0.25)
+    worker.add_file("a.j2", 10, 0.5)
+    profiler = Profiler()
+    profiler.add_rule("S1", 0.5)
+    profiler.add_rule("S2", 1.0)
+    profiler.add_file("b.j2", 20, 1.5)
+    profiler.merge(worker.to_dict())
+
+    profile = json.loads(profiler.format("json"))["profile"]
+    assert profile["rules"] == {"S2": {"seconds": 1.0, "calls": 1},
+                                "S1": {"seconds": 0.75, "calls": 2}}
+    assert (profile["files"], profile["bytes"], profile["seconds"]) == (2, 30, 2.0)
+    assert profiler.format().splitlines() == [
+        "Profile: 2 file(s), 30 bytes in 2.000s (0.0 KiB/s)",
+        "Rule        Calls   Time (s)",
+        "S2              1     1.0000",
+        "S1              2     0.7500",
+        "Slowest files",
+        "    1.5000s         20 bytes b.j2",
+        "    0.5000s         10 bytes a.j2",
+    ]
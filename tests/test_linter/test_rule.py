@@ -6,6 +6,7 @@ import pytest
 
 from j2lint.linter.rule import logger
 from j2lint.linter.rule import Rule
+from j2lint.linter.context import FileContext
 
 
 class TestRule:
@@ -130,3 +131,29 @@ class TestRule:
         errors_ids = [(error.rule.id, error.linenumber) for error in errors]
         assert errors_ids == expected_errors_ids
         assert caplog.record_tuples == expected_logs
+
+    def test_context_hooks(self, test_rule):
+        """
+        Test that check_line and check_text receive the same context
+        """
+        contexts = set()
+
+        def check_line(context, index):
+            contexts.add(id(context))
+            return index == 0
+
+        def check_text(context):
+            contexts.add(id(context))
+            return [(1, context.lines[0], "message")]
+
+        test_rule.check_line = check_line
+        test_rule.check_text = check_text
+        file_dict = {"path": "tests/test_linter/data/test.j2"}
+        context = FileContext(file_dict, "line 1\nline 2")
+        errors = test_rule.checklines(file_dict, context)
+        errors.extend(test_rule.checkfulltext(file_dict, context))
+        assert [(error.linenumber, error.line) for error in errors] == [
+            (1, "line 1"),
+            (1, "line 1"),
+        ]
+        assert contexts == {id(context)}
@@ -0,0 +1,86 @@
+"""
+Tests for j2lint.linter.scanner.py
+"""
+import glob
+
+import pytest
+
+from j2lint.linter.collection import RulesCollection
+from j2lint.linter.context import FileContext
+from j2lint.linter.scanner import LineScanner
+
+
+@pytest.fixture
+def line_rules():
+    collection = RulesCollection.create_from_directory("j2lint/rules", [], [])
+    return [rule for rule in collection if rule.can_scan_lines({"path": "test.j2"})]
+
+
+def test_can_scan_lines(test_rule):
+    """
+    Test the Rule.can_scan_lines method
+    """
+    assert not test_rule.can_scan_lines({"path": "test.j2"})
+    test_rule.check = lambda file, line: True
+    assert test_rule.can_scan_lines({"path": "test.j2"})
+    assert not test_rule.can_scan_lines({"path": "test.txt"})
+
+
+@pytest.mark.parametrize("filename", sorted(glob.glob("tests/test_rules/data/*.j2")))
+def test_scan_matches_checklines(line_rules, filename):
+    """
+    Test that a single pass returns the same issues as one pass per rule
+    without the line markers
+    """
+    file_dict = {"path": filename}
+    with open(filename, "r", encoding="utf-8") as file_d:
+        text = file_d.read()
+    issues = LineScanner(line_rules).scan(file_dict, FileContext(file_dict, text))
+    for rule in line_rules:
+        expected = []
+        for index, line in enumerate(text.split("\n")):
+            if not line.lstrip().startswith("#") and rule.check_line(
+                FileContext(file_dict, text), index
+            ):
+                expected.append((index + 1, line))
+        assert [(issue.linenumber, issue.line) for issue in issues[rule]] == expected
+
+
+def test_scan_line_markers(test_rule, test_other_rule):
+    """
+    Test that rules are only called on the lines containing one of their
+    markers and never on comment lines
+    """
+    calls = []
+
+    def check(file, line):
+        calls.append(line)
+        return True
+
+    test_rule.check = check
+    test_rule.line_markers = ("{{", "\t")
+    test_other_rule.check = lambda file, line: "b" in line
+    text = "a {{ b }}\n# {{ c }}\nd\n\te"
+    issues = LineScanner([test_rule, test_other_rule]).scan(
+        {"path": "test.j2"}, FileContext({"path": "test.j2"}, text)
+    )
+    assert calls == ["a {{ b }}", "\te"]
+    assert [issue.linenumber for issue in issues[test_rule]] == [1, 4]
+    assert [issue.linenumber for issue in issues[test_other_rule]] == [1]
+    assert all(issue.rule is test_rule for issue in issues[test_rule])
+
+
+def test_scan_max_errors(test_rule, test_other_rule):
+    """
+    Test that the scan stops once the errors are found, the warnings and the
+    issues on the lines disabled by a pragma not being counted
+    """
+    test_rule.check = lambda file, line: "!" in line
+    test_other_rule.check = lambda file, line: "?" in line
+    test_other_rule.warn = [test_other_rule]
+    text = "?\n?\n{# j2lint: disable-next-line=T0 #}\n!\n?\n!\n!\n!"
+    issues = LineScanner([test_rule, test_other_rule]).scan(
+        {"path": "test.j2"}, FileContext({"path": "test.j2"}, text), max_errors=2
+    )
+    assert [issue.linenumber for issue in issues[test_rule]] == [4, 6, 7]
+    assert [issue.linenumber for issue in issues[test_other_rule]] == [1, 2, 5]
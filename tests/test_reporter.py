@@ -0,0 +1,149 @@
+"""
+Tests for j2lint.reporter.py
+"""
+import json
+from argparse import Namespace
+
+import pytest
+
+from j2lint.linter.error import LinterError
+
+from j2lint.reporter import (Reporter, TextReporter, JsonReporter, NdjsonReporter,
+                             SarifReporter)
+
+
+@pytest.mark.parametrize(
+    "counts, expected",
+    [
+        ((0, 0), "Linting complete. No problems found."),
+        ((2, 1), "Jinja2 linting finished with 2 issue(s) and 1 warning(s)"),
+    ],
+)
+def test_reporter_counters(make_issues, counts, expected):
+    """
+    Test that the summary comes from the running counters
+    """
+    reporter = Reporter(Namespace(json=False))
+    issues = make_issues(3)
+    reporter.report_file("dummy.j2", issues[:counts[0]], [])
+    reporter.report_file("other.j2", [], issues[:counts[1]])
+    assert reporter.get_summary() == expected
+
+
+def test_text_reporter(capsys, make_issues):
+    """
+    Test that the text reporter prints the issues once all the files are
+    reported
+    """
+    reporter = TextReporter(Namespace(json=False))
+    issues = make_issues(2)
+    reporter.report_file("dummy.j2", [issues[1]], [issues[0]])
+    assert capsys.readouterr().out == ""
+    reporter.finish()
+    assert capsys.readouterr().out == (
+        "\nJINJA2 LINT ERRORS\n"
+        "************ File dummy.j2\n"
+        "dummy.j2:2 test rule 1 (test-rule-1)\n"
+        "\nJINJA2 LINT WARNINGS\n"
+        "************ File dummy.j2\n"
+        "dummy.j2:1 test rule 0 (test-rule-0)\n"
+        "Jinja2 linting finished with 1 issue(s) and 1 warning(s)\n"
+    )
+
+
+@pytest.mark.parametrize("number_issues", [0, 1, 3])
+def test_json_reporter(capsys, make_issues, number_issues):
+    """
+    Test that the json reporter prints the errors of each file as they are
+    reported and all the warnings at the end
+    """
+    reporter = JsonReporter(Namespace(json=True))
+    issues = make_issues(number_issues)
+    reporter.start([])
+    reporter.report_file("dummy.j2", issues, issues)
+    reporter.report_file("other.j2", issues, [])
+    streamed = capsys.readouterr().out
+    assert '"WARNINGS"' not in streamed
+    reporter.finish()
+    issue_dicts = [issue.to_dict() for issue in issues]
+    assert json.loads(streamed + capsys.readouterr().out) == {
+        "ERRORS": issue_dicts + issue_dicts,
+        "WARNINGS": issue_dicts,
+    }
+    assert reporter.total_errors == 2 * number_issues
+    assert reporter.total_warnings == number_issues
+
+
+def test_ndjson_reporter(capsys, make_issues):
+    """
+    Test that the ndjson reporter prints each issue when its file is reported
+    and the summary to stderr
+    """
+    reporter = NdjsonReporter(Namespace(json=False))
+    issues = make_issues(3)
+    reporter.report_file("dummy.j2", [issues[2], issues[0]], [issues[1]])
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        dict(issues[0].to_dict(), type="error"),
+        dict(issues[2].to_dict(), type="error"),
+        dict(issues[1].to_dict(), type="warning"),
+    ]
+    reporter.finish()
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err == "Jinja2 linting finished with 2 issue(s) and 1 warning(s)\n"
+
+
+def test_sarif_reporter(capsys, make_rules):
+    """
+    Test that the sarif reporter prints the rules metadata then the results
+    of each file as it is reported
+    """
+    rules = make_rules(2)
+    reporter = SarifReporter(Namespace(json=False))
+    reporter.start(rules)
+    reporter.report_file("roles/a b.j2", [LinterError(3, "{{a}}", "roles/a b.j2", rules[1])],
+                         [LinterError(1, "{{b}}", "roles/a b.j2", rules[0])])
+    streamed = capsys.readouterr().out
+    assert '"startLine": 3' in streamed
+    reporter.finish()
+    sarif = json.loads(streamed + capsys.readouterr().out)
+    assert sarif["version"] == "2.1.0"
+    run = sarif["runs"][0]
+    assert run["tool"]["driver"]["rules"] == [
+        {"id": "T0", "name": "test-rule-0", "shortDescription": {"text": "test rule 0"},
+         "properties": {"severity": "LOW"}},
+        {"id": "T1", "name": "test-rule-1", "shortDescription": {"text": "test rule 1"},
+         "properties": {"severity": "MEDIUM"}},
+    ]
+    assert run["results"] == [
+        {"ruleId": "T1", "ruleIndex": 1, "level": "error", "message": {"text": "test rule 1"},
+         "locations": [{"physicalLocation": {
+             "artifactLocation": {"uri": "roles/a%20b.j2"},
+             "region": {"startLine": 3, "snippet": {"text": "{{a}}"}}}}]},
+        {"ruleId": "T0", "ruleIndex": 0, "level": "warning", "message": {"text": "test rule 0"},
+         "locations": [{"physicalLocation": {
+             "artifactLocation": {"uri": "roles/a%20b.j2"},
+             "region": {"startLine": 1, "snippet": {"text": "{{b}}"}}}}]},
+    ]
+
+
+@pytest.mark.parametrize("reporter_class", [JsonReporter, SarifReporter])
+def test_reporter_truncated(capsys, make_rules, reporter_class):
+    """
+    Test that the JSON and SARIF outputs say when the linting was truncated
+    """
+    rules = make_rules(1)
+    reporter = reporter_class(Namespace(json=True))
+    reporter.start(rules)
+    reporter.report_file("a.j2", [LinterError(1, "{{a}}", "a.j2", rules[0])], [])
+    reporter.truncated = True
+    reporter.finish()
+    output = json.loads(capsys.readouterr().out)
+    if reporter_class is JsonReporter:
+        assert output["TRUNCATED"] is True
+    else:
+        assert output["runs"][0]["properties"] == {"truncated": True}
+    assert reporter.get_summary() == (
+        "Jinja2 linting stopped after the maximum number of errors with "
+        "1 issue(s) and 0 warning(s)")
@@ -61,7 +61,7 @@ PARAMS = [
     ),
     (
         "tests/test_rules/data/JinjaStatementDelimiterRule.j2",
-        [("S6", 1), ("S6", 3), ("S6", 5)],
+        [("S6", 1), ("S6", 3), ("S6", 5), ("S3", 2), ("S3", 4)],
         [],
         [],
     ),
@@ -109,3 +109,16 @@ def test_rules(
 
     assert sorted(warnings_ids) == sorted(j2_warnings_ids)
     assert sorted(errors_ids) == sorted(j2_errors_ids)
+
+
+def test_operator_messages(collection):
+    """
+    Test the S2 issues keep the message of their own line
+    """
+    errors, _ = collection.run_text({"path": "operators.j2"},
+                                    "{{ a|b+c }}\n{{ a|b }}\n")
+    messages = [(error.linenumber, error.message) for error in errors if error.rule.id == "S2"]
+    assert messages == [
+        (1, "The operators |, + need to be enclosed by a single space on each side"),
+        (2, "The operator | needs to be enclosed by a single space on each side"),
+    ]
@@ -0,0 +1,178 @@
+"""
+Tests for j2lint.server.py
+"""
+import os
+import socket
+import stat
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from j2lint.api import RULES_DIR
+from j2lint.cli import run, create_collection
+from j2lint.server import LintServer, serve, request_lint, is_server_running
+
+FILE_NAME = "tests/test_rules/data/JinjaStatementHasSpacesRule.j2"
+
+
+@pytest.fixture
+def server(tmp_path):
+    """
+    Lint server running in a thread
+    """
+    socket_path = str(tmp_path / "j2lint.sock")
+    lint_server = LintServer(socket_path)
+    thread = threading.Thread(target=lint_server.serve_forever)
+    thread.start()
+    yield lint_server
+    lint_server.shutdown()
+    thread.join()
+    lint_server.server_close()
+
+
+def test_request_lint_text(server):
+    """
+    Test that the server lints inline text and returns the rules metadata
+    """
+    response = request_lint(server.server_address,
+                            {"text": "{%set test=42 %}", "filename": "inline.j2"})
+    assert response["results"] == [{
+        "filename": "inline.j2",
+        "errors": [{"id": "S4",
+                    "message": "Jinja statement should have a single space "
+                               "before and after: '{% statement %}'",
+                    "filename": "inline.j2",
+                    "linenumber": 1,
+                    "line": "{%set test=42 %}",
+                    "severity": "LOW"}],
+        "warnings": []}]
+    assert response["rules"]["S4"]["short_description"] == "jinja-statements-single-space"
+
+
+def test_request_lint_paths(server):
+    """
+    Test that the paths are linted relative to the client directory and that
+    the collection is kept for the next requests with the same settings
+    """
+    request = {"cwd": os.getcwd(), "paths": [FILE_NAME], "warn": ["S4"]}
+    response = request_lint(server.server_address, request)
+    result = response["results"][0]
+    assert result["filename"] == FILE_NAME
+    assert not result["errors"]
+    assert {warning["id"] for warning in result["warnings"]} == {"S4"}
+
+    request_lint(server.server_address, request)
+    request_lint(server.server_address, dict(request, warn=[]))
+    assert len(server.collections) == 2
+    assert list(server.collections)[0] == ((RULES_DIR,), (), ("S4",), ())
+
+
+RULE_SOURCE = (
+    "from j2lint.linter.rule import Rule\n"
+    "\n"
+    "\n"
+    "class NoTodoRule(Rule):\n"
+    "    id = 'X1'\n"
+    "    short_description = 'no-todo'\n"
+    "    description = 'No TODO'\n"
+    "    severity = 'LOW'\n"
+    "\n"
+    "    def check_line(self, context, index):\n"
+    "        return 'TODO' in context.lines[index]\n"
+)
+
+
+def test_request_lint_relative_rules_dir(server, tmp_path):
+    """
+    Test that the rules directories are relative to the client directory
+    """
+    (tmp_path / "myrules").mkdir()
+    (tmp_path / "myrules" / "NoTodoRule.py").write_text(RULE_SOURCE)
+    (tmp_path / "template.j2").write_text("{# TODO #}\n")
+    request = {"cwd": str(tmp_path), "paths": ["template.j2"],
+               "rules_dir": [RULES_DIR, "myrules"]}
+    response = request_lint(server.server_address, request)
+    assert [error["id"] for error in response["results"][0]["errors"]] == ["X1"]
+    assert list(server.collections)[0][0] == (RULES_DIR, str(tmp_path / "myrules"))
+
+
+def test_request_lint_invalid_response(tmp_path):
+    """
+    Test that request_lint returns None when the server response is not JSON
+    """
+    socket_path = str(tmp_path / "invalid.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listening_socket:
+        listening_socket.bind(socket_path)
+        listening_socket.listen(1)
+
+        def answer():
+            connection, _ = listening_socket.accept()
+            with connection:
+                connection.recv(65536)
+                connection.sendall(b'{"results": [\n')
+
+        thread = threading.Thread(target=answer)
+        thread.start()
+        assert request_lint(socket_path, {"paths": []}) is None
+        thread.join()
+
+
+def test_request_lint_error(server):
+    """
+    Test that a failing request returns None
+    """
+    assert request_lint(server.server_address, {"paths": 42}) is None
+
+
+def test_request_lint_no_server(tmp_path):
+    """
+    Test that request_lint returns None when no server is listening
+    """
+    assert request_lint(str(tmp_path / "missing.sock"), {"paths": []}) is None
+
+
+def test_request_lint_timeout(tmp_path):
+    """
+    Test that request_lint returns None when the server does not answer
+    """
+    socket_path = str(tmp_path / "hung.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listening_socket:
+        listening_socket.bind(socket_path)
+        listening_socket.listen(1)
+        assert request_lint(socket_path, {"paths": []}, timeout=0.1) is None
+
+
+def test_server_socket_mode(server):
+    """
+    Test that the server socket is only accessible to its owner
+    """
+    assert stat.S_IMODE(os.stat(server.server_address).st_mode) == 0o600
+
+
+def test_serve_already_running(server):
+    """
+    Test that a second server does not take over the socket of a running one
+    """
+    assert is_server_running(server.server_address)
+    with pytest.raises(OSError, match="already running"):
+        serve(server.server_address)
+
+
+@pytest.mark.parametrize("use_server", [True, False])
+def test_run_socket(capsys, tmp_path, server, use_server):
+    """
+    Test that j2lint.cli.run with --socket prints the same issues with or
+    without the server
+    """
+    with patch("logging.disable"):
+        assert run([FILE_NAME]) == 2
+    expected = capsys.readouterr().out
+
+    socket_path = server.server_address if use_server else str(tmp_path / "missing.sock")
+    with patch("logging.disable"), patch(
+        "j2lint.cli.create_collection", wraps=create_collection
+    ) as mocked_create_collection:
+        assert run(["--socket", socket_path, FILE_NAME]) == 2
+    assert capsys.readouterr().out == expected
+    assert mocked_create_collection.called != use_server
@@ -0,0 +1,102 @@
+"""
+Tests for j2lint.shard.py
+"""
+import argparse
+import json
+
+import pytest
+
+from j2lint.shard import (shard_spec, get_file_costs, partition_files, get_shard,
+                          merge_reports, read_timings)
+from .utils import does_not_raise
+
+
+@pytest.mark.parametrize(
+    "value, expected, expectation",
+    [
+        ("1/3", (1, 3), does_not_raise()),
+        ("3/3", (3, 3), does_not_raise()),
+        ("0/3", None, pytest.raises(argparse.ArgumentTypeError)),
+        ("4/3", None, pytest.raises(argparse.ArgumentTypeError)),
+        ("1", None, pytest.raises(argparse.ArgumentTypeError)),
+        ("a/b", None, pytest.raises(argparse.ArgumentTypeError)),
+    ],
+)
+def test_shard_spec(value, expected, expectation):
+    """
+    Test the shard.shard_spec function
+    """
+    with expectation:
+        assert shard_spec(value) == expected
+
+
+def test_get_file_costs(tmp_path):
+    """
+    Test that the files without timings are estimated from their size at the
+    throughput of the timed files
+    """
+    files = []
+    for name, size in (("a.j2", 100), ("b.j2", 300)):
+        (tmp_path / name).write_text("x" * size)
+        files.append(str(tmp_path / name))
+    assert get_file_costs(files) == {files[0]: 100, files[1]: 300}
+    assert get_file_costs(files, {files[0]: 2.0}) == {files[0]: 2.0, files[1]: 6.0}
+
+
+def test_partition_files():
+    """
+    Test that the shards are balanced and do not depend on the file order
+    """
+    costs = {"huge.j2": 100, "a.j2": 30, "b.j2": 30, "c.j2": 30, "d.j2": 10, "e.j2": 10}
+    shards = partition_files(list(costs), 2, costs)
+    assert shards == [["e.j2", "huge.j2"], ["a.j2", "b.j2", "c.j2", "d.j2"]]
+    assert partition_files(sorted(costs, reverse=True), 2, costs) == shards
+    shards = partition_files(list(costs), 4, costs)
+    assert sorted(file_name for shard in shards for file_name in shard) == sorted(costs)
+    assert partition_files(["a.j2"], 3, costs) == [["a.j2"], [], []]
+
+
+def test_get_shard(tmp_path):
+    """
+    Test that the shards cover each file once
+    """
+    files = []
+    for index in range(10):
+        (tmp_path / f"{index}.j2").write_text("x" * (index + 1) * 10)
+        files.append(str(tmp_path / f"{index}.j2"))
+    shards = [get_shard(files, (index, 3)) for index in range(1, 4)]
+    assert sorted(file_name for shard in shards for file_name in shard) == sorted(files)
+
+
+def test_merge_reports():
+    """
+    Test that the issues of the reports are merged by file
+    """
+    reports = [
+        {"ERRORS": [{"filename": "b.j2", "linenumber": 1},
+                    {"filename": "b.j2", "linenumber": 2}],
+         "WARNINGS": []},
+        {"ERRORS": [{"filename": "a.j2", "linenumber": 3}],
+         "WARNINGS": [{"filename": "a.j2", "linenumber": 1}],
+         "TRUNCATED": True},
+    ]
+    assert merge_reports(reports) == {
+        "ERRORS": [{"filename": "a.j2", "linenumber": 3},
+                   {"filename": "b.j2", "linenumber": 1},
+                   {"filename": "b.j2", "linenumber": 2}],
+        "WARNINGS": [{"filename": "a.j2", "linenumber": 1}],
+        "TRUNCATED": True,
+    }
+    assert merge_reports(reports[:1]) == reports[0]
+
+
+def test_read_timings(tmp_path):
+    """
+    Test that read_timings only accepts the linting time of the files
+    """
+    timings_file = tmp_path / "timings.json"
+    timings_file.write_text(json.dumps({"a.j2": 0.5}))
+    assert read_timings(str(timings_file)) == {"a.j2": 0.5}
+    timings_file.write_text(json.dumps(["a.j2"]))
+    with pytest.raises(ValueError):
+        read_timings(str(timings_file))
@@ -1,18 +1,28 @@
 """
 Tests for j2lint.utils.py
 """
+import ast
 import os
+import subprocess
+from unittest.mock import patch
+
 import pytest
 
 from j2lint.utils import (
     load_plugins,
+    get_plugin_metadata,
+    get_string_constant,
     is_valid_file_type,
     get_file_type,
     get_files,
+    iter_files,
+    get_changed_files,
     flatten,
     get_tuple,
     delimit_jinja_statement,
     is_rule_disabled,
+    get_line_offsets,
+    get_jinja_statements,
 )
 from .utils import does_not_raise
 
@@ -28,6 +38,43 @@ def test_load_plugins():
     pass
 
 
+def test_get_plugin_metadata():
+    """
+    Test the utils.get_plugin_metadata function reads the rule attributes
+    without executing the module
+    """
+    metadata = get_plugin_metadata("j2lint/rules/JinjaStatementDelimiterRule.py",
+                                   "JinjaStatementDelimiterRule")
+    assert metadata == {"id": "S6",
+                        "short_description": "jinja-statements-delimiter",
+                        "deprecated_short_description": "jinja-statements-delimeter"}
+    assert get_plugin_metadata("j2lint/rules/JinjaStatementDelimiterRule.py", "Missing") is None
+
+
+def test_get_string_constant_str_node():
+    """
+    Test the utils.get_string_constant function reads the ast.Str nodes of
+    Python 3.6 and 3.7
+    """
+
+    class Str:
+        def __init__(self, s):
+            self.s = s
+
+    with patch.object(ast, "Str", Str, create=True), patch("j2lint.utils.sys.version_info", (3, 7)):
+        assert get_string_constant(Str("S6")) == "S6"
+    assert get_string_constant(ast.Constant(value="S6")) == "S6"
+    assert get_string_constant(ast.Constant(value=42)) is None
+
+
+def test_load_plugins_skip():
+    """
+    Test the utils.load_plugins function does not load the skipped modules
+    """
+    rules = load_plugins("j2lint/rules", lambda metadata: metadata["id"] != "S6")
+    assert [rule.id for rule in rules] == ["S6"]
+
+
 @pytest.mark.parametrize(
     "file_name, expected",
     [
@@ -108,6 +155,73 @@ def test_get_files_dir(template_tmp_dir):
         assert sorted(get_files(template_tmp_dir)) == expected
 
 
+def test_get_files_pruned_and_excluded(tmp_path):
+    """
+    Test the utils.get_files function skips the pruned directories and the
+    exclude patterns
+    """
+    for directory in [".git", "node_modules", "build", "templates/generated"]:
+        (tmp_path / directory).mkdir(parents=True)
+        (tmp_path / directory / "template.j2").write_text("")
+    (tmp_path / "templates" / "template.j2").write_text("")
+    (tmp_path / "templates" / "template.bak.j2").write_text("")
+
+    assert sorted(get_files([str(tmp_path)])) == [
+        f"{tmp_path}/build/template.j2",
+        f"{tmp_path}/templates/generated/template.j2",
+        f"{tmp_path}/templates/template.bak.j2",
+        f"{tmp_path}/templates/template.j2",
+    ]
+    assert get_files([str(tmp_path)], ["build", "*/generated", "*.bak.j2"]) == [
+        f"{tmp_path}/templates/template.j2"]
+
+
+def test_iter_files(tmp_path):
+    """
+    Test the utils.iter_files function yields the files of a directory before
+    walking its subdirectories
+    """
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "template.j2").write_text("")
+    (tmp_path / "a.j2").write_text("")
+    files = iter_files([str(tmp_path)])
+    assert next(files) == f"{tmp_path}/a.j2"
+    assert list(files) == [f"{tmp_path}/b/template.j2"]
+
+
+@pytest.mark.parametrize(
+    "changed_since, staged, paths, expected",
+    [
+        (None, False, None, ["roles/a.j2"]),
+        (None, True, None, ["c.j2"]),
+        ("HEAD", False, None, ["c.j2", "roles/a.j2"]),
+        ("HEAD", True, None, ["c.j2"]),
+        ("HEAD", False, ["roles"], ["roles/a.j2"]),
+    ],
+)
+def test_get_changed_files(git_repo, changed_since, staged, paths, expected):
+    """
+    Test the utils.get_changed_files function
+    """
+    assert sorted(get_changed_files(changed_since, staged, paths)) == expected
+
+
+def test_get_changed_files_relative(git_repo):
+    """
+    Test the utils.get_changed_files function from a subdirectory
+    """
+    os.chdir(git_repo / "roles")
+    assert get_changed_files("HEAD") == ["a.j2"]
+
+
+def test_get_changed_files_bad_ref(git_repo):
+    """
+    Test the utils.get_changed_files function with an unknown ref
+    """
+    with pytest.raises(subprocess.CalledProcessError):
+        get_changed_files("unknown-ref")
+
+
 @pytest.mark.parametrize(
     "input_list, expected, raising_context",
     [
@@ -145,13 +259,52 @@ def test_get_tuple(tuple_list, lookup_object, expected_value):
     assert get_tuple(tuple_list, lookup_object) == expected_value
 
 
-@pytest.mark.skip
-def test_get_jinja_statements():
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", [0]),
+        ("foo", [0]),
+        ("foo\nbar", [0, 4]),
+        ("foo\n\nbar\n", [0, 4, 5, 9]),
+    ],
+)
+def test_get_line_offsets(text, expected):
+    """
+    Test the utils.get_line_offsets function
+    """
+    assert get_line_offsets(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, indentation, expected",
+    [
+        ("no statement", False, []),
+        (
+            "{% if a %}\n{{ a }}\n{%- endif -%}",
+            False,
+            [(" if a ", 1, 1, "{%", "%}"), (" endif ", 3, 3, "{%-", "-%}")],
+        ),
+        (
+            "{% set a = [\n1,\n2] %}\n  text {% if a %}",
+            False,
+            [(" set a = [\n1,\n2] ", 1, 3, "{%", "%}"), (" if a ", 4, 4, "{%", "%}")],
+        ),
+        (
+            "{% set a = [\n1,\n2] %}\n  text {% if a %}",
+            True,
+            [(" set a = [\n1,\n2] ", 1, 3, "{%", "%}")],
+        ),
+    ],
+)
+def test_get_jinja_statements(text, indentation, expected):
     """
     Test the utils.get_jinja_statements function
     """
-    # TODO
-    pass
+    assert get_jinja_statements(text, indentation) == expected
+    assert (
+        get_jinja_statements(text, indentation, line_offsets=get_line_offsets(text))
+        == expected
+    )
 
 
 @pytest.mark.parametrize(
@@ -0,0 +1,180 @@
+"""
+Tests for j2lint.watch.py
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from j2lint.watch import Watcher, PollingWatcher, InotifyWatcher, watch
+
+
+class FakeWatcher(Watcher):
+    """
+    Watcher returning predefined batches of changes then interrupting
+    """
+
+    def __init__(self, batches):
+        super().__init__([])
+        self.batches = list(batches)
+        self.closed = False
+
+    def read_changes(self, timeout):
+        if not self.batches:
+            if timeout is None:
+                raise KeyboardInterrupt
+            return set()
+        return self.batches.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def templates(tmp_path):
+    """
+    Directory with two templates and a text file
+    """
+    (tmp_path / "a.j2").write_text("{{ a }}")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.j2").write_text("{{ b }}")
+    (tmp_path / "c.txt").write_text("c")
+    yield str(tmp_path)
+
+
+def test_wait_for_changes_debounce():
+    """
+    Test that the changes are merged until no more change happens
+    """
+    watcher = FakeWatcher([set(), {"a.j2"}, {"b.j2"}])
+    assert watcher.wait_for_changes(0) == {"a.j2", "b.j2"}
+
+
+def test_watch(templates):
+    """
+    Test that all the files are linted first then only the changed files
+    """
+    a_path = os.path.join(templates, "a.j2")
+    b_path = os.path.join(templates, "sub", "b.j2")
+    linted = []
+    watcher = FakeWatcher([{b_path, os.path.join(templates, "deleted.j2")}])
+    watch(lambda files: linted.append(sorted(files)), [templates], watcher=watcher, debounce=0)
+    assert linted == [[a_path, b_path], [b_path]]
+    assert watcher.closed
+
+
+def test_watch_exclude(templates):
+    """
+    Test that the pruned and excluded directories and files are not linted
+    """
+    (Path(templates) / "node_modules").mkdir()
+    (Path(templates) / "node_modules" / "d.j2").write_text("{{ d }}")
+    (Path(templates) / "e.bak.j2").write_text("{{ e }}")
+    linted = []
+    watch(lambda files: linted.append(sorted(files)), [templates], ["*.bak.j2", "sub"],
+          watcher=FakeWatcher([]), debounce=0)
+    assert linted == [[os.path.join(templates, "a.j2")]]
+
+
+def test_watcher_is_abstract():
+    """
+    Test that the watchers must implement read_changes
+    """
+    with pytest.raises(TypeError):
+        Watcher([])  # pylint: disable = abstract-class-instantiated
+
+
+def test_polling_watcher(templates):
+    """
+    Test the PollingWatcher detects modified, created and deleted files
+    """
+    watcher = PollingWatcher([templates], interval=0)
+    assert watcher.read_changes(0) == set()
+    a_path = os.path.join(templates, "a.j2")
+    with open(a_path, "a") as f:
+        f.write("{{ more }}")
+    new_path = os.path.join(templates, "new.j2")
+    with open(new_path, "w") as f:
+        f.write("{{ new }}")
+    os.unlink(os.path.join(templates, "sub", "b.j2"))
+    assert watcher.read_changes(0) == {
+        a_path,
+        new_path,
+        os.path.join(templates, "sub", "b.j2"),
+    }
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher(templates):
+    """
+    Test the InotifyWatcher detects written templates in new directories
+    """
+    watcher = InotifyWatcher([templates])
+    try:
+        assert watcher.read_changes(0) == set()
+        a_path = os.path.join(templates, "a.j2")
+        with open(a_path, "a") as f:
+            f.write("{{ more }}")
+        with open(os.path.join(templates, "c.txt"), "a") as f:
+            f.write("more")
+        assert watcher.read_changes(1) == {a_path}
+        os.mkdir(os.path.join(templates, "new"))
+        watcher.read_changes(1)
+        new_path = os.path.join(templates, "new", "new.j2")
+        with open(new_path, "w") as f:
+            f.write("{{ new }}")
+        assert watcher.read_changes(1) == {new_path}
+    finally:
+        watcher.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_relative_file(templates, monkeypatch):
+    """
+    Test the InotifyWatcher detects the changes of a bare relative file
+    """
+    monkeypatch.chdir(templates)
+    watcher = InotifyWatcher(["a.j2"])
+    try:
+        with open("a.j2", "a") as f:
+            f.write("{{ more }}")
+        assert watcher.read_changes(1) == {"a.j2"}
+    finally:
+        watcher.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_exclude(templates):
+    """
+    Test the InotifyWatcher does not watch the pruned and excluded paths
+    """
+    os.mkdir(os.path.join(templates, ".git"))
+    watcher = InotifyWatcher([templates], ["sub", "*.bak.j2"])
+    try:
+        assert sorted(watcher.directories.values()) == [templates]
+        for name in (os.path.join(".git", "x.j2"), os.path.join("sub", "b.j2"), "e.bak.j2"):
+            with open(os.path.join(templates, name), "w") as f:
+                f.write("{{ more }}")
+        os.mkdir(os.path.join(templates, "node_modules"))
+        assert watcher.read_changes(1) == set()
+        assert sorted(watcher.directories.values()) == [templates]
+    finally:
+        watcher.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_current_directory(templates, monkeypatch):
+    """
+    Test the InotifyWatcher detects the changes when watching `.`
+    """
+    monkeypatch.chdir(templates)
+    watcher = InotifyWatcher(["."])
+    try:
+        for name in ("a.j2", os.path.join("sub", "b.j2")):
+            with open(name, "a") as f:
+                f.write("{{ more }}")
+        assert watcher.read_changes(1) == {"a.j2", os.path.join("sub", "b.j2")}
+        assert watcher.is_watched("a.j2")
+    finally:
+        watcher.close()